@@ -0,0 +1,113 @@
+"""
+Caché en disco de reportes generados, direccionada por contenido.
+
+La clave es un hash de todo lo que determina el archivo (usuario, tipo,
+formato, filtros y versión de datos), así que nunca hay que invalidar:
+cuando los datos cambian cambia la clave. Se desalojan los archivos usados
+hace más tiempo (mtime) cuando el total supera REPORT_CACHE_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from app.core.config import settings
+
+
+class ArtifactCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(**parts) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def get(self, key: str, extension: str):
+        """
+        Ruta del artefacto si está en caché (y lo marca como recién usado), si no None.
+        """
+        path = self.path(key, extension)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def temp_path(self, extension: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}.{extension}")
+
+    def commit(self, key: str, extension: str, temp_path: str) -> str:
+        """
+        Publica un archivo escrito en temp_path() bajo su clave.
+        """
+        path = self.path(key, extension)
+        os.replace(temp_path, path)
+        self._evict()
+        return path
+
+    def store(self, key: str, extension: str, source_path: str) -> str:
+        """
+        Copia a la caché un archivo generado en otro lugar (hard link si se puede).
+        """
+        temp_path = self.temp_path(extension)
+        try:
+            os.link(source_path, temp_path)
+        except OSError:
+            shutil.copyfile(source_path, temp_path)
+        return self.commit(key, extension, temp_path)
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.startswith(".tmp-") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        files = 0
+        size = 0
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith(".tmp-"):
+                    files += 1
+                    size += entry.stat().st_size
+        lookups = self.hits + self.misses
+        return {
+            "files": files,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+artifact_cache = ArtifactCache(directory=settings.REPORT_CACHE_DIR, max_bytes=settings.REPORT_CACHE_MAX_BYTES)
@@ -1,13 +1,45 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Settings:
     DB_URL = os.getenv("DATABASE_URL")
+    # false: los routers async usan el engine sync desde el threadpool (ver ThreadpoolSession)
+    DB_ASYNC = os.getenv("DB_ASYNC", "true").lower() in ("1", "true", "yes")
+    # Si no se define se deriva de DATABASE_URL (mysql+aiomysql, sqlite+aiosqlite, ...)
+    ASYNC_DB_URL = os.getenv("ASYNC_DATABASE_URL")
+    # Cada engine (sync y async) tiene su propio pool con estos valores
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
     JWT_SECRET = os.getenv("JWT_SECRET", "asdkkjddsajkasdjk")
     JWT_EXPIRES_IN = int(os.getenv("JWT_EXPIRES_IN", 7))
     BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 2))
+    PASSWORD_MAX_CONCURRENCY = int(os.getenv("PASSWORD_MAX_CONCURRENCY", 4))
     CORS_ORIGIN = os.getenv("CORS_ORIGIN", "*")
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 1024))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+    # Segundos entre consultas de invalidaciones hechas por otros workers
+    USER_CACHE_SYNC_INTERVAL = float(os.getenv("USER_CACHE_SYNC_INTERVAL", 2))
+    # Sin token configurado los endpoints internos responden 404
+    INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN")
+    REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))
+    REPORT_OUTPUT_DIR = os.getenv("REPORT_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "queencell-reports"))
+    REPORT_JOB_TTL = int(os.getenv("REPORT_JOB_TTL", 3600))
+    PDF_ROWS_PER_TABLE = int(os.getenv("PDF_ROWS_PER_TABLE", 40))
+    REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "queencell-report-cache"))
+    REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    # Segundos entre barridos de paquetes vencidos (0 lo desactiva)
+    EXPIRATION_SWEEP_INTERVAL = int(os.getenv("EXPIRATION_SWEEP_INTERVAL", 3600))
+    EXPIRATION_SWEEP_BATCH = int(os.getenv("EXPIRATION_SWEEP_BATCH", 500))
+    # development | production | off (ver app/core/query_log.py)
+    QUERY_LOG_MODE = os.getenv("QUERY_LOG_MODE", "production").lower()
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
 
 settings = Settings()
\ No newline at end of file
@@ -1,11 +1,115 @@
 import pymysql
 pymysql.install_as_MySQLdb()
 
+from functools import partial
+from anyio import to_thread
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.pool_metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument
 
-engine = create_engine(settings.DB_URL)
+# Driver async equivalente a cada driver sync soportado
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """
+    Deriva la URL async (aiomysql/aiosqlite/asyncpg) de DATABASE_URL.
+    """
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Opciones de pool desde Settings. SQLite en memoria usa su propio pool
+    (una conexión por thread) y no admite tamaño ni overflow.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(settings.DB_URL, **pool_options(settings.DB_URL, TimedQueuePool))
+instrument(engine)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Camino async, usado por los routers de order, stock, dashboard, productions,
+# customers y analytics. Con DB_ASYNC=false no se crea: esos mismos handlers
+# reciben una ThreadpoolSession sobre el engine sync.
+if settings.DB_ASYNC:
+    ASYNC_DB_URL = settings.ASYNC_DB_URL or async_url(settings.DB_URL)
+    async_engine = create_async_engine(ASYNC_DB_URL, **pool_options(ASYNC_DB_URL, TimedAsyncAdaptedQueuePool))
+    instrument(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+# Sesiones sync para ThreadpoolSession, con las mismas opciones que AsyncSessionLocal
+ThreadpoolSessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadpoolSession:
+    """
+    Sesión sync con la parte de la interfaz de AsyncSession que usan los
+    routers. Cada llamada corre en el threadpool, como con get_db: es el
+    camino sync seleccionable con DB_ASYNC=false.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def _call(self, fn, *args, **kwargs):
+        return await to_thread.run_sync(partial(fn, *args, **kwargs))
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def expunge(self, instance):
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await self._call(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await self._call(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await self._call(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await self._call(fn, self.sync_session, *args, **kwargs)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await self._call(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def delete(self, instance):
+        await self._call(self.sync_session.delete, instance)
+
+    async def commit(self):
+        await self._call(self.sync_session.commit)
+
+    async def rollback(self):
+        await self._call(self.sync_session.rollback)
+
+    async def close(self):
+        await self._call(self.sync_session.close)
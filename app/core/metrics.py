@@ -0,0 +1,238 @@
+"""
+Métricas de requests y de base de datos en formato de texto de Prometheus.
+
+RequestMetricsMiddleware mide cada request (latencia, status, en curso) con
+la ruta como plantilla (`/api/order/{order_id}`), no la URL, para acotar la
+cardinalidad. Los eventos de los engines cuentan sentencias SQL y tiempo de
+base por request a través de un ContextVar, que se propaga a los threads de
+run_in_threadpool y a los greenlets de AsyncSession.
+
+Las métricas son por proceso: con varios workers cada uno expone las suyas.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from app.core import query_log
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # [cuentas acumuladas por bucket..., count, sum]
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def totals(self):
+        """
+        {labels: (count, sum)} de cada serie.
+        """
+        with self._lock:
+            return {labels: (series[-2], series[-1]) for labels, series in self._values.items()}
+
+    def render(self):
+        lines = self.header()
+        bucket_labels = self.label_names + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                count, total = series[-2], series[-1]
+                for bound, bucket_count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_labels(bucket_labels, labels + (bound,))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_labels(bucket_labels, labels + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requests HTTP por ruta y status.", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Latencia de requests HTTP por ruta.", ("method", "route")))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests HTTP en curso."))
+db_statements = registry.register(Histogram(
+    "http_request_db_statements", "Sentencias SQL ejecutadas por request.", ("method", "route"), STATEMENT_BUCKETS))
+db_time = registry.register(Histogram(
+    "http_request_db_seconds", "Tiempo en base de datos por request.", ("method", "route"), DB_TIME_BUCKETS))
+db_statements_unattributed = registry.register(Counter(
+    "db_statements_outside_request_total", "Sentencias SQL fuera de un request (tareas en segundo plano, CLI)."))
+db_repeated_shapes = registry.register(Counter(
+    "http_request_db_repeated_statements_total", "Sentencias repetidas por request (posible N+1).", ("method", "route")))
+
+
+class RequestDBStats:
+    __slots__ = ("scope", "statements", "seconds", "shapes")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.seconds = 0.0
+        # forma de la sentencia -> ejecuciones (lo llena query_log)
+        self.shapes = {}
+
+    def route(self) -> str:
+        return route_label(self.scope)
+
+
+current_db_stats: ContextVar = ContextVar("current_db_stats", default=None)
+
+
+def instrument_engine(engine):
+    """
+    Suma sentencias y tiempo de `engine` al request en curso.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = current_db_stats.get()
+        query_log.statement_executed(stats, statement, parameters, elapsed)
+        if stats is None:
+            db_statements_unattributed.inc()
+            return
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+def route_label(scope) -> str:
+    """
+    Plantilla de la ruta atendida: el path con cada parámetro reemplazado
+    por `{nombre}`. No se usa route.path porque en routers incluidos puede
+    no llevar el prefijo.
+    """
+    if scope.get("route") is None:
+        return UNMATCHED_ROUTE
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join(
+        "{" + params[segment] + "}" if segment in params else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI puro (no BaseHTTPMiddleware): no bufferiza respuestas en
+    streaming y la latencia incluye el envío completo del cuerpo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats(scope)
+        token = current_db_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            current_db_stats.reset(token)
+            route = route_label(scope)
+            method = scope["method"]
+            http_requests.inc(method, route, status_code)
+            http_latency.observe(elapsed, method, route)
+            db_statements.observe(stats.statements, method, route)
+            db_time.observe(stats.seconds, method, route)
+            repeated = query_log.request_finished(stats, method, route)
+            if repeated:
+                db_repeated_shapes.inc(method, route, amount=repeated)
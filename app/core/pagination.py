@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from app.models.types import GUID
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(row_id, str):
+            raise TypeError(row_id)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _coerce_id(column, row_id: str):
+    if isinstance(column.type, GUID):
+        return UUID(row_id)
+    return row_id
+
+
+def keyset_filter(model, cursor: str):
+    """
+    Condición "después del cursor" para el orden (created_at DESC, id DESC).
+    """
+    created_at, row_id = decode_cursor(cursor)
+    try:
+        row_id = _coerce_id(model.id, row_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < row_id),
+    )
+
+
+def _keyset_page(query, model, cursor, limit: int):
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        query = query.filter(keyset_filter(model, cursor))
+    return query.limit(limit + 1)
+
+
+def _split_page(rows, limit: int):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def paginate(query, model, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Pagina `query` por keyset sobre (created_at, id), de más nuevo a más viejo.
+
+    Devuelve (rows, next_cursor); next_cursor es None en la última página.
+    Cada página cuesta lo mismo sin importar su profundidad.
+    """
+    return _split_page(_keyset_page(query, model, cursor, limit).all(), limit)
+
+
+async def paginate_async(db, stmt, model, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Igual que paginate() para un select() ejecutado en una AsyncSession.
+    """
+    result = await db.scalars(_keyset_page(stmt, model, cursor, limit))
+    return _split_page(result.all(), limit)
+
+
+async def paginate_rows_async(db, stmt, model, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Igual que paginate_async() para un select() de columnas: devuelve filas
+    (Row) en vez de objetos ORM. El select debe incluir created_at e id.
+    """
+    result = await db.execute(_keyset_page(stmt, model, cursor, limit))
+    return _split_page(result.all(), limit)
@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from app.core.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+# Funciones a nivel de módulo para que el pool de procesos pueda serializarlas
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_password(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+class PasswordService:
+    """
+    Ejecuta bcrypt en un pool de procesos dedicado para no bloquear el
+    event loop ni el threadpool de la API.
+
+    Como mucho `max_concurrency` operaciones se despachan a la vez; el resto
+    espera en la cola, cuya profundidad se publica en stats().
+    Con `max_workers=0` se usa el executor por defecto (threads).
+    """
+
+    def __init__(self, max_workers: int, max_concurrency: int):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rehashed = 0
+        self._executor = None
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_executor(self):
+        if self._executor is None and self.max_workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run(self, fn, *args):
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(_verify_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        True si el hash fue generado con otro BCRYPT_ROUNDS o un esquema deprecado.
+        """
+        return pwd_context.needs_update(hashed)
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_service = PasswordService(
+    max_workers=settings.PASSWORD_WORKERS,
+    max_concurrency=settings.PASSWORD_MAX_CONCURRENCY,
+)
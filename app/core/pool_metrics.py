@@ -0,0 +1,122 @@
+"""
+Métricas del pool de conexiones.
+
+QueuePool no expone cuánto espera un request por una conexión, así que las
+clases de pool de acá miden el tiempo de `_do_get` (espera en la cola +
+apertura de conexiones de overflow). Aperturas/cierres/invalidaciones se
+cuentan con los eventos del pool para ver el churn de conexiones.
+"""
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            waits = self.checkouts + self.checkout_timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "avg_checkout_wait_ms": round(self.wait_seconds_total / waits * 1000, 3) if waits else None,
+                "max_checkout_wait_ms": round(self.wait_seconds_max * 1000, 3),
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+            }
+
+
+class _TimedPoolMixin:
+    """
+    Mide la espera de checkout. Las métricas sobreviven a `recreate()`
+    (engine.dispose(), invalidaciones), que crea una instancia nueva del pool.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return record
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument(engine):
+    """
+    Cuenta aperturas, cierres e invalidaciones de conexiones de `engine`.
+    """
+    def counter(name):
+        def listener(*args):
+            metrics = getattr(engine.pool, "metrics", None)
+            if metrics is not None:
+                metrics.count(name)
+        return listener
+
+    event.listen(engine, "connect", counter("connects"))
+    event.listen(engine, "close", counter("closes"))
+    event.listen(engine, "close_detached", counter("closes"))
+    event.listen(engine, "invalidate", counter("invalidations"))
+
+
+def pool_stats(engine):
+    """
+    Estado actual del pool de `engine` más los contadores acumulados.
+    """
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow_in_use": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
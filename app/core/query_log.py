@@ -0,0 +1,94 @@
+"""
+Log de consultas lentas y detector de N+1 por request.
+
+Se alimenta de los eventos de engine de app.core.metrics. Cada sentencia se
+reduce a su forma (SQL sin valores, con los IN (?, ?, ...) colapsados); si
+la misma forma se repite N_PLUS_ONE_THRESHOLD veces en un request se reporta
+como posible N+1. Los parámetros nunca se loguean: solo su tipo.
+
+QUERY_LOG_MODE:
+- development: reporta cada request con N+1 y loguea el total de sentencias.
+- production: reporta cada forma repetida una sola vez por ruta y proceso.
+- off: solo métricas.
+"""
+import logging
+import re
+import threading
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEVELOPMENT = "development"
+PRODUCTION = "production"
+OFF = "off"
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+_reported = set()
+_reported_lock = threading.Lock()
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?...)", _SPACES.sub(" ", statement).strip())
+
+
+def redact(parameters):
+    """
+    Reemplaza cada valor por su tipo; en executemany informa solo la cantidad de filas.
+    """
+    if isinstance(parameters, list):
+        return f"<{len(parameters)} filas>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, tuple):
+        return tuple(type(value).__name__ for value in parameters)
+    return type(parameters).__name__
+
+
+def statement_executed(stats, statement: str, parameters, elapsed: float):
+    """
+    `stats` es el RequestDBStats del request en curso o None fuera de un request.
+    """
+    if settings.QUERY_LOG_MODE == OFF:
+        return
+    if stats is not None:
+        shape = statement_shape(statement)
+        stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s: %s params=%s",
+            elapsed * 1000,
+            stats.route() if stats is not None else "-",
+            statement_shape(statement),
+            redact(parameters),
+        )
+
+
+def repeated_shapes(stats):
+    """
+    Formas ejecutadas al menos N_PLUS_ONE_THRESHOLD veces en el request.
+    """
+    return {shape: count for shape, count in stats.shapes.items() if count >= settings.N_PLUS_ONE_THRESHOLD}
+
+
+def request_finished(stats, method: str, route: str) -> int:
+    """
+    Reporta los N+1 del request según el modo. Devuelve la cantidad de formas repetidas.
+    """
+    if settings.QUERY_LOG_MODE == OFF:
+        return 0
+    repeated = repeated_shapes(stats)
+    for shape, count in repeated.items():
+        if settings.QUERY_LOG_MODE == PRODUCTION:
+            with _reported_lock:
+                if (method, route, shape) in _reported:
+                    continue
+                _reported.add((method, route, shape))
+        logger.warning("Posible N+1 en %s %s: %d ejecuciones de %s", method, route, count, shape)
+    if settings.QUERY_LOG_MODE == DEVELOPMENT:
+        logger.info(
+            "%s %s: %d sentencias SQL, %.1f ms en base",
+            method, route, stats.statements, stats.seconds * 1000,
+        )
+    return len(repeated)
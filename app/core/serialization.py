@@ -0,0 +1,48 @@
+"""
+Serialización rápida para los listados paginados.
+
+Los endpoints de listado seleccionan solo las columnas del schema de salida
+(filas, no objetos ORM), validan la página entera en una sola llamada con un
+TypeAdapter precompilado y la serializan a JSON con pydantic-core, sin pasar
+por jsonable_encoder. El response_model del endpoint queda solo para OpenAPI.
+"""
+from typing import Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+from app.schemas.pagination import Page
+
+
+class JSONBytesResponse(Response):
+    """
+    Respuesta JSON con el cuerpo ya serializado (bytes).
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return content
+
+
+def columns_for(schema, model, exclude=()):
+    """
+    Columnas de `model` que corresponden a campos de `schema`.
+    """
+    return [
+        getattr(model, name)
+        for name in schema.model_fields
+        if name not in exclude and name in model.__table__.c
+    ]
+
+
+class PageSerializer:
+    def __init__(self, item_schema):
+        self.adapter = TypeAdapter(Page[item_schema])
+
+    def dump(self, items: list, next_cursor: Optional[str] = None) -> bytes:
+        """
+        `items` son dicts (o filas ya convertidas con _asdict()).
+        """
+        page = self.adapter.validate_python({"items": items, "next_cursor": next_cursor})
+        return self.adapter.dump_json(page)
+
+    def response(self, rows, next_cursor: Optional[str] = None) -> JSONBytesResponse:
+        return JSONBytesResponse(self.dump([row._asdict() for row in rows], next_cursor))
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+class UserCache:
+    """
+    Cache LRU con TTL de usuarios autenticados, indexado por (user_id, token).
+
+    Guarda la instancia de User ya desvinculada de su sesión, así
+    get_current_user evita un SELECT por request mientras el token siga vivo.
+
+    Los cambios hechos por otros workers llegan por la tabla
+    user_invalidations: cada `sync_interval` segundos un request consulta
+    los registros nuevos (id > last_invalidation_id) y los aplica.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, sync_interval: float = 2.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.remote_invalidations = 0
+        self.last_invalidation_id = None
+        self._next_sync = 0.0
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+
+    def sync_due(self) -> bool:
+        return time.monotonic() >= self._next_sync
+
+    def claim_sync(self) -> bool:
+        """
+        True para un solo request por intervalo: el que debe consultar user_invalidations.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_sync:
+                return False
+            self._next_sync = now + self.sync_interval
+            return True
+
+    def apply_invalidations(self, rows):
+        """
+        Aplica [(id, user_id)] de user_invalidations posteriores a last_invalidation_id.
+        """
+        for invalidation_id, user_id in rows:
+            self.invalidate(user_id)
+            self.remote_invalidations += 1
+            self.last_invalidation_id = max(self.last_invalidation_id or 0, invalidation_id)
+
+    def get(self, user_id, token):
+        key = (user_id, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def set(self, user_id, token, user):
+        if self.maxsize <= 0:
+            return
+        key = (user_id, token)
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove((user_id, token))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "remote_invalidations": self.remote_invalidations,
+                "sync_interval_seconds": self.sync_interval,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        user_id, token = key
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL, sync_interval=settings.USER_CACHE_SYNC_INTERVAL
+)
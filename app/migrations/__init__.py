@@ -0,0 +1,82 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada módulo `vNNNN_<descripcion>.py` de este paquete define `upgrade(conn)`;
+se aplican en orden y quedan registradas en la tabla `schema_migrations`.
+Se ejecutan con `python manage.py migrate`.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+
+_MODULE_PATTERN = re.compile(r"^v(\d{4})_\w+$")
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(16), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def discover():
+    """
+    Devuelve [(version, nombre, módulo)] ordenado por versión.
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append((match.group(1), module_info.name, module))
+    return sorted(migrations, key=lambda m: m[0])
+
+
+def applied_versions(conn):
+    _metadata.create_all(conn, checkfirst=True)
+    return {row[0] for row in conn.execute(select(schema_migrations.c.version))}
+
+
+def _record(conn, version, name):
+    conn.execute(schema_migrations.insert().values(version=version, name=name, applied_at=datetime.utcnow()))
+
+
+def upgrade(engine, target=None):
+    """
+    Aplica las migraciones pendientes hasta `target` (inclusive). Devuelve los nombres aplicados.
+    """
+    applied = []
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    for version, name, module in discover():
+        if target is not None and version > target:
+            break
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            _record(conn, version, name)
+        applied.append(name)
+    return applied
+
+
+def stamp(engine):
+    """
+    Marca todas las migraciones como aplicadas sin ejecutarlas (esquema recién creado).
+    """
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+        for version, name, _ in discover():
+            if version not in done:
+                _record(conn, version, name)
+
+
+def status(engine):
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    return [(name, version in done) for version, name, _ in discover()]
@@ -0,0 +1,71 @@
+"""
+Operaciones auxiliares para migraciones, independientes de los modelos actuales.
+"""
+from sqlalchemy import Column, ForeignKeyConstraint, Index, MetaData, Table, inspect, text
+from sqlalchemy.schema import AddConstraint, CreateColumn
+from sqlalchemy.types import NullType
+
+
+def _stub_table(table_name, columns):
+    return Table(table_name, MetaData(), *[Column(name, NullType()) for name in columns])
+
+
+def has_index(conn, table_name, index_name):
+    return any(ix["name"] == index_name for ix in inspect(conn).get_indexes(table_name))
+
+
+def create_index(conn, index_name, table_name, columns, unique=False):
+    if has_index(conn, table_name, index_name):
+        return
+    table = _stub_table(table_name, columns)
+    Index(index_name, *[table.c[name] for name in columns], unique=unique).create(conn)
+
+
+
+def has_column(conn, table_name, column_name):
+    return any(column["name"] == column_name for column in inspect(conn).get_columns(table_name))
+
+
+def add_column(conn, table_name, column):
+    """
+    ALTER TABLE ... ADD COLUMN si la columna no existe. `column` es un Column sin tabla.
+    """
+    if has_column(conn, table_name, column.name):
+        return
+    Table(table_name, MetaData(), column)
+    spec = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {conn.dialect.identifier_preparer.quote(table_name)} ADD COLUMN {spec}"))
+
+
+def add_foreign_key(conn, name, table_name, column, referred_table, referred_column="id", ondelete=None):
+    """
+    Agrega la foreign key si no existe. SQLite no permite agregar constraints: se omite.
+    """
+    if conn.dialect.name == "sqlite":
+        return
+    if any(fk.get("name") == name for fk in inspect(conn).get_foreign_keys(table_name)):
+        return
+    metadata = MetaData()
+    Table(referred_table, metadata, Column(referred_column, NullType()))
+    table = Table(table_name, metadata, Column(column, NullType()))
+    constraint = ForeignKeyConstraint([column], [f"{referred_table}.{referred_column}"], name=name, ondelete=ondelete)
+    table.append_constraint(constraint)
+    conn.execute(AddConstraint(constraint))
+
+
+def set_not_null(conn, table_name, column, type_sql, default_sql=None):
+    """
+    Hace NOT NULL una columna existente (los NULL ya tienen que estar
+    rellenados). SQLite no permite cambiar la columna: se omite.
+    """
+    if conn.dialect.name == "sqlite":
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    table, name = quote(table_name), quote(column)
+    if conn.dialect.name == "mysql":
+        default = f" DEFAULT {default_sql}" if default_sql else ""
+        conn.execute(text(f"ALTER TABLE {table} MODIFY {name} {type_sql} NOT NULL{default}"))
+        return
+    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {name} SET NOT NULL"))
+    if default_sql:
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {name} SET DEFAULT {default_sql}"))
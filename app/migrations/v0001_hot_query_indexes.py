@@ -0,0 +1,24 @@
+"""
+Índices compuestos para las consultas de dashboard.py, stock.py y reports.py.
+"""
+from app.migrations.ops import create_index
+
+INDEXES = [
+    # /dashboard/stats (celdas disponibles, por expirar) y /stock/
+    ("ix_stock_packages_user_expired_expiration", "stock_packages", ["user_id", "is_expired", "expiration_date"]),
+    # /stock/all paginado
+    ("ix_stock_packages_user_created", "stock_packages", ["user_id", "created_at", "id"]),
+    # /dashboard/stats (pendientes) y /dashboard/upcoming
+    ("ix_customer_orders_user_status_transfer", "customer_orders", ["user_id", "status", "larvae_transfer_date"]),
+    # /order/ y /reports/orders paginados por (created_at, id)
+    ("ix_customer_orders_user_created", "customer_orders", ["user_id", "created_at", "id"]),
+    # ventas de los últimos 30 días y /stock/{id}/sales
+    ("ix_stock_sales_package_sale_date", "stock_sales", ["stock_package_id", "sale_date"]),
+    # /productions/ y /reports/productions paginados por (created_at, id)
+    ("ix_production_records_user_created", "production_records", ["user_id", "created_at", "id"]),
+]
+
+
+def upgrade(conn):
+    for index_name, table_name, columns in INDEXES:
+        create_index(conn, index_name, table_name, columns)
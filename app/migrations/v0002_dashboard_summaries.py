@@ -0,0 +1,29 @@
+"""
+Tablas de resumen para /dashboard/stats. Se llenan por usuario en la primera
+lectura o con `python manage.py reconcile-dashboard`.
+"""
+from sqlalchemy import Column, Date, ForeignKey, Integer, MetaData, Table, TIMESTAMP, func
+from sqlalchemy.dialects.mysql import CHAR
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    Table("users", metadata, Column("id", CHAR(36), primary_key=True))
+    Table(
+        "dashboard_summaries",
+        metadata,
+        Column("user_id", CHAR(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("total_available_cells", Integer, nullable=False, default=0),
+        Column("pending_orders", Integer, nullable=False, default=0),
+        Column("updated_at", TIMESTAMP, server_default=func.now()),
+    )
+    Table(
+        "dashboard_daily_stats",
+        metadata,
+        Column("user_id", CHAR(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("day", Date, primary_key=True),
+        Column("cells_sold", Integer, nullable=False, default=0),
+        Column("expiring_packages", Integer, nullable=False, default=0),
+    )
+    for name in ("dashboard_summaries", "dashboard_daily_stats"):
+        metadata.tables[name].create(conn, checkfirst=True)
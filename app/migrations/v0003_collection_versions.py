@@ -0,0 +1,18 @@
+"""
+Tabla de versiones de datos por usuario y colección.
+"""
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table
+from sqlalchemy.dialects.mysql import CHAR
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    Table("users", metadata, Column("id", CHAR(36), primary_key=True))
+    table = Table(
+        "collection_versions",
+        metadata,
+        Column("user_id", CHAR(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("collection", String(32), primary_key=True),
+        Column("version", Integer, nullable=False, default=0),
+    )
+    table.create(conn, checkfirst=True)
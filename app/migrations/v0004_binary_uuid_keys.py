@@ -0,0 +1,130 @@
+"""
+Claves UUID compactas: BINARY(16) en MySQL y uuid nativo en PostgreSQL.
+
+Convierte todas las columnas de id/FK (hasta ahora CHAR(36), VARCHAR(36) o
+UUID según la tabla) al tipo de app.models.types.GUID. Las foreign keys de
+las tablas afectadas se eliminan antes de convertir y se vuelven a crear
+con el mismo nombre y ON DELETE. En SQLite (desarrollo) los tipos no se
+pueden alterar: se reescriben los valores a sus 16 bytes.
+"""
+import uuid
+from sqlalchemy import Column, MetaData, Table, bindparam, inspect, select, text, update
+from sqlalchemy.schema import AddConstraint, DropConstraint, ForeignKeyConstraint
+from sqlalchemy.types import NullType
+
+COLUMNS = {
+    "users": ["id"],
+    "customer_orders": ["id", "user_id"],
+    "production_records": ["id", "user_id", "order_id"],
+    "hives": ["id", "production_id"],
+    "production_hives": ["id", "production_id"],
+    "stock_packages": ["id", "user_id", "production_id"],
+    "stock_sales": ["id", "stock_package_id"],
+    "dashboard_summaries": ["user_id"],
+    "dashboard_daily_stats": ["user_id"],
+    "collection_versions": ["user_id"],
+}
+
+
+def _existing(conn):
+    inspector = inspect(conn)
+    return {table: columns for table, columns in COLUMNS.items() if inspector.has_table(table)}
+
+
+def _foreign_keys(conn, tables):
+    inspector = inspect(conn)
+    metadata = MetaData()
+    constraints = []
+    for table_name in tables:
+        for fk in inspector.get_foreign_keys(table_name):
+            if not fk.get("name"):
+                continue
+            referred = Table(fk["referred_table"], metadata, extend_existing=True)
+            for column in fk["referred_columns"]:
+                if column not in referred.c:
+                    referred.append_column(_stub_column(column))
+            table = Table(table_name, metadata, extend_existing=True)
+            for column in fk["constrained_columns"]:
+                if column not in table.c:
+                    table.append_column(_stub_column(column))
+            constraint = ForeignKeyConstraint(
+                fk["constrained_columns"],
+                [f"{fk['referred_table']}.{column}" for column in fk["referred_columns"]],
+                name=fk["name"],
+                ondelete=(fk.get("options") or {}).get("ondelete"),
+            )
+            table.append_constraint(constraint)
+            constraints.append(constraint)
+    return constraints
+
+
+def _stub_column(name):
+    return Column(name, NullType())
+
+
+def _upgrade_mysql(conn, tables):
+    inspector = inspect(conn)
+    for table_name, columns in tables.items():
+        info = {column["name"]: column for column in inspector.get_columns(table_name)}
+        for name in columns:
+            column = info[name]
+            if str(column["type"]).upper().startswith("BINARY"):
+                continue
+            null = "NULL" if column["nullable"] else "NOT NULL"
+            # CHAR -> VARBINARY conserva los bytes ASCII; después se compactan con UNHEX
+            conn.execute(text(f"ALTER TABLE `{table_name}` MODIFY `{name}` VARBINARY(36) {null}"))
+            conn.execute(text(f"UPDATE `{table_name}` SET `{name}` = UNHEX(REPLACE(`{name}`, '-', '')) WHERE `{name}` IS NOT NULL"))
+            conn.execute(text(f"ALTER TABLE `{table_name}` MODIFY `{name}` BINARY(16) {null}"))
+
+
+def _upgrade_postgresql(conn, tables):
+    inspector = inspect(conn)
+    for table_name, columns in tables.items():
+        info = {column["name"]: column for column in inspector.get_columns(table_name)}
+        for name in columns:
+            if str(info[name]["type"]).upper() == "UUID":
+                continue
+            conn.execute(text(f'ALTER TABLE "{table_name}" ALTER COLUMN "{name}" TYPE uuid USING "{name}"::uuid'))
+
+
+def _to_bytes(value):
+    if value is None or isinstance(value, bytes):
+        return value
+    return uuid.UUID(str(value)).bytes
+
+
+def _upgrade_sqlite(conn, tables):
+    metadata = MetaData()
+    for table_name, columns in tables.items():
+        # Sin reflejar: SQLite informa UUID como NUMERIC y convertiría los valores
+        table = Table(table_name, metadata, *(_stub_column(name) for name in columns))
+        for name in columns:
+            column = table.c[name]
+            values = conn.execute(select(column).distinct().where(column.is_not(None))).scalars().all()
+            changes = [
+                {"old": value, "new": _to_bytes(value)}
+                for value in values if not isinstance(value, bytes)
+            ]
+            if changes:
+                conn.execute(
+                    update(table).where(column == bindparam("old")).values({name: bindparam("new")}),
+                    changes,
+                )
+
+
+def upgrade(conn):
+    tables = _existing(conn)
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        _upgrade_sqlite(conn, tables)
+        return
+
+    constraints = _foreign_keys(conn, tables)
+    for constraint in constraints:
+        conn.execute(DropConstraint(constraint))
+    if dialect == "postgresql":
+        _upgrade_postgresql(conn, tables)
+    else:
+        _upgrade_mysql(conn, tables)
+    for constraint in constraints:
+        conn.execute(AddConstraint(constraint))
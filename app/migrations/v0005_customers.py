@@ -0,0 +1,127 @@
+"""
+Clientes normalizados: tablas customers y customer_trigrams, columna
+customer_id en customer_orders y stock_sales, y backfill desde los nombres
+ya cargados (un cliente por usuario y nombre normalizado).
+
+normalize y trigrams son una copia de las de app.services.customers a la
+fecha de esta migración: si el servicio cambia, esta migración no.
+"""
+import unicodedata
+import uuid
+from collections import defaultdict
+from sqlalchemy import Column, ForeignKey, MetaData, String, Table, TIMESTAMP, UniqueConstraint, bindparam, func, select, update
+from app.migrations.ops import add_column, add_foreign_key, create_index
+from app.models.types import GUID
+
+BATCH_SIZE = 1000
+TRIGRAM_SIZE = 3
+
+
+def normalize(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())[:255]
+
+
+def trigrams(key: str) -> set:
+    return {key[i:i + TRIGRAM_SIZE] for i in range(len(key) - TRIGRAM_SIZE + 1)}
+
+
+def _tables():
+    metadata = MetaData()
+    Table("users", metadata, Column("id", GUID(), primary_key=True))
+    customers = Table(
+        "customers",
+        metadata,
+        Column("id", GUID(), primary_key=True),
+        Column("user_id", GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        Column("name", String(255), nullable=False),
+        Column("name_key", String(255), nullable=False),
+        Column("created_at", TIMESTAMP, server_default=func.now()),
+        UniqueConstraint("user_id", "name_key", name="uq_customers_user_name_key"),
+    )
+    customer_trigrams = Table(
+        "customer_trigrams",
+        metadata,
+        Column("user_id", GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("trigram", String(3), primary_key=True),
+        Column("customer_id", GUID(), ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True),
+    )
+    orders = Table(
+        "customer_orders", metadata,
+        Column("user_id", GUID()), Column("customer_name", String(255)), Column("customer_id", GUID()),
+    )
+    packages = Table("stock_packages", metadata, Column("id", GUID()), Column("user_id", GUID()))
+    sales = Table(
+        "stock_sales", metadata,
+        Column("stock_package_id", GUID()), Column("customer_name", String(255)), Column("customer_id", GUID()),
+    )
+    return customers, customer_trigrams, orders, packages, sales
+
+
+def _chunks(rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start:start + BATCH_SIZE]
+
+
+def _backfill(conn, customers, customer_trigrams, orders, packages, sales):
+    names = defaultdict(set)
+    for row in conn.execute(select(orders.c.user_id, orders.c.customer_name).distinct()):
+        names[row.user_id].add(row.customer_name)
+    sale_names = select(packages.c.user_id, sales.c.customer_name).join(
+        packages, packages.c.id == sales.c.stock_package_id
+    ).distinct()
+    for row in conn.execute(sale_names):
+        names[row.user_id].add(row.customer_name)
+
+    existing = {(row.user_id, row.name_key): row.id for row in conn.execute(select(customers.c.user_id, customers.c.name_key, customers.c.id))}
+    new_customers, new_trigrams, assignments = [], [], []
+    for user_id, raw_names in names.items():
+        for name in sorted(raw_names):
+            key = normalize(name or "")
+            if not key:
+                continue
+            customer_id = existing.get((user_id, key))
+            if customer_id is None:
+                customer_id = existing[(user_id, key)] = uuid.uuid4()
+                new_customers.append({"id": customer_id, "user_id": user_id, "name": " ".join(name.split())[:255], "name_key": key})
+                new_trigrams.extend({"user_id": user_id, "trigram": gram, "customer_id": customer_id} for gram in trigrams(key))
+            assignments.append({"b_user_id": user_id, "b_name": name, "b_customer_id": customer_id})
+
+    for chunk in _chunks(new_customers):
+        conn.execute(customers.insert(), chunk)
+    for chunk in _chunks(new_trigrams):
+        conn.execute(customer_trigrams.insert(), chunk)
+    for chunk in _chunks(assignments):
+        conn.execute(
+            update(orders)
+            .where(orders.c.user_id == bindparam("b_user_id"), orders.c.customer_name == bindparam("b_name"))
+            .values(customer_id=bindparam("b_customer_id")),
+            chunk,
+        )
+        conn.execute(
+            update(sales)
+            .where(
+                sales.c.customer_name == bindparam("b_name"),
+                sales.c.stock_package_id.in_(select(packages.c.id).where(packages.c.user_id == bindparam("b_user_id"))),
+            )
+            .values(customer_id=bindparam("b_customer_id")),
+            chunk,
+        )
+
+
+def upgrade(conn):
+    customers, customer_trigrams, orders, packages, sales = _tables()
+    customers.create(conn, checkfirst=True)
+    customer_trigrams.create(conn, checkfirst=True)
+    create_index(conn, "ix_customer_trigrams_customer", "customer_trigrams", ["customer_id"])
+
+    for table_name, index_name, columns in (
+        ("customer_orders", "ix_customer_orders_user_customer", ["user_id", "customer_id"]),
+        ("stock_sales", "ix_stock_sales_customer", ["customer_id"]),
+    ):
+        add_column(conn, table_name, Column("customer_id", GUID(), nullable=True))
+        add_foreign_key(conn, f"fk_{table_name}_customer", table_name, "customer_id", "customers", ondelete="SET NULL")
+        create_index(conn, index_name, table_name, columns)
+
+    _backfill(conn, customers, customer_trigrams, orders, packages, sales)
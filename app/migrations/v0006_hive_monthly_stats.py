@@ -0,0 +1,75 @@
+"""
+Tabla hive_monthly_stats (aceptación por usuario, mes y colmena) y su
+llenado inicial desde production_records y production_hives.
+
+Misma regla que app.services.hive_stats, copiada acá para que la migración
+no dependa del servicio: los buckets son por mes (primer día) y colmena,
+"" para producciones sin colmena, y cada producción cuenta una vez por
+colmena distinta.
+"""
+from collections import defaultdict
+from sqlalchemy import Column, Date, ForeignKey, Integer, MetaData, String, Table, case, func, select
+from app.models.types import GUID
+
+BATCH_SIZE = 1000
+COUNTERS = ("productions", "larvae_transferred", "accepted_larvae", "accepted_cells", "cells_produced")
+NO_HIVE = ""
+
+
+def _tables():
+    metadata = MetaData()
+    Table("users", metadata, Column("id", GUID(), primary_key=True))
+    stats = Table(
+        "hive_monthly_stats",
+        metadata,
+        Column("user_id", GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("month", Date, primary_key=True),
+        Column("hive_name", String(255), primary_key=True),
+        *(Column(name, Integer, nullable=False, default=0) for name in COUNTERS),
+    )
+    productions = Table(
+        "production_records", metadata,
+        Column("id", GUID()), Column("user_id", GUID()), Column("transfer_date", Date),
+        Column("larvae_transferred", Integer), Column("accepted_cells", Integer), Column("cells_produced", Integer),
+    )
+    hives = Table("production_hives", metadata, Column("production_id", GUID()), Column("hive_name", String(255)))
+    return stats, productions, hives
+
+
+def _backfill(conn, stats, productions, hives):
+    hives = select(hives.c.production_id, hives.c.hive_name).distinct().subquery()
+    hive = func.coalesce(hives.c.hive_name, NO_HIVE)
+    accepted_larvae = case((productions.c.accepted_cells.is_not(None), productions.c.larvae_transferred), else_=0)
+    rows = conn.execute(
+        select(
+            productions.c.user_id,
+            productions.c.transfer_date,
+            hive.label("hive_name"),
+            func.count().label("productions"),
+            func.sum(productions.c.larvae_transferred).label("larvae_transferred"),
+            func.sum(accepted_larvae).label("accepted_larvae"),
+            func.sum(func.coalesce(productions.c.accepted_cells, 0)).label("accepted_cells"),
+            func.sum(productions.c.cells_produced).label("cells_produced"),
+        )
+        .select_from(productions.outerjoin(hives, hives.c.production_id == productions.c.id))
+        .group_by(productions.c.user_id, productions.c.transfer_date, hive)
+    )
+    buckets = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for row in rows:
+        bucket = buckets[(row.user_id, row.transfer_date.replace(day=1), row.hive_name)]
+        for name in COUNTERS:
+            bucket[name] += int(getattr(row, name) or 0)
+
+    conn.execute(stats.delete())
+    values = [
+        {"user_id": user_id, "month": month, "hive_name": hive_name, **counters}
+        for (user_id, month, hive_name), counters in buckets.items()
+    ]
+    for start in range(0, len(values), BATCH_SIZE):
+        conn.execute(stats.insert(), values[start:start + BATCH_SIZE])
+
+
+def upgrade(conn):
+    stats, productions, hives = _tables()
+    stats.create(conn, checkfirst=True)
+    _backfill(conn, stats, productions, hives)
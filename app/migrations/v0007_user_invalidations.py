@@ -0,0 +1,18 @@
+"""
+Tabla user_invalidations: cambios de usuarios que cada worker aplica a su
+cache de get_current_user.
+"""
+from sqlalchemy import Column, Integer, MetaData, Table, TIMESTAMP
+from app.models.types import GUID
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    table = Table(
+        "user_invalidations",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("user_id", GUID(), nullable=False),
+        Column("created_at", TIMESTAMP, nullable=False),
+    )
+    table.create(conn, checkfirst=True)
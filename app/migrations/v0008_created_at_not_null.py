@@ -0,0 +1,23 @@
+"""
+created_at NOT NULL en las tablas paginadas por keyset (created_at, id).
+
+Las filas viejas sin created_at rompían el cursor y quedaban fuera de la
+paginación. Se rellenan con updated_at (o la hora actual) y la columna pasa
+a NOT NULL con DEFAULT CURRENT_TIMESTAMP. En SQLite solo se rellena.
+"""
+from sqlalchemy import Column, MetaData, Table, TIMESTAMP, func, update
+from app.migrations.ops import set_not_null
+
+TABLES = ("customer_orders", "production_records", "stock_packages")
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    for table_name in TABLES:
+        table = Table(table_name, metadata, Column("created_at", TIMESTAMP), Column("updated_at", TIMESTAMP))
+        conn.execute(
+            update(table)
+            .where(table.c.created_at.is_(None))
+            .values(created_at=func.coalesce(table.c.updated_at, func.current_timestamp()))
+        )
+        set_not_null(conn, table_name, "created_at", "TIMESTAMP", "CURRENT_TIMESTAMP")
@@ -0,0 +1,13 @@
+"""
+Columna cells_allocated en customer_orders: las celdas que el planificador
+de entregas asigna desde stock, separadas de cells_produced (producciones).
+
+Los planes grabados antes de esta migración quedaron sumados en
+cells_produced y no se pueden separar: no se rellena.
+"""
+from sqlalchemy import Column, Integer
+from app.migrations.ops import add_column
+
+
+def upgrade(conn):
+    add_column(conn, "customer_orders", Column("cells_allocated", Integer, nullable=False, server_default="0"))
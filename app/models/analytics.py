@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, String
+from app.core.database import Base
+from app.models.types import GUID
+
+
+class HiveMonthlyStat(Base):
+    """
+    Totales de producción por usuario, mes de traslarve y colmena, mantenidos
+    en la misma transacción que las escrituras de producciones. Una
+    producción con varias colmenas suma en cada una; las que no tienen
+    colmena van a hive_name = "".
+    """
+    __tablename__ = "hive_monthly_stats"
+
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    hive_name = Column(String(255), primary_key=True)
+    productions = Column(Integer, nullable=False, default=0)
+    larvae_transferred = Column(Integer, nullable=False, default=0)
+    # Larvas de las producciones que ya tienen aceptación cargada
+    accepted_larvae = Column(Integer, nullable=False, default=0)
+    accepted_cells = Column(Integer, nullable=False, default=0)
+    cells_produced = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, ForeignKey, Index, String, TIMESTAMP, UniqueConstraint, func
+import uuid
+from app.core.database import Base
+from app.models.types import GUID
+
+
+class Customer(Base):
+    """
+    Cliente de un usuario. `name_key` es el nombre normalizado (sin acentos,
+    en minúsculas, espacios colapsados): identifica al cliente y el índice
+    único (user_id, name_key) resuelve las búsquedas por prefijo.
+    """
+    __tablename__ = "customers"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name_key", name="uq_customers_user_name_key"),
+    )
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(255), nullable=False)
+    name_key = Column(String(255), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class CustomerTrigram(Base):
+    """
+    Trigramas de `name_key` para búsqueda por subcadena con índice.
+    """
+    __tablename__ = "customer_trigrams"
+    __table_args__ = (
+        Index("ix_customer_trigrams_customer", "customer_id"),
+    )
+
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    trigram = Column(String(3), primary_key=True)
+    customer_id = Column(GUID(), ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True)
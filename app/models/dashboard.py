@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Date, TIMESTAMP, ForeignKey, func
+from app.core.database import Base
+from app.models.types import GUID
+
+
+class DashboardSummary(Base):
+    """
+    Contadores de /dashboard/stats por usuario, mantenidos en la misma
+    transacción que las escrituras de stock, pedidos y producciones.
+    """
+    __tablename__ = "dashboard_summaries"
+
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_available_cells = Column(Integer, nullable=False, default=0)
+    pending_orders = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class DashboardDailyStat(Base):
+    """
+    Buckets diarios para las métricas con ventana de tiempo:
+    celdas vendidas por sale_date y paquetes vigentes por expiration_date.
+    """
+    __tablename__ = "dashboard_daily_stats"
+
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    cells_sold = Column(Integer, nullable=False, default=0)
+    expiring_packages = Column(Integer, nullable=False, default=0)
@@ -1,20 +1,29 @@
-from sqlalchemy import Column, String, Integer, Date, TIMESTAMP, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Date, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
 from app.core.database import Base
+from app.models.types import GUID
 
 class CustomerOrder(Base):
     __tablename__ = "customer_orders"
+    __table_args__ = (
+        Index("ix_customer_orders_user_status_transfer", "user_id", "status", "larvae_transfer_date"),
+        Index("ix_customer_orders_user_created", "user_id", "created_at", "id"),
+        Index("ix_customer_orders_user_customer", "user_id", "customer_id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     customer_name = Column(String(255), nullable=False)
+    customer_id = Column(GUID(), ForeignKey("customers.id", ondelete="SET NULL"))
     number_of_cells = Column(Integer, nullable=False)
     delivery_date = Column(Date, nullable=False)
     larvae_transfer_date = Column(Date, nullable=False)
     status = Column(String(50), default="pending")
     cells_produced = Column(Integer, default=0)          # <-- agregar
     cells_remaining = Column(Integer, default=0)         # <-- agregar
-    created_at = Column(TIMESTAMP)
+    # Celdas entregadas desde stock por el planificador (no son producción)
+    cells_allocated = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP)
\ No newline at end of file
@@ -1,31 +1,17 @@
-from sqlalchemy import Column, Integer, Date, Boolean, TIMESTAMP, ForeignKey, String, DateTime, func
+from sqlalchemy import Column, Integer, Date, Boolean, TIMESTAMP, ForeignKey, String, DateTime, Index, func
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.mysql import CHAR
-from sqlalchemy.types import TypeDecorator
 import uuid
 from app.core.database import Base
-
-# UUID compatible con MySQL (usa CHAR(36))
-class GUID(TypeDecorator):
-    impl = CHAR(36)
-    cache_ok = True  # <--- agregá esta línea
-
-    def process_bind_param(self, value, dialect):
-        if value is None:
-            return None
-        elif isinstance(value, uuid.UUID):
-            return str(value)
-        return str(uuid.UUID(value))
-
-    def process_result_value(self, value, dialect):
-        if value is None:
-            return None
-        return uuid.UUID(value)
+from app.models.types import GUID
 
 # ---------- MODELOS ----------
 
 class StockPackage(Base):
     __tablename__ = "stock_packages"
+    __table_args__ = (
+        Index("ix_stock_packages_user_expired_expiration", "user_id", "is_expired", "expiration_date"),
+        Index("ix_stock_packages_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -36,7 +22,7 @@ class StockPackage(Base):
     sold_cells = Column(Integer, default=0)
     expiration_date = Column(Date, nullable=False)
     is_expired = Column(Boolean, default=False)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP, onupdate=func.now())
 
     # Relación con ventas
@@ -45,10 +31,15 @@ class StockPackage(Base):
 
 class StockSale(Base):
     __tablename__ = "stock_sales"
+    __table_args__ = (
+        Index("ix_stock_sales_package_sale_date", "stock_package_id", "sale_date"),
+        Index("ix_stock_sales_customer", "customer_id"),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     stock_package_id = Column(GUID(), ForeignKey("stock_packages.id", ondelete="CASCADE"))
     customer_name = Column(String(255), nullable=False)
+    customer_id = Column(GUID(), ForeignKey("customers.id", ondelete="SET NULL"))
     cells_sold = Column(Integer, nullable=False)
     sale_date = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,35 @@
+import uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import BINARY, TypeDecorator
+
+
+class GUID(TypeDecorator):
+    """
+    UUID para claves primarias y foráneas: UUID nativo en PostgreSQL y
+    BINARY(16) en MySQL/SQLite (16 bytes en vez de los 36 de un CHAR).
+    En Python siempre es uuid.UUID; también acepta str y bytes al bindear.
+    """
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(bytes=value) if isinstance(value, bytes) else uuid.UUID(value)
+        if dialect.name == "postgresql":
+            return value
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, str):
+            # Filas todavía no migradas por v0004
+            return uuid.UUID(value)
+        return uuid.UUID(bytes=bytes(value))
@@ -1,15 +1,45 @@
-from sqlalchemy import Column, String, TIMESTAMP
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, TIMESTAMP, delete, event, insert
+from datetime import datetime, timedelta
 import uuid
 from app.core.database import Base
+from app.models.types import GUID
+from app.core.user_cache import user_cache
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     name = Column(String(255), nullable=False)
     role = Column(String(50), default="beekeeper")
     created_at = Column(TIMESTAMP, nullable=False)
-    updated_at = Column(TIMESTAMP, nullable=False)
\ No newline at end of file
+    updated_at = Column(TIMESTAMP, nullable=False)
+
+
+class UserInvalidation(Base):
+    """
+    Registro de cambios de usuarios que lee cada worker para invalidar su
+    user_cache (ver app/core/user_cache.py). Sin FK: sobrevive al borrado.
+    """
+    __tablename__ = "user_invalidations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(GUID(), nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False)
+
+
+# Los registros más viejos que esto ya no le sirven a ningún worker
+INVALIDATION_RETENTION = timedelta(hours=1)
+
+
+# Cualquier cambio en un usuario invalida sus entradas cacheadas en get_current_user:
+# en este proceso al instante y en los demás workers en su próxima sincronización
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    now = datetime.utcnow()
+    table = UserInvalidation.__table__
+    connection.execute(delete(table).where(table.c.created_at < now - INVALIDATION_RETENTION))
+    connection.execute(insert(table).values(user_id=target.id, created_at=now))
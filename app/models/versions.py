@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+from app.models.types import GUID
+
+
+class CollectionVersion(Base):
+    """
+    Versión por usuario de cada colección (orders, productions, ...).
+    Se incrementa en cada escritura; sirve como "versión de datos" para
+    cachés y ETags sin tener que leer las filas.
+    """
+    __tablename__ = "collection_versions"
+
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    collection = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
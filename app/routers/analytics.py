@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.models.user import User
+from app.routers.auth import get_async_db, get_current_user_async
+from app.schemas.analytics import HiveMonthOut
+from app.services import hive_stats
+
+router = APIRouter()
+
+
+def _months_back(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@router.get("/hives", response_model=List[HiveMonthOut])
+async def get_hive_trends(
+    from_month: Optional[date] = Query(None, description="Primer mes (se toma el mes de la fecha)"),
+    to_month: Optional[date] = Query(None, description="Último mes inclusive; por defecto el actual"),
+    hive_name: Optional[str] = Query(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Tasa de aceptación y producción por colmena y mes de traslarve.
+
+    Se lee de hive_monthly_stats, que mantienen las escrituras de
+    producciones (ver app/services/hive_stats.py). Sin rango devuelve los
+    últimos 12 meses.
+    """
+    to_month = hive_stats.month_of(to_month or date.today())
+    from_month = hive_stats.month_of(from_month) if from_month else _months_back(to_month, hive_stats.DEFAULT_MONTHS - 1)
+    if from_month > to_month:
+        raise HTTPException(status_code=400, detail="from_month no puede ser posterior a to_month")
+    return await db.run_sync(hive_stats.read_trends, current_user.id, from_month, to_month, hive_name)
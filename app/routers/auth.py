@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.models.user import User
+from sqlalchemy import func, select
+from app.core.database import AsyncSessionLocal, SessionLocal, ThreadpoolSession, ThreadpoolSessionLocal
+from app.models.user import User, UserInvalidation
 from app.schemas.user import UserCreate, UserLogin, UserOut
-from passlib.context import CryptContext
+from app.core.passwords import password_service
 from jose import jwt
 from uuid import uuid4
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.core.user_cache import user_cache
 from uuid import UUID  # ✅ IMPORTANTE: agregá esto al inicio
 
 
@@ -16,7 +19,6 @@ from jose import JWTError  # también te falta este import
 
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_db():
@@ -26,28 +28,94 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    # Con DB_ASYNC=false no hay engine async: misma interfaz sobre la sesión sync
+    if AsyncSessionLocal is None:
+        db = ThreadpoolSession(ThreadpoolSessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_user_id(token: str) -> UUID:
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
         user_id_str = payload.get("sub")
         if user_id_str is None:
-            raise credentials_exception
-        user_id = UUID(user_id_str)  # ✅ CONVERSIÓN CRÍTICA
+            raise _credentials_exception()
+        return UUID(user_id_str)  # ✅ CONVERSIÓN CRÍTICA
     except (JWTError, ValueError):  # ✅ Manejo de error si no es un UUID válido
-        raise credentials_exception
+        raise _credentials_exception()
+
+
+def _sync_user_cache(db: Session):
+    """
+    Aplica al cache las invalidaciones registradas por otros workers.
+    La primera vez solo toma el último id: el cache arranca vacío.
+    """
+    if not user_cache.claim_sync():
+        return
+    if user_cache.last_invalidation_id is None:
+        last_id = db.execute(select(func.max(UserInvalidation.id))).scalar()
+        user_cache.last_invalidation_id = last_id or 0
+        return
+    rows = db.execute(
+        select(UserInvalidation.id, UserInvalidation.user_id)
+        .where(UserInvalidation.id > user_cache.last_invalidation_id)
+        .order_by(UserInvalidation.id)
+    ).all()
+    user_cache.apply_invalidations(rows)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    user_id = _token_user_id(token)
+    _sync_user_cache(db)
+    user = user_cache.get(user_id, token)
+    if user is not None:
+        return user
 
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    # Se desvincula de la sesión para poder compartirlo entre requests
+    db.expunge(user)
+    user_cache.set(user_id, token, user)
+    return user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db=Depends(get_async_db)):
+    """
+    Igual que get_current_user para los handlers async: comparte la sesión
+    del request y no ocupa un thread del pool.
+    """
+    user_id = _token_user_id(token)
+    if user_cache.sync_due():
+        await db.run_sync(_sync_user_cache)
+    user = user_cache.get(user_id, token)
+    if user is not None:
+        return user
+
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if user is None:
+        raise _credentials_exception()
+    db.expunge(user)
+    user_cache.set(user_id, token, user)
     return user
 
 
@@ -61,12 +129,43 @@ def create_access_token(data: dict):
 def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
+def _save_user(db: Session, user: User):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _store_rehashed_password(user_id: UUID, old_hash: str, new_hash: str):
+    # Solo reemplaza el hash si no cambió mientras tanto (p. ej. cambio de contraseña)
+    db = SessionLocal()
+    try:
+        updated = db.query(User).filter(
+            User.id == user_id,
+            User.password_hash == old_hash
+        ).update({User.password_hash: new_hash}, synchronize_session=False)
+        db.commit()
+        if updated:
+            password_service.rehashed += 1
+    finally:
+        db.close()
+
+
+async def _rehash_password(user_id: UUID, password: str, old_hash: str):
+    new_hash = await password_service.hash(password)
+    await run_in_threadpool(_store_rehashed_password, user_id, old_hash, new_hash)
+
+
 @router.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_get_user_by_email, db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_pw = pwd_context.hash(user.password)
+    hashed_pw = await password_service.hash(user.password)
     new_user = User(
         id=uuid4(),
         email=user.email,
@@ -75,18 +174,19 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    return await run_in_threadpool(_save_user, db, new_user)
 
 
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not pwd_context.verify(user.password, db_user.password_hash):
+async def login(user: UserLogin, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(_get_user_by_email, db, user.email)
+    if not db_user or not await password_service.verify(user.password, db_user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # Hashes generados con otro BCRYPT_ROUNDS se regeneran después de responder
+    if password_service.needs_rehash(db_user.password_hash):
+        background_tasks.add_task(_rehash_password, db_user.id, user.password, db_user.password_hash)
+
     token = create_access_token({"sub": str(db_user.id)})
 
     user_out = UserOut.from_orm(db_user)
@@ -95,4 +195,4 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
         "access_token": token,
         "token_type": "bearer",
         "user": user_out
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+from app.models.customer import Customer
+from app.models.user import User
+from app.routers.auth import get_async_db, get_current_user_async
+from app.schemas.customer import CustomerOut, CustomerUpdate
+from app.services import collection_versions, customers
+from app.services.customers import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=List[CustomerOut])
+async def search_customers(
+    q: str = Query(..., min_length=1, max_length=255, description="Texto contenido en el nombre"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Clientes cuyo nombre contiene `q` (sin distinguir mayúsculas ni acentos),
+    primero los que empiezan con `q`.
+    """
+    return await db.run_sync(customers.search, current_user.id, q, limit)
+
+
+@router.get("/autocomplete", response_model=List[CustomerOut])
+async def autocomplete_customers(
+    prefix: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Clientes cuyo nombre empieza con `prefix`, en orden alfabético.
+    """
+    return await db.run_sync(customers.autocomplete, current_user.id, prefix, limit)
+
+
+async def _get_user_customer(db: AsyncSession, customer_id: UUID, user_id):
+    customer = await db.scalar(select(Customer).where(Customer.id == customer_id, Customer.user_id == user_id))
+    if customer is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente no encontrado.")
+    return customer
+
+
+@router.put("/{customer_id}", response_model=CustomerOut)
+async def rename_customer(
+    customer_id: UUID,
+    data: CustomerUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    customer = await _get_user_customer(db, customer_id, current_user.id)
+    try:
+        await db.run_sync(customers.rename, customer, data.name)
+    except customers.CustomerExists as exc:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except ValueError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    await db.commit()
+    return customer
+
+
+@router.delete("/{customer_id}")
+async def delete_customer(
+    customer_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Borra el cliente; sus pedidos y ventas conservan el nombre cargado.
+    """
+    customer = await _get_user_customer(db, customer_id, current_user.id)
+    await db.run_sync(customers.delete, customer)
+    await db.run_sync(collection_versions.bump, current_user.id, collection_versions.ORDERS)
+    await db.commit()
+    return {"detail": "Customer deleted"}
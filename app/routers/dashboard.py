@@ -1,75 +1,40 @@
 # app/routers/dashboard.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
-from app.core.database import SessionLocal
-from app.routers.auth import get_current_user, get_db
+from app.routers.auth import get_async_db, get_current_user_async
 from app.models.user import User
-from app.models.stock import StockPackage, StockSale
+from app.models.stock import StockPackage
 from app.models.order import CustomerOrder
 from app.schemas.dashboard import StatsOut, UpcomingItem, ExpiringItem
+from app.services import dashboard_summary
 from typing import List
-from sqlalchemy import func
 
 
 
 router = APIRouter()
 
 @router.get("/stats", response_model=StatsOut)
-def get_dashboard_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
     """
     Obtiene estadísticas clave del dashboard para el usuario actual.
-    """
-    # Total de celdas disponibles
-    total_available_cells = db.query(
-        func.sum(StockPackage.available_cells)
-    ).filter(
-        StockPackage.user_id == current_user.id,
-        StockPackage.is_expired == False
-    ).scalar() or 0
-
-    # Órdenes pendientes
-    pending_orders = db.query(CustomerOrder).filter(
-        CustomerOrder.user_id == current_user.id,
-        CustomerOrder.status == 'pending'
-    ).count()
-
-    # Stock por expirar (en los próximos 7 días)
-    expiring_date = date.today() + timedelta(days=7)
-    expiring_stock = db.query(StockPackage).filter(
-        StockPackage.user_id == current_user.id,
-        StockPackage.is_expired == False,
-        StockPackage.expiration_date <= expiring_date
-    ).count()
 
-    # Ventas en los últimos 30 días
-    last_30_days = date.today() - timedelta(days=30)
-    sales_last_30_days = db.query(
-        func.sum(StockSale.cells_sold)
-    ).join(
-        StockPackage, StockPackage.id == StockSale.stock_package_id
-    ).filter(
-        StockPackage.user_id == current_user.id,
-        StockSale.sale_date >= last_30_days
-    ).scalar() or 0
-
-    return StatsOut(
-        total_available_cells=total_available_cells,
-        pending_orders=pending_orders,
-        expiring_stock=expiring_stock,
-        total_sales_last_30_days=sales_last_30_days
-    )
+    Se leen del resumen por usuario que mantienen las escrituras de stock,
+    pedidos y producciones (ver app/services/dashboard_summary.py).
+    """
+    return StatsOut(**await db.run_sync(dashboard_summary.read_stats, current_user.id))
 
 @router.get("/upcoming", response_model=List[UpcomingItem])
-def get_upcoming_events(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_upcoming_events(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
     """
     Obtiene los próximos pedidos de clientes que se deben preparar.
     """
-    upcoming_orders = db.query(CustomerOrder).filter(
+    upcoming_orders = (await db.scalars(select(CustomerOrder).where(
         CustomerOrder.user_id == current_user.id,
         CustomerOrder.status.in_(['pending', 'in_production']),
         CustomerOrder.larvae_transfer_date >= date.today()
-    ).order_by(CustomerOrder.larvae_transfer_date).limit(10).all()
+    ).order_by(CustomerOrder.larvae_transfer_date).limit(10))).all()
 
     return [
         UpcomingItem(
@@ -84,16 +49,16 @@ def get_upcoming_events(db: Session = Depends(get_db), current_user: User = Depe
 
 
 @router.get("/expiring", response_model=List[ExpiringItem])
-def get_expiring_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_expiring_stock(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
     """
     Obtiene los paquetes de stock que están cerca de expirar.
     """
     expiring_date = date.today() + timedelta(days=7)
-    expiring_stock = db.query(StockPackage).filter(
+    expiring_stock = (await db.scalars(select(StockPackage).where(
         StockPackage.user_id == current_user.id,
         StockPackage.is_expired == False,
         StockPackage.available_cells > 0,
         StockPackage.expiration_date <= expiring_date
-    ).order_by(StockPackage.expiration_date).all()
+    ).order_by(StockPackage.expiration_date))).all()
     
     return expiring_stock
\ No newline at end of file
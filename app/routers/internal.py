@@ -0,0 +1,89 @@
+# app/routers/internal.py
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from app.core.artifact_cache import artifact_cache
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.core.metrics import registry
+from app.core.passwords import password_service
+from app.core.pool_metrics import pool_stats
+from app.core.user_cache import user_cache
+from app.services.expiration_sweeper import expiration_sweeper
+from app.services.report_jobs import report_jobs
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """
+    Exige el header X-Internal-Token. Sin INTERNAL_TOKEN configurado los
+    endpoints internos no existen (404): nunca quedan públicos por omisión.
+    """
+    if not settings.INTERNAL_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(x_internal_token or "", settings.INTERNAL_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/user-cache")
+def get_user_cache_stats():
+    """
+    Hits/misses del cache de usuarios autenticados.
+    """
+    return user_cache.stats()
+
+
+@router.get("/passwords")
+def get_password_service_stats():
+    """
+    Profundidad de cola y operaciones en curso del pool de bcrypt.
+    """
+    return password_service.stats()
+
+
+@router.get("/report-jobs")
+def get_report_job_stats():
+    """
+    Jobs de PDF pendientes/terminados y tiempos de cola y render, para dimensionar el pool.
+    """
+    return report_jobs.stats()
+
+
+@router.get("/report-cache")
+def get_report_cache_stats():
+    """
+    Tamaño y aciertos de la caché de reportes generados.
+    """
+    return artifact_cache.stats()
+
+
+@router.get("/expiration-sweeper")
+def get_expiration_sweeper_stats():
+    """
+    Duración y filas marcadas del último barrido de paquetes vencidos.
+    """
+    return expiration_sweeper.stats()
+
+
+@router.get("/db-pool")
+def get_db_pool_stats():
+    """
+    Conexiones en uso, overflow, espera de checkout y churn de ambos pools
+    ("async" es None con DB_ASYNC=false).
+    Una espera promedio creciente con checked_out == size + max_overflow
+    indica requests encolados en el pool.
+    """
+    return {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine) if async_engine is not None else None,
+    }
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Latencia, status y sentencias SQL por ruta en formato de texto de Prometheus.
+    """
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
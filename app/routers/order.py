@@ -1,63 +1,145 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from typing import Optional
+from app.core.etag import etag_matches, not_modified, with_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_rows_async
+from app.core.serialization import PageSerializer, columns_for
 from app.models.order import CustomerOrder
 from app.schemas.order import OrderCreate, OrderOut
-from app.routers.auth import get_current_user, get_db
+from app.schemas.fulfillment import FulfillmentPlanOut
+from app.schemas.imports import ImportResult
+from app.schemas.pagination import Page
+from app.services import collection_versions, customers, dashboard_summary, fulfillment, stock_allocation
+from app.routers.auth import get_current_user, get_current_user_async, get_async_db, get_db
 from app.models.user import User
 from uuid import UUID, uuid4
 from datetime import datetime
 
 router = APIRouter()
 
-@router.get("/", response_model=list[OrderOut])
-def get_orders(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(CustomerOrder).filter(CustomerOrder.user_id == current_user.id).all()
+ORDER_LIST_COLUMNS = columns_for(OrderOut, CustomerOrder)
+order_page = PageSerializer(OrderOut)
+
+
+async def _get_user_order(db: AsyncSession, order_id: UUID, user_id):
+    order = await db.scalar(select(CustomerOrder).where(CustomerOrder.id == order_id, CustomerOrder.user_id == user_id))
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+
+def _orders_written(db, user_id, pending: int):
+    dashboard_summary.orders_changed(db, user_id, pending)
+    collection_versions.bump(db, user_id, collection_versions.ORDERS)
+
+
+@router.get("/", response_model=Page[OrderOut])
+async def get_orders(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    etag = await db.run_sync(collection_versions.etag, current_user.id, collection_versions.ORDERS, cursor, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = select(*ORDER_LIST_COLUMNS).where(CustomerOrder.user_id == current_user.id)
+    rows, next_cursor = await paginate_rows_async(db, stmt, CustomerOrder, cursor, limit)
+    return with_etag(order_page.response(rows, next_cursor), etag)
 
 
 @router.post("/", response_model=OrderOut)
-def create_order(order: OrderCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
     new_order = CustomerOrder(
         id=uuid4(),
         user_id=current_user.id,
         **order.dict(),
+        customer_id=await db.run_sync(customers.resolve, current_user.id, order.customer_name),
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    await db.run_sync(_orders_written, current_user.id, dashboard_summary.pending_delta(None, new_order.status))
+    await db.commit()
+    await db.refresh(new_order)
     return new_order
 
 
+@router.post("/import", response_model=ImportResult)
+def import_orders(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Importa pedidos desde un CSV (encabezados = campos del schema de alta).
+    Las filas válidas se insertan por bloques; las inválidas vuelven en `errors`.
+    """
+    from app.services import csv_import
+
+    try:
+        return csv_import.import_orders(db, current_user.id, file.file)
+    except csv_import.InvalidHeader as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El archivo debe estar en UTF-8")
+
+
+@router.get("/fulfillment-plan", response_model=FulfillmentPlanOut)
+async def get_fulfillment_plan(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    """
+    Propone qué paquetes de stock vigentes cubren los pedidos abiertos,
+    por fecha de entrega y usando primero lo que vence antes. No escribe nada.
+    """
+    return await db.run_sync(fulfillment.fulfillment_plan, current_user.id)
+
+
+@router.post("/fulfillment-plan", response_model=FulfillmentPlanOut)
+async def commit_fulfillment_plan(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    """
+    Calcula el plan con los pedidos y paquetes bloqueados y lo registra:
+    una venta por (pedido, paquete) y el avance de cada pedido.
+    """
+    try:
+        result = await db.run_sync(fulfillment.fulfillment_plan, current_user.id, True)
+    except stock_allocation.StockChanged as exc:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    await db.commit()
+    return result
+
+
 @router.get("/{order_id}", response_model=OrderOut)
-def get_order(order_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    order = db.query(CustomerOrder).filter(CustomerOrder.id == order_id, CustomerOrder.user_id == current_user.id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    return order
+async def get_order(order_id: UUID, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    return await _get_user_order(db, order_id, current_user.id)
 
 
 @router.put("/{order_id}", response_model=OrderOut)
-def update_order(order_id: UUID, order_update: OrderCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    order = db.query(CustomerOrder).filter(CustomerOrder.id == order_id, CustomerOrder.user_id == current_user.id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+async def update_order(order_id: UUID, order_update: OrderCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    order = await _get_user_order(db, order_id, current_user.id)
 
+    old_status = order.status
+    if order_update.customer_name != order.customer_name:
+        order.customer_id = await db.run_sync(customers.resolve, current_user.id, order_update.customer_name)
     for key, value in order_update.dict().items():
         setattr(order, key, value)
     order.updated_at = datetime.utcnow()
+    await db.run_sync(_orders_written, current_user.id, dashboard_summary.pending_delta(old_status, order.status))
 
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    await db.refresh(order)
     return order
 
 
 @router.delete("/{order_id}")
-def delete_order(order_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    order = db.query(CustomerOrder).filter(CustomerOrder.id == order_id, CustomerOrder.user_id == current_user.id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    db.delete(order)
-    db.commit()
+async def delete_order(order_id: UUID, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    order = await _get_user_order(db, order_id, current_user.id)
+    await db.delete(order)
+    await db.run_sync(_orders_written, current_user.id, dashboard_summary.pending_delta(order.status, None))
+    await db.commit()
     return {"detail": "Order deleted"}
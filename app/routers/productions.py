@@ -1,46 +1,116 @@
 from app.models.order import CustomerOrder
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime, date
-from app.core.database import SessionLocal
-from app.models.production import ProductionHive, ProductionRecord
+from app.core.etag import etag_matches, not_modified, with_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_rows_async
+from app.core.serialization import JSONBytesResponse, PageSerializer, columns_for
+from app.models.production import Hive, ProductionHive, ProductionRecord
+from app.models.stock import StockPackage, StockSale
 from app.schemas.production import (
     ProductionCreate,
     ProductionOut,
     ProductionAcceptanceUpdate,
 )
-from app.routers.auth import get_current_user, get_db
+from app.schemas.imports import ImportResult
+from app.schemas.pagination import Page
+from app.services import collection_versions, dashboard_summary, hive_stats
+from app.routers.auth import get_current_user, get_current_user_async, get_async_db, get_db
 from sqlalchemy.orm import selectinload
 from app.models.user import User
 
 router = APIRouter()
 
+PRODUCTION_LIST_COLUMNS = columns_for(ProductionOut, ProductionRecord, exclude={"hives"})
+production_page = PageSerializer(ProductionOut)
 
-@router.get("/", response_model=list[ProductionOut])
-def get_productions(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-):
-    productions = (
-        db.query(ProductionRecord)
+
+def hives_select(production_ids):
+    return select(Hive.production_id, Hive.hive_name, Hive.created_at).where(Hive.production_id.in_(production_ids))
+
+
+def production_items(rows, hive_rows):
+    """
+    Arma los dicts de ProductionOut a partir de las filas de producción y de colmenas.
+    """
+    hives = {}
+    for hive in hive_rows:
+        hives.setdefault(hive.production_id, []).append({"hive_name": hive.hive_name, "created_at": hive.created_at})
+    return [{**row._asdict(), "hives": hives.get(row.id, [])} for row in rows]
+
+
+async def _get_user_production(db: AsyncSession, production_id, user_id, reload: bool = False):
+    # Las colmenas se cargan de antemano: en una AsyncSession no hay lazy loading
+    stmt = (
+        select(ProductionRecord)
         .options(selectinload(ProductionRecord.hives))
-        .filter(ProductionRecord.user_id == current_user.id)
-        .all()
+        .where(
+            ProductionRecord.id == production_id,
+            ProductionRecord.user_id == user_id,
+        )
     )
+    if reload:
+        stmt = stmt.execution_options(populate_existing=True)
+    record = await db.scalar(stmt)
+    if not record:
+        raise HTTPException(status_code=404, detail="Production record not found")
+    return record
 
-    for p in productions:
-        print(f"Producción {p.id} tiene {len(p.hives)} colmenas")
 
-    return productions
+def _delete_production_stock(db: Session, user_id, production_id):
+    """
+    Borra los paquetes de la producción y sus ventas (lo mismo que haría el
+    ON DELETE CASCADE) y los descuenta del resumen del dashboard.
+    """
+    packages = db.execute(
+        select(StockPackage.id, StockPackage.expiration_date, StockPackage.available_cells, StockPackage.is_expired)
+        .where(StockPackage.production_id == production_id, StockPackage.user_id == user_id)
+    ).all()
+    if not packages:
+        return False
+    package_ids = [package.id for package in packages]
+    sales = db.execute(
+        select(StockSale.sale_date, StockSale.cells_sold).where(StockSale.stock_package_id.in_(package_ids))
+    ).all()
+    db.execute(delete(StockSale).where(StockSale.stock_package_id.in_(package_ids)))
+    db.execute(delete(StockPackage).where(StockPackage.id.in_(package_ids)))
+    dashboard_summary.packages_deleted(
+        db, user_id,
+        [(package.expiration_date, package.available_cells) for package in packages if not package.is_expired],
+        [(sale.sale_date, sale.cells_sold) for sale in sales],
+    )
+    return True
+
+
+@router.get("/", response_model=Page[ProductionOut])
+async def get_productions(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    etag = await db.run_sync(collection_versions.etag, current_user.id, collection_versions.PRODUCTIONS, cursor, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = select(*PRODUCTION_LIST_COLUMNS).where(ProductionRecord.user_id == current_user.id)
+    rows, next_cursor = await paginate_rows_async(db, stmt, ProductionRecord, cursor, limit)
+    hive_rows = (await db.execute(hives_select([row.id for row in rows]))).all() if rows else []
+    return with_etag(JSONBytesResponse(production_page.dump(production_items(rows, hive_rows), next_cursor)), etag)
 
 
 @router.post("/", response_model=ProductionOut)
-def create_production(
+async def create_production(
     prod: ProductionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    production_id = str(uuid4())
+    production_id = uuid4()
     new_record = ProductionRecord(
         id=production_id,
         user_id=current_user.id,
@@ -60,18 +130,19 @@ def create_production(
 
     for hive in prod.hives:
         new_hive = ProductionHive(
-            id=str(uuid4()), production_id=production_id, hive_name=hive.hive_name
+            id=uuid4(), production_id=production_id, hive_name=hive.hive_name
         )
         db.add(new_hive)
 
     # Lógica para actualizar orden vinculada
     if prod.order_id:
-        order = (
-            db.query(CustomerOrder).filter(CustomerOrder.id == prod.order_id).first()
+        order = await db.scalar(
+            select(CustomerOrder).where(CustomerOrder.id == prod.order_id)
         )
         if order:
+            old_status = order.status
             order.cells_produced = (order.cells_produced or 0) + prod.cells_produced
-            remaining = order.number_of_cells - order.cells_produced
+            remaining = order.number_of_cells - order.cells_produced - (order.cells_allocated or 0)
             if remaining > 0:
                 order.status = "in_production"
                 order.cells_remaining = remaining
@@ -79,102 +150,109 @@ def create_production(
                 order.status = "completed"
                 order.cells_remaining = 0
             db.add(order)
+            await db.run_sync(dashboard_summary.orders_changed, order.user_id, dashboard_summary.pending_delta(old_status, order.status))
+            await db.run_sync(collection_versions.bump, order.user_id, collection_versions.ORDERS)
 
-    db.commit()
-    db.refresh(new_record)
+    created = hive_stats.snapshot(
+        [hive.hive_name for hive in prod.hives], prod.transfer_date,
+        prod.larvae_transferred, prod.accepted_cells, prod.cells_produced,
+    )
+    await db.run_sync(hive_stats.production_changed, current_user.id, None, created)
+    await db.run_sync(collection_versions.bump, current_user.id, collection_versions.PRODUCTIONS)
+    await db.commit()
 
-    return new_record
+    return await _get_user_production(db, production_id, current_user.id, reload=True)
 
 
-@router.get("/{production_id}", response_model=ProductionOut)
-def get_production(
-    production_id: UUID,
+@router.post("/import", response_model=ImportResult)
+def import_productions(
+    file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    record = (
-        db.query(ProductionRecord)
-        .filter(
-            ProductionRecord.id == production_id,
-            ProductionRecord.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not record:
-        raise HTTPException(status_code=404, detail="Production record not found")
-    return record
+    """
+    Importa producciones desde un CSV (encabezados = campos del schema de alta).
+    Las filas válidas se insertan por bloques; las inválidas vuelven en `errors`.
+    """
+    from app.services import csv_import
+
+    try:
+        return csv_import.import_productions(db, current_user.id, file.file)
+    except csv_import.InvalidHeader as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El archivo debe estar en UTF-8")
+
+
+@router.get("/{production_id}", response_model=ProductionOut)
+async def get_production(
+    production_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await _get_user_production(db, production_id, current_user.id)
 
 
 @router.put("/{production_id}", response_model=ProductionOut)
-def update_production(
+async def update_production(
     production_id: UUID,
     prod: ProductionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    record = (
-        db.query(ProductionRecord)
-        .filter(
-            ProductionRecord.id == production_id,
-            ProductionRecord.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not record:
-        raise HTTPException(status_code=404, detail="Production record not found")
+    record = await _get_user_production(db, production_id, current_user.id)
+    hive_names = await db.run_sync(hive_stats.hive_names, production_id)
+    before = hive_stats.of_record(record, hive_names)
 
-    for key, value in prod.dict().items():
+    # Las colmenas no se reemplazan desde este endpoint
+    for key, value in prod.dict(exclude={"hives"}).items():
         setattr(record, key, value)
     record.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(record)
-    return record
+    await db.run_sync(hive_stats.production_changed, current_user.id, before, hive_stats.of_record(record, hive_names))
+
+    await db.run_sync(collection_versions.bump, current_user.id, collection_versions.PRODUCTIONS)
+    await db.commit()
+    return await _get_user_production(db, production_id, current_user.id, reload=True)
 
 
 @router.put("/{production_id}/acceptance", response_model=ProductionOut)
-def update_acceptance(
+async def update_acceptance(
     production_id: UUID,
     acceptance: ProductionAcceptanceUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    record = (
-        db.query(ProductionRecord)
-        .filter(
-            ProductionRecord.id == production_id,
-            ProductionRecord.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not record:
-        raise HTTPException(status_code=404, detail="Production record not found")
+    record = await _get_user_production(db, production_id, current_user.id)
+    hive_names = await db.run_sync(hive_stats.hive_names, production_id)
+    before = hive_stats.of_record(record, hive_names)
 
     record.accepted_cells = acceptance.accepted_cells
     record.acceptance_date = acceptance.acceptance_date or date.today()
     record.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(record)
-    return record
+    await db.run_sync(hive_stats.production_changed, current_user.id, before, hive_stats.of_record(record, hive_names))
+
+    await db.run_sync(collection_versions.bump, current_user.id, collection_versions.PRODUCTIONS)
+    await db.commit()
+    return await _get_user_production(db, production_id, current_user.id, reload=True)
 
 
 @router.delete("/{production_id}")
-def delete_production(
+async def delete_production(
     production_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    record = (
-        db.query(ProductionRecord)
-        .filter(
-            ProductionRecord.id == production_id,
-            ProductionRecord.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not record:
-        raise HTTPException(status_code=404, detail="Production record not found")
-    db.delete(record)
-    db.commit()
+    record = await _get_user_production(db, production_id, current_user.id)
+    hive_names = await db.run_sync(hive_stats.hive_names, production_id)
+    await db.run_sync(hive_stats.production_changed, current_user.id, hive_stats.of_record(record, hive_names), None)
+    stock_deleted = await db.run_sync(_delete_production_stock, current_user.id, production_id)
+    await db.delete(record)
+    collections = [collection_versions.PRODUCTIONS]
+    if stock_deleted:
+        collections.append(collection_versions.STOCK)
+    await db.run_sync(collection_versions.bump, current_user.id, *collections)
+    await db.commit()
     return {"detail": "Production record deleted"}
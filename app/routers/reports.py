@@ -1,75 +1,201 @@
 # app/routers/reports.py
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date
+from app.core.artifact_cache import artifact_cache
 from app.core.database import SessionLocal
+from app.core.etag import etag_matches, make_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from app.core.serialization import JSONBytesResponse
 from app.routers.auth import get_current_user, get_db
+from app.routers.order import ORDER_LIST_COLUMNS, order_page
+from app.routers.productions import PRODUCTION_LIST_COLUMNS, hives_select, production_items, production_page
 from app.models.user import User
 from app.models.order import CustomerOrder
 from app.models.production import ProductionRecord
 from app.schemas.order import OrderOut
 from app.schemas.production import ProductionOut
+from app.schemas.pagination import Page
 from app.schemas.reports import ReportQueryParams
-from app.schemas.reports import ReportType
-
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
+from app.schemas.reports import ReportType, ReportJobOut
+from app.services import collection_versions, customers
+from app.services.report_jobs import report_jobs, STATUS_DONE, STATUS_PENDING, STATUS_FAILED
 from typing import Optional
+from uuid import UUID
 
-import io
-import csv
-from fastapi.responses import StreamingResponse
+import os
+from fastapi.responses import FileResponse, StreamingResponse
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
-@router.get("/orders", response_model=List[OrderOut])
+def _order_history_query(db: Session, current_user: User, start_date=None, end_date=None, status=None, customer_name=None, customer_id=None):
+    query = db.query(CustomerOrder).filter(CustomerOrder.user_id == current_user.id)
+
+    if start_date:
+        query = query.filter(CustomerOrder.created_at >= start_date)
+    if end_date:
+        query = query.filter(CustomerOrder.created_at <= end_date)
+    if status:
+        query = query.filter(CustomerOrder.status == status)
+    if customer_id:
+        query = query.filter(CustomerOrder.customer_id == customer_id)
+    elif customer_name:
+        # Resuelve primero los clientes que coinciden (índice de trigramas) y
+        # filtra los pedidos por customer_id, sin recorrer customer_name
+        query = query.filter(CustomerOrder.customer_id.in_(customers.matching_ids(current_user.id, customer_name)))
+
+    return query
+
+
+def _production_history_query(db: Session, current_user: User, start_date=None, end_date=None, status=None):
+    query = db.query(ProductionRecord).filter(ProductionRecord.user_id == current_user.id)
+
+    if start_date:
+        query = query.filter(ProductionRecord.created_at >= start_date)
+    if end_date:
+        query = query.filter(ProductionRecord.created_at <= end_date)
+    if status:
+        query = query.filter(ProductionRecord.status == status)
+
+    return query
+
+
+@router.get("/orders", response_model=Page[OrderOut])
 def get_order_history(
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user),
     start_date: Optional[date] = Query(None, description="Filtrar pedidos desde esta fecha"),
     end_date: Optional[date] = Query(None, description="Filtrar pedidos hasta esta fecha"),
     status: Optional[str] = Query(None, description="Filtrar por estado (e.g., 'pending', 'delivered')"),
-    customer_name: Optional[str] = Query(None, description="Filtrar por nombre del cliente")
+    customer_name: Optional[str] = Query(None, description="Filtrar por nombre del cliente (contiene)"),
+    customer_id: Optional[UUID] = Query(None, description="Filtrar por cliente (ver /api/customers/autocomplete)"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto por la página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
 ):
     """
     Obtiene el historial de pedidos de clientes con filtros opcionales.
     """
-    query = db.query(CustomerOrder).filter(CustomerOrder.user_id == current_user.id)
-
-    if start_date:
-        query = query.filter(CustomerOrder.created_at >= start_date)
-    if end_date:
-        query = query.filter(CustomerOrder.created_at <= end_date)
-    if status:
-        query = query.filter(CustomerOrder.status == status)
-    if customer_name:
-        query = query.filter(CustomerOrder.customer_name.ilike(f"%{customer_name}%"))
+    query = _order_history_query(db, current_user, start_date, end_date, status, customer_name, customer_id)
+    rows, next_cursor = paginate(query.with_entities(*ORDER_LIST_COLUMNS), CustomerOrder, cursor, limit)
+    return order_page.response(rows, next_cursor)
 
-    return query.all()
-
-@router.get("/productions", response_model=List[ProductionOut])
+@router.get("/productions", response_model=Page[ProductionOut])
 def get_production_history(
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user),
     start_date: Optional[date] = Query(None, description="Filtrar producciones desde esta fecha"),
     end_date: Optional[date] = Query(None, description="Filtrar producciones hasta esta fecha"),
-    status: Optional[str] = Query(None, description="Filtrar por estado (e.g., 'active', 'expired')")
+    status: Optional[str] = Query(None, description="Filtrar por estado (e.g., 'active', 'expired')"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto por la página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
 ):
     """
     Obtiene el historial de registros de producción con filtros opcionales.
     """
-    query = db.query(ProductionRecord).filter(ProductionRecord.user_id == current_user.id)
+    query = _production_history_query(db, current_user, start_date, end_date, status)
+    rows, next_cursor = paginate(query.with_entities(*PRODUCTION_LIST_COLUMNS), ProductionRecord, cursor, limit)
+    hive_rows = db.execute(hives_select([row.id for row in rows])).all() if rows else []
+    return JSONBytesResponse(production_page.dump(production_items(rows, hive_rows), next_cursor))
+
+
+CSV_CHUNK_ROWS = 500
+
+# Incrementar si cambia el contenido/formato de los archivos generados
+REPORT_FORMAT_VERSION = 1
+
+ORDER_CSV_COLUMNS = [
+    ("ID", CustomerOrder.id),
+    ("Customer Name", CustomerOrder.customer_name),
+    ("Number of Cells", CustomerOrder.number_of_cells),
+    ("Delivery Date", CustomerOrder.delivery_date),
+    ("Status", CustomerOrder.status),
+]
+
+PRODUCTION_CSV_COLUMNS = [
+    ("ID", ProductionRecord.id),
+    ("Transfer Date", ProductionRecord.transfer_date),
+    ("Larvae Transferred", ProductionRecord.larvae_transferred),
+    ("Accepted Cells", ProductionRecord.accepted_cells),
+    ("Cells Produced", ProductionRecord.cells_produced),
+    ("Status", ProductionRecord.status),
+]
+
+
+def _report_filename(report_type: ReportType, extension: str) -> str:
+    return f"{report_type.value}_report.{extension}"
 
-    if start_date:
-        query = query.filter(ProductionRecord.created_at >= start_date)
-    if end_date:
-        query = query.filter(ProductionRecord.created_at <= end_date)
-    if status:
-        query = query.filter(ProductionRecord.status == status)
 
-    return query.all()
+def _report_cache_key(db: Session, current_user: User, report_type: ReportType, extension: str, start_date, end_date) -> str:
+    collection = collection_versions.ORDERS if report_type == ReportType.orders else collection_versions.PRODUCTIONS
+    return artifact_cache.key(
+        user_id=str(current_user.id),
+        report_type=report_type.value,
+        format=extension,
+        filters={"start_date": start_date, "end_date": end_date},
+        data_version=collection_versions.get(db, current_user.id, collection),
+        format_version=REPORT_FORMAT_VERSION,
+    )
+
+
+def _cached_report_response(key: str, extension: str, media_type: str, filename: str, if_none_match: Optional[str]):
+    """
+    304 si el cliente ya tiene esta versión, el archivo cacheado si existe, o None.
+    """
+    etag = make_etag(key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    path = artifact_cache.get(key, extension)
+    if path is None:
+        return None
+    return FileResponse(path, media_type=media_type, headers={
+        "Content-Disposition": f"attachment; filename={filename}",
+        "ETag": etag,
+    })
+
+
+def _iter_csv(build_query, columns, cache_key: Optional[str] = None):
+    """
+    Genera el CSV por bloques de CSV_CHUNK_ROWS filas leídas con un cursor
+    del lado del servidor. Usa su propia sesión porque se consume después
+    de que el handler retornó. Con `cache_key`, lo enviado se guarda también
+    en la caché de artefactos si el envío se completa.
+    """
+    import csv
+    import io
+
+    db = SessionLocal()
+    temp_path = artifact_cache.temp_path("csv") if cache_key else None
+    sink = open(temp_path, "wb") if temp_path else None
+    completed = False
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _ in columns])
+
+        def flush():
+            chunk = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            if sink:
+                sink.write(chunk)
+            return chunk
+
+        query = build_query(db).with_entities(*[column for _, column in columns]).yield_per(CSV_CHUNK_ROWS)
+        for count, row in enumerate(query, 1):
+            writer.writerow(row)
+            if count % CSV_CHUNK_ROWS == 0:
+                yield flush()
+        yield flush()
+        completed = True
+    finally:
+        db.close()
+        if sink:
+            sink.close()
+            if completed:
+                artifact_cache.commit(cache_key, "csv", temp_path)
+            else:
+                os.remove(temp_path)
 
 
 @router.get("/export/csv", response_model=None)
@@ -78,90 +204,175 @@ def export_data_to_csv(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     start_date: Optional[date] = Query(None),
-    end_date: Optional[date] = Query(None)
+    end_date: Optional[date] = Query(None),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Exporta datos de órdenes o producciones a un archivo CSV.
+
+    Las descargas repetidas con los mismos filtros y datos se sirven desde la
+    caché de artefactos, o con 304 si el cliente manda el ETag.
     """
     if report_type == ReportType.orders:
-        records = get_order_history(db, current_user, start_date=start_date, end_date=end_date)
-        if not records:
-            raise HTTPException(status_code=404, detail="No hay datos para exportar")
-        
-        # Preparamos los datos
-        header = ["ID", "Customer Name", "Number of Cells", "Delivery Date", "Status"]
-        data = [[str(r.id), r.customer_name, r.number_of_cells, r.delivery_date, r.status] for r in records]
-        filename = "orders_report.csv"
+        def build_query(session):
+            return _order_history_query(session, current_user, start_date=start_date, end_date=end_date).order_by(CustomerOrder.created_at, CustomerOrder.id)
+        columns = ORDER_CSV_COLUMNS
     
     elif report_type == ReportType.productions:
-        records = get_production_history(db, current_user, start_date=start_date, end_date=end_date)
-        if not records:
-            raise HTTPException(status_code=404, detail="No hay datos para exportar")
-        
-        # Preparamos los datos
-        header = ["ID", "Transfer Date", "Larvae Transferred", "Accepted Cells", "Cells Produced", "Status"]
-        data = [[str(r.id), r.transfer_date, r.larvae_transferred, r.accepted_cells, r.cells_produced, r.status] for r in records]
-        filename = "productions_report.csv"
+        def build_query(session):
+            return _production_history_query(session, current_user, start_date=start_date, end_date=end_date).order_by(ProductionRecord.created_at, ProductionRecord.id)
+        columns = PRODUCTION_CSV_COLUMNS
     
     else:
         raise HTTPException(status_code=400, detail="Tipo de reporte no válido")
 
-    # Escribimos los datos en memoria
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(header)
-    writer.writerows(data)
-    
-    # Preparamos la respuesta de streaming
-    response = StreamingResponse(iter([output.getvalue()]), media_type="text/csv")
+    filename = _report_filename(report_type, "csv")
+    key = _report_cache_key(db, current_user, report_type, "csv", start_date, end_date)
+    cached = _cached_report_response(key, "csv", "text/csv", filename, if_none_match)
+    if cached is not None:
+        return cached
+
+    if not db.query(build_query(db).exists()).scalar():
+        raise HTTPException(status_code=404, detail="No hay datos para exportar")
+
+    # Las filas se leen y codifican a medida que se envían
+    response = StreamingResponse(_iter_csv(build_query, columns, cache_key=key), media_type="text/csv")
     response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    response.headers["ETag"] = make_etag(key)
     return response
 
-@router.get("/export/pdf", response_model=None)
-def export_data_to_pdf(
-    report_type: ReportType,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    start_date: Optional[date] = Query(None),
-    end_date: Optional[date] = Query(None)
-):
+
+def _pdf_data(db: Session, current_user: User, report_type: ReportType, start_date, end_date):
     """
-    Exporta datos de órdenes o producciones a un archivo PDF.
+    Arma encabezado + filas (como strings) del reporte PDF.
     """
     if report_type == ReportType.orders:
-        records = get_order_history(db, current_user, start_date=start_date, end_date=end_date)
+        records = _order_history_query(db, current_user, start_date=start_date, end_date=end_date).with_entities(
+            CustomerOrder.id, CustomerOrder.customer_name, CustomerOrder.number_of_cells,
+            CustomerOrder.delivery_date, CustomerOrder.status
+        ).all()
         if not records:
             raise HTTPException(status_code=404, detail="No hay datos para exportar")
         
         header = ["ID", "Nombre Cliente", "Celdas", "Fecha de Entrega", "Estado"]
         data = [header] + [[str(r.id)[:8] + '...', r.customer_name, str(r.number_of_cells), str(r.delivery_date), r.status] for r in records]
-        filename = "orders_report.pdf"
     
     elif report_type == ReportType.productions:
-        records = get_production_history(db, current_user, start_date=start_date, end_date=end_date)
+        records = _production_history_query(db, current_user, start_date=start_date, end_date=end_date).with_entities(
+            ProductionRecord.id, ProductionRecord.transfer_date, ProductionRecord.larvae_transferred,
+            ProductionRecord.accepted_cells, ProductionRecord.cells_produced, ProductionRecord.status
+        ).all()
         if not records:
             raise HTTPException(status_code=404, detail="No hay datos para exportar")
         
         header = ["ID", "Fecha de Transferencia", "Larvas", "Aceptadas", "Producidas", "Estado"]
         data = [header] + [[str(r.id)[:8] + '...', str(r.transfer_date), str(r.larvae_transferred), str(r.accepted_cells), str(r.cells_produced), r.status] for r in records]
-        filename = "productions_report.pdf"
 
     else:
         raise HTTPException(status_code=400, detail="Tipo de reporte no válido")
 
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-
-    table = Table(data)
-    style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BOX', (0, 0), (-1, -1), 1, colors.black)
-    ])
-    table.setStyle(style)
-    elements.append(table)
-    doc.build(elements)
-    buffer.seek(0)
-    
-    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": f"attachment; filename={filename}"})
\ No newline at end of file
+    return data
+
+
+def _get_job_or_404(job_id: str, current_user: User):
+    job = report_jobs.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    return job
+
+
+def _cache_pdf(key: str):
+    def store(job):
+        artifact_cache.store(key, "pdf", job.path)
+    return store
+
+
+@router.get("/export/pdf", response_model=None)
+def export_data_to_pdf(
+    report_type: ReportType,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Exporta datos de órdenes o producciones a un archivo PDF.
+
+    El render corre en el pool de reportes; este endpoint espera el resultado.
+    Para reportes grandes conviene usar POST /export/pdf/jobs.
+    """
+    filename = _report_filename(report_type, "pdf")
+    key = _report_cache_key(db, current_user, report_type, "pdf", start_date, end_date)
+    cached = _cached_report_response(key, "pdf", "application/pdf", filename, if_none_match)
+    if cached is not None:
+        return cached
+
+    data = _pdf_data(db, current_user, report_type, start_date, end_date)
+    job = report_jobs.submit(current_user.id, report_type.value, filename, data, on_success=_cache_pdf(key), cache_key=key)
+    job = report_jobs.wait(job)
+    if job.status != STATUS_DONE:
+        raise HTTPException(status_code=500, detail="No se pudo generar el PDF")
+
+    return FileResponse(job.path, media_type="application/pdf", headers={
+        "Content-Disposition": f"attachment; filename={filename}",
+        "ETag": make_etag(key),
+    })
+
+
+@router.post("/export/pdf/jobs", response_model=ReportJobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_pdf_export_job(
+    report_type: ReportType,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None)
+):
+    """
+    Encola la generación de un PDF y devuelve el job para consultar su estado.
+    Si el mismo reporte ya está en caché el job se devuelve terminado.
+    """
+    filename = _report_filename(report_type, "pdf")
+    key = _report_cache_key(db, current_user, report_type, "pdf", start_date, end_date)
+    cached_path = artifact_cache.get(key, "pdf")
+    if cached_path is not None:
+        job = report_jobs.adopt(current_user.id, report_type.value, filename, cached_path, cache_key=key)
+    else:
+        data = _pdf_data(db, current_user, report_type, start_date, end_date)
+        job = report_jobs.submit(current_user.id, report_type.value, filename, data, on_success=_cache_pdf(key), cache_key=key)
+    return job.to_dict()
+
+
+@router.get("/export/pdf/jobs/{job_id}", response_model=ReportJobOut)
+def get_pdf_export_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Estado y tiempos (espera en cola, render) de un job de PDF.
+    """
+    return _get_job_or_404(job_id, current_user).to_dict()
+
+
+@router.get("/export/pdf/jobs/{job_id}/download", response_model=None)
+def download_pdf_export_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Descarga el PDF de un job terminado.
+    """
+    job = _get_job_or_404(job_id, current_user)
+    if job.status == STATUS_PENDING:
+        raise HTTPException(status_code=409, detail="El reporte todavía se está generando")
+    if job.status == STATUS_FAILED:
+        raise HTTPException(status_code=500, detail="No se pudo generar el PDF")
+
+    etag = make_etag(job.cache_key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    if not os.path.exists(job.path):
+        raise HTTPException(status_code=410, detail="El reporte ya no está disponible")
+
+    return FileResponse(job.path, media_type="application/pdf", headers={
+        "Content-Disposition": f"attachment; filename={job.filename}",
+        "ETag": etag,
+    })
@@ -1,106 +1,223 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID, uuid4
 from datetime import date, datetime
-from app.core.database import SessionLocal
+from app.core.database import engine
+from app.core.etag import etag_matches, not_modified, with_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_rows_async
+from app.core.serialization import PageSerializer, columns_for
 from app.models.stock import StockPackage, StockSale
-from app.schemas.stock import StockCreate, StockOut, StockSaleCreate, StockSaleOut
-from app.routers.auth import get_current_user, get_db
+from app.schemas.stock import StockAllocationCreate, StockAllocationOut, StockCreate, StockOut, StockSaleCreate, StockSaleOut
+from app.schemas.pagination import Page
+from app.services import collection_versions, customers, dashboard_summary, stock_allocation
+from app.routers.auth import get_async_db, get_current_user_async
 
 from app.models.user import User
 from fastapi import status
 
 router = APIRouter()
 
-@router.get("/", response_model=list[StockOut])
-def get_available_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockPackage).filter(StockPackage.user_id == current_user.id, StockPackage.available_cells > 0, StockPackage.is_expired == False).all()
+STOCK_LIST_COLUMNS = columns_for(StockOut, StockPackage)
+stock_page = PageSerializer(StockOut)
 
+# Reintentos del UPDATE condicional si is_expired cambió entre la lectura y la escritura
+SELL_RETRIES = 3
 
-@router.get("/all", response_model=list[StockOut])
-def get_all_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockPackage).filter(StockPackage.user_id == current_user.id).all()
+
+async def _get_user_package(db: AsyncSession, stock_id: UUID, user_id):
+    stock_package = await db.scalar(
+        select(StockPackage)
+        .where(StockPackage.id == stock_id, StockPackage.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    if not stock_package:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Paquete de stock no encontrado."
+        )
+    return stock_package
+
+@router.get("/", response_model=Page[StockOut])
+async def get_available_stock(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    etag = await db.run_sync(collection_versions.etag, current_user.id, collection_versions.STOCK, "available", cursor, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = select(*STOCK_LIST_COLUMNS).where(StockPackage.user_id == current_user.id, StockPackage.available_cells > 0, StockPackage.is_expired == False)
+    rows, next_cursor = await paginate_rows_async(db, stmt, StockPackage, cursor, limit)
+    return with_etag(stock_page.response(rows, next_cursor), etag)
+
+
+@router.get("/all", response_model=Page[StockOut])
+async def get_all_stock(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    etag = await db.run_sync(collection_versions.etag, current_user.id, collection_versions.STOCK, "all", cursor, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = select(*STOCK_LIST_COLUMNS).where(StockPackage.user_id == current_user.id)
+    rows, next_cursor = await paginate_rows_async(db, stmt, StockPackage, cursor, limit)
+    return with_etag(stock_page.response(rows, next_cursor), etag)
 
 
 @router.post("/", response_model=StockOut)
-def create_stock_package(stock: StockCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_stock_package(stock: StockCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
     new_package = StockPackage(
-        id=UUID(),
+        id=uuid4(),
         user_id=current_user.id,
         **stock.dict(),
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
     db.add(new_package)
-    db.commit()
-    db.refresh(new_package)
+    await db.run_sync(dashboard_summary.stock_added, current_user.id, new_package)
+    await db.run_sync(collection_versions.bump, current_user.id, collection_versions.STOCK)
+    await db.commit()
+    await db.refresh(new_package)
     return new_package
 
 
-@router.post("/{stock_id}/sell", response_model=StockOut, status_code=status.HTTP_201_CREATED)
-def sell_cells_from_stock(
-    stock_id: UUID,
-    sale_data: StockSaleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.post("/sell", response_model=StockAllocationOut, status_code=status.HTTP_201_CREATED)
+async def sell_cells_fifo(
+    sale_data: StockAllocationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    # 1. Buscar el paquete de stock
-    stock_package = db.query(StockPackage).filter(
-        StockPackage.id == stock_id,
-        StockPackage.user_id == current_user.id
-    ).first()
-
-    if not stock_package:
+    """
+    Vende `cells_sold` celdas repartidas entre los paquetes vigentes del
+    usuario, empezando por los que vencen antes. Todo en una transacción.
+    """
+    if sale_data.cells_sold <= 0:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Paquete de stock no encontrado."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El número de celdas vendidas debe ser mayor a 0."
         )
 
-    # 2. Validar que hay suficientes celdas disponibles
+    for _ in range(SELL_RETRIES):
+        try:
+            sales = await db.run_sync(
+                stock_allocation.sell, current_user.id, sale_data.customer_name, sale_data.cells_sold
+            )
+            break
+        except stock_allocation.InsufficientStock as exc:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        except stock_allocation.StockChanged:
+            # Otra venta tocó los paquetes: se vuelve a leer en una transacción nueva
+            await db.rollback()
+    else:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(stock_allocation.StockChanged()))
+
+    await db.commit()
+    return StockAllocationOut(customer_name=sale_data.customer_name, cells_sold=sale_data.cells_sold, sales=sales)
+
+
+@router.post("/{stock_id}/sell", response_model=StockOut, status_code=status.HTTP_201_CREATED)
+async def sell_cells_from_stock(
+    stock_id: UUID,
+    sale_data: StockSaleCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    # 1. Validar la cantidad
     if sale_data.cells_sold <= 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El número de celdas vendidas debe ser mayor a 0."
         )
 
-    if stock_package.available_cells < sale_data.cells_sold:
+    # 2. Descontar las celdas con un UPDATE condicional: la cantidad de filas
+    # afectadas decide si la venta entra, sin SELECT ... FOR UPDATE previo.
+    # is_expired se incluye en la condición porque define si la venta cuenta
+    # en el dashboard; si cambió en el medio se reintenta con el valor nuevo.
+    # El mismo UPDATE marca el paquete como expirado si queda en 0 y, donde
+    # hay RETURNING, devuelve la fila actualizada sin otro SELECT.
+    for attempt in range(SELL_RETRIES):
+        if attempt:
+            # Transacción nueva: con REPEATABLE READ la relectura vería la
+            # misma foto y una venta concurrente terminaría en 409, no en 400.
+            await db.rollback()
+        stock_package = await _get_user_package(db, stock_id, current_user.id)
+        if stock_package.available_cells < sale_data.cells_sold:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Celdas insuficientes en el paquete. Disponibles: {stock_package.available_cells}"
+            )
+        counted_in_stock = not stock_package.is_expired
+        stmt = (
+            update(StockPackage)
+            .where(
+                StockPackage.id == stock_id,
+                StockPackage.user_id == current_user.id,
+                StockPackage.is_expired == stock_package.is_expired,
+                StockPackage.available_cells >= sale_data.cells_sold,
+            )
+            .values(
+                available_cells=StockPackage.available_cells - sale_data.cells_sold,
+                sold_cells=StockPackage.sold_cells + sale_data.cells_sold,
+                is_expired=case(
+                    (StockPackage.available_cells - sale_data.cells_sold <= 0, True),
+                    else_=StockPackage.is_expired,
+                ),
+            )
+        )
+        if engine.dialect.update_returning:
+            updated = (await db.execute(
+                stmt.returning(StockPackage).execution_options(populate_existing=True, synchronize_session=False)
+            )).scalar_one_or_none()
+            if updated is not None:
+                break
+        elif (await db.execute(stmt.execution_options(synchronize_session=False))).rowcount == 1:
+            await db.refresh(stock_package)
+            break
+    else:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Celdas insuficientes en el paquete. Disponibles: {stock_package.available_cells}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El paquete cambió durante la venta, reintentá."
         )
-    
+
     # 3. Registrar la venta en la tabla stock_sales
     new_sale = StockSale(
-        stock_package_id=stock_package.id,
+        stock_package_id=stock_id,
         customer_name=sale_data.customer_name,
+        customer_id=await db.run_sync(customers.resolve, current_user.id, sale_data.customer_name),
         cells_sold=sale_data.cells_sold,
         sale_date=date.today()
     )
     db.add(new_sale)
 
-    # 4. Actualizar el paquete de stock (available_cells, sold_cells)
-    stock_package.available_cells -= sale_data.cells_sold
-    stock_package.sold_cells += sale_data.cells_sold
-
-    # 5. Si no quedan celdas, actualizar el estado
-    if stock_package.available_cells == 0:
-        stock_package.is_expired = True
+    if counted_in_stock:
+        sold_out = stock_package.available_cells == 0
+        await db.run_sync(dashboard_summary.cells_sold, current_user.id, sale_data.cells_sold, new_sale.sale_date, stock_package, sold_out)
+    await db.run_sync(collection_versions.bump, current_user.id, collection_versions.STOCK)
 
-    db.commit()
-    db.refresh(stock_package)
+    await db.commit()
     return stock_package
 
 @router.get("/{stock_id}/sales", response_model=list[StockSaleOut])
-def get_sales_history_for_package(
+async def get_sales_history_for_package(
     stock_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     # 1. Verificar si el paquete de stock existe y pertenece al usuario
-    stock_package = db.query(StockPackage).filter(
+    stock_package = await db.scalar(select(StockPackage).where(
         StockPackage.id == stock_id,
         StockPackage.user_id == current_user.id
-    ).first()
+    ))
 
     if not stock_package:
         raise HTTPException(
@@ -109,8 +226,8 @@ def get_sales_history_for_package(
         )
 
     # 2. Buscar las ventas asociadas
-    sales_history = db.query(StockSale).filter(
+    sales_history = (await db.scalars(select(StockSale).where(
         StockSale.stock_package_id == stock_id
-    ).all()
+    ))).all()
     
     return sales_history
\ No newline at end of file
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+
+class HiveMonthOut(BaseModel):
+    month: date
+    hive_name: Optional[str] = None  # None: producciones sin colmena
+    productions: int
+    larvae_transferred: int
+    accepted_larvae: int
+    accepted_cells: int
+    cells_produced: int
+    acceptance_rate: Optional[float] = None
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+from uuid import UUID
+
+
+class CustomerOut(BaseModel):
+    id: UUID
+    name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CustomerUpdate(BaseModel):
+    name: str
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+from datetime import date
+
+
+class FulfillmentAllocationOut(BaseModel):
+    stock_package_id: UUID
+    expiration_date: date
+    cells: int
+
+
+class FulfillmentOrderOut(BaseModel):
+    order_id: UUID
+    customer_name: str
+    delivery_date: date
+    cells_needed: int
+    cells_allocated: int
+    allocations: List[FulfillmentAllocationOut]
+
+
+class FulfillmentPlanOut(BaseModel):
+    committed: bool
+    orders_considered: int
+    orders_fulfilled: int
+    orders_partial: int
+    cells_needed: int
+    cells_allocated: int
+    cells_short: int
+    stock_cells: int
+    stock_cells_left: int  # celdas vigentes que el plan no usa
+    orders: List[FulfillmentOrderOut]
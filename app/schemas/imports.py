@@ -0,0 +1,16 @@
+# app/schemas/imports.py
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ImportRowError(BaseModel):
+    line: int
+    errors: List[str]
+
+class ImportResult(BaseModel):
+    rows_read: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
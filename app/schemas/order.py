@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from datetime import date, datetime
+from typing import Optional
 
 class OrderBase(BaseModel):
     customer_name: str
@@ -15,6 +16,7 @@ class OrderCreate(OrderBase):
 class OrderOut(OrderBase):
     id: UUID
     user_id: UUID
+    customer_id: Optional[UUID] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -12,7 +12,7 @@ class HiveOut(BaseModel):
 class ProductionOut(BaseModel):
     id: UUID
     user_id: UUID
-    order_id: Optional[str] = None
+    order_id: Optional[UUID] = None
     transfer_date: date
     acceptance_date: Optional[date] = None
     cells_produced: int
@@ -41,7 +41,7 @@ class ProductionCreate(BaseModel):
     accepted_cells: Optional[int] = None
     acceptance_date: Optional[date] = None
     cells_produced: int
-    order_id: Optional[str] = None
+    order_id: Optional[UUID] = None
     notes: Optional[str] = None
     status: Optional[str] = "active"
     hives: List[HiveCreate]
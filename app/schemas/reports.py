@@ -1,8 +1,9 @@
 # app/schemas/reports.py
 from pydantic import BaseModel
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
+from uuid import UUID
 
 class ReportType(str, Enum):
     orders = "orders"
@@ -12,4 +13,16 @@ class ReportQueryParams(BaseModel):
     start_date: Optional[date] = None
     end_date: Optional[date] = None
     status: Optional[str] = None
-    customer_name: Optional[str] = None
\ No newline at end of file
+    customer_name: Optional[str] = None
+    customer_id: Optional[UUID] = None
+
+class ReportJobOut(BaseModel):
+    job_id: str
+    status: str
+    report_type: ReportType
+    rows: Optional[int] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    queued_seconds: Optional[float] = None
+    render_seconds: Optional[float] = None
+    error: Optional[str] = None
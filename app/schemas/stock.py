@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
+from typing import Optional
 from datetime import date, datetime
 
 class StockBase(BaseModel):
@@ -25,6 +26,7 @@ class StockSaleOut(BaseModel):
     id: UUID
     stock_package_id: UUID
     customer_name: str
+    customer_id: Optional[UUID] = None
     cells_sold: int
     sale_date: date
 
@@ -34,3 +36,12 @@ class StockSaleCreate(BaseModel):
     stock_package_id: UUID
     customer_name: str
     cells_sold: int
+
+class StockAllocationCreate(BaseModel):
+    customer_name: str
+    cells_sold: int
+
+class StockAllocationOut(BaseModel):
+    customer_name: str
+    cells_sold: int
+    sales: list[StockSaleOut]
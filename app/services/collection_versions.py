@@ -0,0 +1,47 @@
+"""
+Versiones de datos por usuario y colección.
+
+Toda escritura sobre una colección llama a bump() antes de su commit.
+"""
+import hashlib
+import json
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.etag import make_etag
+from app.models.versions import CollectionVersion
+from app.services import counters
+
+ORDERS = "orders"
+PRODUCTIONS = "productions"
+STOCK = "stock"
+
+# Incrementar si cambia el formato de los listados que usan etag()
+LIST_FORMAT_VERSION = 1
+
+
+def bump(db: Session, user_id, *collections):
+    for collection in collections:
+        counters.increment(db, CollectionVersion, {"user_id": user_id, "collection": collection}, version=1)
+
+
+def get(db: Session, user_id, collection) -> int:
+    version = db.execute(
+        select(CollectionVersion.version).where(
+            CollectionVersion.user_id == user_id,
+            CollectionVersion.collection == collection
+        )
+    ).scalar()
+    return version or 0
+
+
+def etag(db: Session, user_id, collection, *params) -> str:
+    """
+    ETag débil para un listado de `collection`: cambia con la versión de
+    datos y con los parámetros de la consulta (cursor, limit, ...).
+    Cuesta una lectura por clave primaria, sin tocar las filas del listado.
+    """
+    version = get(db, user_id, collection)
+    digest = hashlib.sha256(
+        json.dumps([str(user_id), collection, LIST_FORMAT_VERSION, *params], default=str).encode()
+    ).hexdigest()[:16]
+    return make_etag(f"{collection}-{version}-{digest}", weak=True)
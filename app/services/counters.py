@@ -0,0 +1,31 @@
+"""
+Contadores en tablas con clave compuesta, incrementados dentro de la
+transacción del request.
+"""
+from sqlalchemy import and_, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def increment(db: Session, model, keys: dict, **deltas):
+    """
+    Suma `deltas` a la fila de `model` identificada por `keys`, creándola si
+    no existe. Las columnas no incluidas toman su default.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    stmt = (
+        update(model)
+        .where(and_(*[getattr(model, name) == value for name, value in keys.items()]))
+        .values({getattr(model, name): getattr(model, name) + delta for name, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(model).values(**keys, **deltas))
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        db.execute(stmt)
@@ -0,0 +1,215 @@
+"""
+Importación masiva de pedidos y producciones desde CSV.
+
+El archivo se lee como stream con csv.DictReader (UploadFile lo deja en un
+archivo temporal, nunca entero en memoria). Cada fila se valida contra
+OrderCreate/ProductionCreate; las válidas se insertan de a IMPORT_CHUNK_ROWS
+con un executemany y se hace commit por bloque. Las inválidas se reportan
+con su número de línea. Los encabezados son los nombres de los campos del
+schema; en producciones la columna `hives` lleva los nombres separados por ";".
+"""
+import csv
+import io
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.order import CustomerOrder
+from app.models.production import ProductionHive, ProductionRecord
+from app.schemas.order import OrderCreate
+from app.schemas.production import ProductionCreate
+from app.services import collection_versions, customers, dashboard_summary, hive_stats
+
+IMPORT_CHUNK_ROWS = 1000
+
+# Tope de errores detallados en la respuesta; el resto solo se cuenta
+MAX_REPORTED_ERRORS = 500
+
+ORDER_REQUIRED_COLUMNS = {"customer_name", "number_of_cells", "delivery_date", "larvae_transfer_date"}
+PRODUCTION_REQUIRED_COLUMNS = {"transfer_date", "larvae_transferred", "cells_produced"}
+
+
+class InvalidHeader(Exception):
+    pass
+
+
+class _Report:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rows_failed = 0
+        self.errors = []
+
+    def fail(self, line: int, errors: list):
+        self.rows_failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def result(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows_read": self.rows_read,
+            "rows_imported": self.rows_imported,
+            "rows_failed": self.rows_failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.rows_failed > len(self.errors),
+            "elapsed_seconds": round(elapsed, 4),
+            "rows_per_second": round(self.rows_imported / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+def _validation_errors(exc: ValidationError) -> list:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+def _read_rows(file, required: set, schema, prepare=None):
+    """
+    Itera (línea, modelo validado | lista de errores) sobre el CSV binario `file`.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        missing = required - set(reader.fieldnames or [])
+        if missing:
+            raise InvalidHeader(f"Faltan columnas: {', '.join(sorted(missing))}")
+        for row in reader:
+            # Las celdas vacías se tratan como campos ausentes
+            data = {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+            if prepare is not None:
+                prepare(data)
+            try:
+                yield reader.line_num, schema.model_validate(data)
+            except ValidationError as exc:
+                yield reader.line_num, _validation_errors(exc)
+    finally:
+        text.detach()
+
+
+def _chunks(rows, report: _Report):
+    chunk = []
+    for line, parsed in rows:
+        report.rows_read += 1
+        if isinstance(parsed, list):
+            report.fail(line, parsed)
+            continue
+        chunk.append((line, parsed))
+        if len(chunk) == IMPORT_CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_orders(db: Session, user_id, file):
+    report = _Report()
+    for chunk in _chunks(_read_rows(file, ORDER_REQUIRED_COLUMNS, OrderCreate), report):
+        now = datetime.utcnow()
+        customer_ids = customers.resolve_many(db, user_id, [order.customer_name for _, order in chunk])
+        db.execute(insert(CustomerOrder), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                **order.model_dump(),
+                "customer_id": customer_ids[order.customer_name],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for _, order in chunk
+        ])
+        pending = sum(dashboard_summary.pending_delta(None, order.status) for _, order in chunk)
+        dashboard_summary.orders_changed(db, user_id, pending)
+        collection_versions.bump(db, user_id, collection_versions.ORDERS)
+        db.commit()
+        report.rows_imported += len(chunk)
+    return report.result()
+
+
+def _prepare_production(data: dict):
+    hives = data.pop("hives", "")
+    data["hives"] = [{"hive_name": name.strip()} for name in hives.split(";") if name.strip()]
+
+
+def import_productions(db: Session, user_id, file):
+    report = _Report()
+    rows = _read_rows(file, PRODUCTION_REQUIRED_COLUMNS, ProductionCreate, _prepare_production)
+    for chunk in _chunks(rows, report):
+        order_ids = {prod.order_id for _, prod in chunk if prod.order_id}
+        orders = {}
+        if order_ids:
+            orders = {
+                order.id: order
+                for order in db.scalars(select(CustomerOrder).where(
+                    CustomerOrder.id.in_(order_ids),
+                    CustomerOrder.user_id == user_id,
+                ))
+            }
+
+        now = datetime.utcnow()
+        records, hives = [], []
+        produced = defaultdict(int)
+        for line, prod in chunk:
+            order_id = prod.order_id
+            if order_id and order_id not in orders:
+                report.fail(line, [f"order_id: pedido {order_id} no encontrado"])
+                continue
+            production_id = uuid.uuid4()
+            records.append({
+                "id": production_id,
+                "user_id": user_id,
+                **prod.model_dump(exclude={"hives", "order_id"}),
+                "order_id": order_id,
+                "status": prod.status or "active",
+                "created_at": now,
+                "updated_at": now,
+            })
+            hives.extend(
+                {"id": uuid.uuid4(), "production_id": production_id, "hive_name": hive.hive_name}
+                for hive in prod.hives
+            )
+            if order_id:
+                produced[order_id] += prod.cells_produced
+
+        if not records:
+            continue
+        db.execute(insert(ProductionRecord), records)
+        if hives:
+            db.execute(insert(ProductionHive), hives)
+        names = defaultdict(list)
+        for hive in hives:
+            names[hive["production_id"]].append(hive["hive_name"])
+        hive_stats.productions_added(db, user_id, [
+            hive_stats.snapshot(
+                names[record["id"]], record["transfer_date"],
+                record["larvae_transferred"], record["accepted_cells"], record["cells_produced"],
+            )
+            for record in records
+        ])
+
+        # Misma lógica que create_production para los pedidos vinculados, una vez por pedido
+        pending = 0
+        for order_id, cells in produced.items():
+            order = orders[order_id]
+            old_status = order.status
+            order.cells_produced = (order.cells_produced or 0) + cells
+            remaining = order.number_of_cells - order.cells_produced - (order.cells_allocated or 0)
+            if remaining > 0:
+                order.status = "in_production"
+                order.cells_remaining = remaining
+            else:
+                order.status = "completed"
+                order.cells_remaining = 0
+            pending += dashboard_summary.pending_delta(old_status, order.status)
+        if produced:
+            dashboard_summary.orders_changed(db, user_id, pending)
+            collection_versions.bump(db, user_id, collection_versions.ORDERS)
+        collection_versions.bump(db, user_id, collection_versions.PRODUCTIONS)
+        db.commit()
+        report.rows_imported += len(records)
+    return report.result()
@@ -0,0 +1,177 @@
+"""
+Clientes normalizados y su búsqueda.
+
+Los pedidos y las ventas guardan el nombre tal como se cargó y además el
+customer_id del cliente cuyo nombre normalizado coincide (resolve_many lo
+crea si no existe). La búsqueda nunca recorre pedidos:
+
+- autocompletar: prefijo sobre el índice único (user_id, name_key);
+- buscar: consultas de 3+ caracteres se resuelven con customer_trigrams
+  (clientes que tienen todos los trigramas de la consulta) y se confirman
+  con un LIKE sobre esos candidatos; las más cortas caen al prefijo.
+
+El costo depende de la cantidad de clientes que coinciden, no del volumen
+de pedidos. rename y delete mantienen customer_trigrams al día.
+"""
+import unicodedata
+import uuid
+from sqlalchemy import case, delete as sql_delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.customer import Customer, CustomerTrigram
+from app.models.order import CustomerOrder
+from app.models.stock import StockSale
+
+TRIGRAM_SIZE = 3
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+
+class CustomerExists(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"Ya existe un cliente con el nombre {name!r}.")
+
+
+def normalize(name: str) -> str:
+    """
+    Minúsculas, sin acentos y con los espacios colapsados.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())[:255]
+
+
+def trigrams(key: str) -> set:
+    return {key[i:i + TRIGRAM_SIZE] for i in range(len(key) - TRIGRAM_SIZE + 1)}
+
+
+def _existing(db: Session, user_id, keys):
+    rows = db.execute(
+        select(Customer.name_key, Customer.id).where(Customer.user_id == user_id, Customer.name_key.in_(keys))
+    )
+    return {row.name_key: row.id for row in rows}
+
+
+def _trigram_rows(user_id, customer_id, key):
+    return [{"user_id": user_id, "trigram": gram, "customer_id": customer_id} for gram in trigrams(key)]
+
+
+def _create(db: Session, user_id, names_by_key: dict):
+    customers = [
+        {"id": uuid.uuid4(), "user_id": user_id, "name": " ".join(name.split())[:255], "name_key": key}
+        for key, name in names_by_key.items()
+    ]
+    db.execute(insert(Customer), customers)
+    grams = [
+        row
+        for customer in customers
+        for row in _trigram_rows(user_id, customer["id"], customer["name_key"])
+    ]
+    if grams:
+        db.execute(insert(CustomerTrigram), grams)
+    return {customer["name_key"]: customer["id"] for customer in customers}
+
+
+def resolve_many(db: Session, user_id, names) -> dict:
+    """
+    Devuelve {nombre: customer_id} creando los clientes que falten (sin commit).
+    """
+    names_by_key = {}
+    for name in names:
+        names_by_key.setdefault(normalize(name), name)
+    names_by_key.pop("", None)
+    if not names_by_key:
+        return {}
+
+    ids = _existing(db, user_id, list(names_by_key))
+    missing = {key: name for key, name in names_by_key.items() if key not in ids}
+    if missing:
+        try:
+            with db.begin_nested():
+                ids.update(_create(db, user_id, missing))
+        except IntegrityError:
+            # Otra transacción creó alguno de los clientes en el medio
+            ids.update(_existing(db, user_id, list(missing)))
+            still_missing = {key: name for key, name in missing.items() if key not in ids}
+            if still_missing:
+                ids.update(_create(db, user_id, still_missing))
+    return {name: ids.get(normalize(name)) for name in names}
+
+
+def resolve(db: Session, user_id, name: str):
+    return resolve_many(db, user_id, [name]).get(name)
+
+
+def rename(db: Session, customer: Customer, name: str) -> Customer:
+    """
+    Cambia el nombre del cliente y sus trigramas (sin commit). Lanza
+    CustomerExists si el nombre normalizado ya es de otro cliente.
+    """
+    key = normalize(name)
+    if not key:
+        raise ValueError("El nombre no puede estar vacío.")
+    if key != customer.name_key:
+        if _existing(db, customer.user_id, [key]):
+            raise CustomerExists(name)
+        db.execute(sql_delete(CustomerTrigram).where(CustomerTrigram.customer_id == customer.id))
+        grams = _trigram_rows(customer.user_id, customer.id, key)
+        if grams:
+            db.execute(insert(CustomerTrigram), grams)
+        customer.name_key = key
+    customer.name = " ".join(name.split())[:255]
+    return customer
+
+
+def delete(db: Session, customer: Customer):
+    """
+    Borra el cliente y sus trigramas; pedidos y ventas conservan el nombre
+    cargado y quedan sin customer_id (sin commit).
+    """
+    db.execute(sql_delete(CustomerTrigram).where(CustomerTrigram.customer_id == customer.id))
+    db.execute(update(CustomerOrder).where(CustomerOrder.customer_id == customer.id).values(customer_id=None))
+    db.execute(update(StockSale).where(StockSale.customer_id == customer.id).values(customer_id=None))
+    db.delete(customer)
+
+
+def matching_ids(user_id, query: str):
+    """
+    SELECT de los ids de clientes cuyo nombre contiene `query` (prefijo si es corta).
+    """
+    key = normalize(query)
+    grams = trigrams(key)
+    if not grams:
+        return select(Customer.id).where(Customer.user_id == user_id, Customer.name_key.startswith(key, autoescape=True))
+    candidates = (
+        select(CustomerTrigram.customer_id)
+        .where(CustomerTrigram.user_id == user_id, CustomerTrigram.trigram.in_(grams))
+        .group_by(CustomerTrigram.customer_id)
+        .having(func.count() == len(grams))
+    )
+    return select(Customer.id).where(Customer.id.in_(candidates), Customer.name_key.contains(key, autoescape=True))
+
+
+def search(db: Session, user_id, query: str, limit: int = DEFAULT_SEARCH_LIMIT):
+    """
+    Clientes cuyo nombre contiene `query`; primero los que empiezan con ella.
+    """
+    key = normalize(query)
+    if not key:
+        return []
+    return db.execute(
+        select(Customer.id, Customer.name)
+        .where(Customer.id.in_(matching_ids(user_id, query)))
+        .order_by(case((Customer.name_key.startswith(key, autoescape=True), 0), else_=1), Customer.name_key)
+        .limit(limit)
+    ).all()
+
+
+def autocomplete(db: Session, user_id, prefix: str, limit: int = DEFAULT_SEARCH_LIMIT):
+    key = normalize(prefix)
+    if not key:
+        return []
+    return db.execute(
+        select(Customer.id, Customer.name)
+        .where(Customer.user_id == user_id, Customer.name_key.startswith(key, autoescape=True))
+        .order_by(Customer.name_key)
+        .limit(limit)
+    ).all()
@@ -0,0 +1,247 @@
+"""
+Mantenimiento incremental de los agregados de /dashboard/stats.
+
+Las escrituras de stock, pedidos y producciones llaman a estas funciones
+antes de su commit, así el resumen queda en la misma transacción. Si el
+usuario todavía no tiene fila de resumen los deltas se ignoran: la primera
+lectura de /stats la reconstruye desde las tablas base.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.services import counters
+from app.models.dashboard import DashboardDailyStat, DashboardSummary
+from app.models.order import CustomerOrder
+from app.models.stock import StockPackage, StockSale
+
+EXPIRING_WINDOW_DAYS = 7
+SALES_WINDOW_DAYS = 30
+
+
+def _bump_summary(db: Session, user_id, **deltas) -> bool:
+    values = {
+        getattr(DashboardSummary, name): getattr(DashboardSummary, name) + delta
+        for name, delta in deltas.items() if delta
+    }
+    values[DashboardSummary.updated_at] = func.now()
+    result = db.execute(
+        update(DashboardSummary)
+        .where(DashboardSummary.user_id == user_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def _bump_day(db: Session, user_id, day: date, **deltas):
+    counters.increment(db, DashboardDailyStat, {"user_id": user_id, "day": day}, **deltas)
+
+
+def pending_delta(old_status, new_status) -> int:
+    return int(new_status == "pending") - int(old_status == "pending")
+
+
+def orders_changed(db: Session, user_id, pending: int):
+    if pending:
+        _bump_summary(db, user_id, pending_orders=pending)
+
+
+def stock_added(db: Session, user_id, package: StockPackage):
+    if package.is_expired:
+        return
+    if _bump_summary(db, user_id, total_available_cells=package.available_cells):
+        _bump_day(db, user_id, package.expiration_date, expiring_packages=1)
+
+
+def cells_sold(db: Session, user_id, cells: int, sale_date: date, package: StockPackage, sold_out: bool):
+    """
+    Registra una venta de `cells` celdas de `package`. `sold_out` indica que
+    la venta dejó el paquete en 0 y lo marcó como expirado.
+    """
+    sales_recorded(db, user_id, cells, sale_date, [package.expiration_date] if sold_out else [])
+
+
+def sales_recorded(db: Session, user_id, cells: int, sale_date: date, sold_out_expirations: list):
+    """
+    Registra ventas por `cells` celdas en total que pueden abarcar varios
+    paquetes; `sold_out_expirations` tiene el vencimiento de cada paquete agotado.
+    """
+    counted = _bump_summary(db, user_id, total_available_cells=-cells)
+    if not counted:
+        return
+    _bump_day(db, user_id, sale_date, cells_sold=cells)
+    for expiration_date, count in Counter(sold_out_expirations).items():
+        _bump_day(db, user_id, expiration_date, expiring_packages=-count)
+
+
+def package_expired(db: Session, user_id, expiration_date: date, available_cells: int):
+    packages_expired(db, user_id, [(expiration_date, available_cells)])
+
+
+def packages_expired(db: Session, user_id, packages: list):
+    """
+    Descuenta paquetes vencidos del usuario; `packages` es [(vencimiento, celdas disponibles)].
+    """
+    if not _bump_summary(db, user_id, total_available_cells=-sum(cells for _, cells in packages)):
+        return
+    for expiration_date, count in Counter(day for day, _ in packages).items():
+        _bump_day(db, user_id, expiration_date, expiring_packages=-count)
+
+
+def packages_deleted(db: Session, user_id, packages: list, sales: list):
+    """
+    Descuenta paquetes borrados: `packages` es [(vencimiento, celdas disponibles)]
+    de los vigentes y `sales` [(fecha, celdas)] de las ventas que se borran con ellos.
+    """
+    if not _bump_summary(db, user_id, total_available_cells=-sum(cells for _, cells in packages)):
+        return
+    for expiration_date, count in Counter(day for day, _ in packages).items():
+        _bump_day(db, user_id, expiration_date, expiring_packages=-count)
+    cutoff = date.today() - timedelta(days=SALES_WINDOW_DAYS)
+    sold = Counter()
+    for sale_date, cells in sales:
+        if sale_date >= cutoff:
+            sold[sale_date] += cells
+    for sale_date, cells in sold.items():
+        _bump_day(db, user_id, sale_date, cells_sold=-cells)
+
+
+def compute(db: Session, user_id):
+    """
+    Calcula el resumen desde las tablas base: (totales, {día: (vendidas, por_expirar)}).
+    """
+    today = date.today()
+    total_available_cells = db.query(
+        func.sum(StockPackage.available_cells)
+    ).filter(
+        StockPackage.user_id == user_id,
+        StockPackage.is_expired == False
+    ).scalar() or 0
+
+    pending_orders = db.query(func.count(CustomerOrder.id)).filter(
+        CustomerOrder.user_id == user_id,
+        CustomerOrder.status == "pending"
+    ).scalar() or 0
+
+    days = {}
+    expiring_rows = db.query(
+        StockPackage.expiration_date, func.count(StockPackage.id)
+    ).filter(
+        StockPackage.user_id == user_id,
+        StockPackage.is_expired == False
+    ).group_by(StockPackage.expiration_date)
+    for day, count in expiring_rows:
+        days[day] = (0, count)
+
+    sales_rows = db.query(
+        StockSale.sale_date, func.sum(StockSale.cells_sold)
+    ).join(
+        StockPackage, StockPackage.id == StockSale.stock_package_id
+    ).filter(
+        StockPackage.user_id == user_id,
+        StockSale.sale_date >= today - timedelta(days=SALES_WINDOW_DAYS)
+    ).group_by(StockSale.sale_date)
+    for day, sold in sales_rows:
+        days[day] = (int(sold or 0), days.get(day, (0, 0))[1])
+
+    totals = {"total_available_cells": int(total_available_cells), "pending_orders": int(pending_orders)}
+    return totals, days
+
+
+def stored(db: Session, user_id):
+    summary = db.get(DashboardSummary, user_id)
+    if summary is None:
+        return None, {}
+    totals = {
+        "total_available_cells": summary.total_available_cells,
+        "pending_orders": summary.pending_orders,
+    }
+    days = {
+        row.day: (row.cells_sold, row.expiring_packages)
+        for row in db.query(DashboardDailyStat).filter(DashboardDailyStat.user_id == user_id)
+        if row.cells_sold or row.expiring_packages
+    }
+    return totals, days
+
+
+def rebuild(db: Session, user_id):
+    """
+    Reescribe el resumen del usuario desde las tablas base (sin commit).
+    Devuelve (totales, días) recalculados.
+    """
+    totals, days = compute(db, user_id)
+    db.execute(delete(DashboardDailyStat).where(DashboardDailyStat.user_id == user_id))
+    db.execute(delete(DashboardSummary).where(DashboardSummary.user_id == user_id))
+    db.execute(insert(DashboardSummary).values(user_id=user_id, **totals))
+    if days:
+        db.execute(insert(DashboardDailyStat), [
+            {"user_id": user_id, "day": day, "cells_sold": sold, "expiring_packages": expiring}
+            for day, (sold, expiring) in days.items()
+        ])
+    return totals, days
+
+
+def reconcile(db: Session, user_id) -> bool:
+    """
+    Reconstruye el resumen del usuario y devuelve True si el guardado había derivado.
+    """
+    before_totals, before_days = stored(db, user_id)
+    totals, days = rebuild(db, user_id)
+    if before_totals is None:
+        return False
+    # Las ventas fuera de la ventana ya no se usan y rebuild las descarta
+    cutoff = date.today() - timedelta(days=SALES_WINDOW_DAYS)
+    before_days = {
+        day: (sold if day >= cutoff else 0, expiring)
+        for day, (sold, expiring) in before_days.items()
+    }
+    before_days = {day: value for day, value in before_days.items() if value != (0, 0)}
+    return before_totals != totals or before_days != days
+
+
+def read_stats(db: Session, user_id):
+    """
+    Lee /dashboard/stats en una sola consulta sobre el resumen y sus buckets diarios.
+    """
+    today = date.today()
+    expiring = (
+        select(func.coalesce(func.sum(DashboardDailyStat.expiring_packages), 0))
+        .where(
+            DashboardDailyStat.user_id == user_id,
+            DashboardDailyStat.day <= today + timedelta(days=EXPIRING_WINDOW_DAYS)
+        )
+        .scalar_subquery()
+    )
+    sold = (
+        select(func.coalesce(func.sum(DashboardDailyStat.cells_sold), 0))
+        .where(
+            DashboardDailyStat.user_id == user_id,
+            DashboardDailyStat.day >= today - timedelta(days=SALES_WINDOW_DAYS)
+        )
+        .scalar_subquery()
+    )
+    stmt = select(
+        DashboardSummary.total_available_cells,
+        DashboardSummary.pending_orders,
+        expiring,
+        sold,
+    ).where(DashboardSummary.user_id == user_id)
+
+    row = db.execute(stmt).first()
+    if row is None:
+        try:
+            rebuild(db, user_id)
+            db.commit()
+        except IntegrityError:
+            # Otro request materializó el resumen al mismo tiempo
+            db.rollback()
+        row = db.execute(stmt).first()
+
+    return {
+        "total_available_cells": row[0],
+        "pending_orders": row[1],
+        "expiring_stock": int(row[2]),
+        "total_sales_last_30_days": int(row[3]),
+    }
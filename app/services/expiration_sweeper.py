@@ -0,0 +1,172 @@
+"""
+Barrido periódico de paquetes de stock vencidos.
+
+Marca is_expired en los paquetes con expiration_date anterior a hoy, de a
+EXPIRATION_SWEEP_BATCH filas por transacción para no retener locks largos.
+Cada lote toma sus filas con FOR UPDATE SKIP LOCKED, así no espera a una
+venta en curso (el paquete queda para el lote o el barrido siguiente), y
+actualiza el resumen del dashboard en la misma transacción.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.stock import StockPackage
+from app.services import collection_versions, dashboard_summary
+
+logger = logging.getLogger(__name__)
+
+
+def _expire(ids):
+    return (
+        update(StockPackage)
+        .where(StockPackage.id.in_(ids), StockPackage.is_expired == False)
+        .values(is_expired=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _mark_expired(db, rows) -> dict:
+    """
+    Marca `rows` como vencidos y devuelve {id: celdas disponibles} de los que
+    cambió este UPDATE: una venta que agotó el paquete en el medio ya lo
+    marcó, y donde FOR UPDATE no bloquea (SQLite) otro barrido o una venta
+    pudo tocarlo antes.
+    """
+    ids = [row.id for row in rows]
+    if db.get_bind().dialect.update_returning:
+        returned = db.execute(_expire(ids).returning(StockPackage.id, StockPackage.available_cells))
+        return {row.id: row.available_cells for row in returned}
+    # Sin RETURNING (MySQL) las filas están bloqueadas y el UPDATE las toma
+    # todas; si no, se repite fila por fila para saber cuáles cambiaron.
+    read = {row.id: row.available_cells for row in rows}
+    savepoint = db.begin_nested()
+    if db.execute(_expire(ids)).rowcount == len(ids):
+        savepoint.commit()
+        return read
+    savepoint.rollback()
+    return {package_id: cells for package_id, cells in read.items() if db.execute(_expire([package_id])).rowcount}
+
+
+def expire_batch(db, today: date, batch_size: int) -> int:
+    """
+    Marca como vencido un lote de hasta `batch_size` paquetes (sin commit).
+    Devuelve la cantidad de filas que marcó este lote.
+    """
+    rows = db.execute(
+        select(StockPackage.id, StockPackage.user_id, StockPackage.expiration_date, StockPackage.available_cells)
+        .where(StockPackage.is_expired == False, StockPackage.expiration_date < today)
+        .order_by(StockPackage.expiration_date)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0
+
+    expired = _mark_expired(db, rows)
+    by_user = defaultdict(list)
+    for row in rows:
+        if row.id in expired:
+            by_user[row.user_id].append((row.expiration_date, expired[row.id]))
+    for user_id, packages in by_user.items():
+        dashboard_summary.packages_expired(db, user_id, packages)
+        collection_versions.bump(db, user_id, collection_versions.STOCK)
+    return len(expired)
+
+
+class ExpirationSweeper:
+    def __init__(self, interval: int, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.rows_total = 0
+        self.last_run_at = None
+        self.last_rows = None
+        self.last_batches = None
+        self.last_duration_seconds = None
+        self.last_error = None
+
+    def run_once(self, today: date = None) -> int:
+        """
+        Barre todos los paquetes vencidos en lotes. Devuelve las filas marcadas.
+        """
+        today = today or date.today()
+        started = time.perf_counter()
+        rows = batches = 0
+        error = None
+        db = SessionLocal()
+        try:
+            while True:
+                touched = expire_batch(db, today, self.batch_size)
+                db.commit()
+                if not touched:
+                    break
+                rows += touched
+                batches += 1
+                if touched < self.batch_size:
+                    break
+        except Exception as exc:
+            db.rollback()
+            error = str(exc) or exc.__class__.__name__
+            raise
+        finally:
+            db.close()
+            with self._lock:
+                self.runs += 1
+                self.rows_total += rows
+                self.last_run_at = datetime.utcnow()
+                self.last_rows = rows
+                self.last_batches = batches
+                self.last_duration_seconds = round(time.perf_counter() - started, 4)
+                self.last_error = error
+        return rows
+
+    async def _loop(self):
+        while True:
+            try:
+                await run_in_threadpool(self.run_once)
+            except Exception:
+                logger.exception("Falló el barrido de paquetes vencidos")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "batch_size": self.batch_size,
+                "running": self._task is not None,
+                "runs": self.runs,
+                "rows_total": self.rows_total,
+                "last_run_at": self.last_run_at,
+                "last_rows": self.last_rows,
+                "last_batches": self.last_batches,
+                "last_duration_seconds": self.last_duration_seconds,
+                "last_error": self.last_error,
+            }
+
+
+expiration_sweeper = ExpirationSweeper(
+    interval=settings.EXPIRATION_SWEEP_INTERVAL,
+    batch_size=settings.EXPIRATION_SWEEP_BATCH,
+)
@@ -0,0 +1,203 @@
+"""
+Planificador de entregas: asigna el stock vigente a los pedidos abiertos.
+
+Se leen una vez los pedidos pending/in_production con celdas pendientes y
+los paquetes no vencidos con celdas disponibles. Un paquete sirve a un
+pedido si no vence antes de la entrega (o de hoy, si la entrega ya pasó).
+
+Greedy con heap: los pedidos se recorren por fecha de entrega y cada uno
+toma primero del paquete que vence antes entre los que todavía le sirven.
+Como los paquetes que sirven a un pedido también sirven a todos los que se
+entregan antes, usar primero el que vence antes nunca le quita stock útil a
+un pedido posterior: el plan asigna el máximo de celdas posible y deja
+sin usar (y por vencer) el mínimo. O((pedidos + paquetes) log paquetes).
+
+Con commit=True las filas se leen con FOR UPDATE y el plan se graba como
+ventas (un executemany) y en cells_allocated de cada pedido, en la
+transacción del llamador. Lo que falta de un pedido descuenta tanto lo
+producido (cells_produced) como lo asignado desde stock.
+"""
+import heapq
+import uuid
+from collections import namedtuple
+from datetime import date, datetime
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from app.models.order import CustomerOrder
+from app.models.stock import StockPackage
+from app.services import collection_versions, customers, dashboard_summary, stock_allocation
+
+OPEN_STATUSES = ("pending", "in_production")
+
+Allocation = namedtuple("Allocation", "order package cells")
+
+
+def load(db: Session, user_id, today: date, lock: bool = False):
+    """
+    Devuelve (pedidos, paquetes) abiertos del usuario como filas livianas.
+    """
+    needed = (
+        CustomerOrder.number_of_cells
+        - func.coalesce(CustomerOrder.cells_produced, 0)
+        - func.coalesce(CustomerOrder.cells_allocated, 0)
+    )
+    orders = (
+        select(
+            CustomerOrder.id, CustomerOrder.customer_name, CustomerOrder.customer_id,
+            CustomerOrder.number_of_cells, CustomerOrder.cells_produced, CustomerOrder.cells_allocated,
+            CustomerOrder.status,
+            CustomerOrder.delivery_date, CustomerOrder.larvae_transfer_date, CustomerOrder.created_at,
+            needed.label("cells_needed"),
+        )
+        .where(
+            CustomerOrder.user_id == user_id,
+            CustomerOrder.status.in_(OPEN_STATUSES),
+            needed > 0,
+        )
+    )
+    packages = (
+        select(
+            StockPackage.id, StockPackage.available_cells, StockPackage.expiration_date,
+            StockPackage.production_date,
+        )
+        .where(
+            StockPackage.user_id == user_id,
+            StockPackage.is_expired == False,
+            StockPackage.expiration_date >= today,
+            StockPackage.available_cells > 0,
+        )
+    )
+    if lock:
+        orders, packages = orders.with_for_update(), packages.with_for_update()
+    return db.execute(orders).all(), db.execute(packages).all()
+
+
+def plan(orders, packages, today: date):
+    """
+    Devuelve [Allocation] para `orders` y `packages` (filas de `load`).
+    """
+    def due(order):
+        return max(order.delivery_date, today)
+
+    heap = [
+        (package.expiration_date, package.production_date, index, package)
+        for index, package in enumerate(packages)
+    ]
+    heapq.heapify(heap)
+    left = {package.id: package.available_cells for package in packages}
+
+    allocations = []
+    ordered = sorted(orders, key=lambda order: (due(order), order.larvae_transfer_date, order.created_at or datetime.min, order.id))
+    for order in ordered:
+        # Lo que vence antes de esta entrega ya no sirve a ningún pedido posterior
+        while heap and heap[0][0] < due(order):
+            heapq.heappop(heap)
+        needed = order.cells_needed
+        while needed and heap:
+            package = heap[0][3]
+            cells = min(needed, left[package.id])
+            allocations.append(Allocation(order, package, cells))
+            needed -= cells
+            left[package.id] -= cells
+            if not left[package.id]:
+                heapq.heappop(heap)
+    return allocations
+
+
+def summarize(orders, packages, allocations, committed: bool = False):
+    allocated = {}
+    by_order = {}
+    for allocation in allocations:
+        allocated[allocation.order.id] = allocated.get(allocation.order.id, 0) + allocation.cells
+        by_order.setdefault(allocation.order.id, []).append({
+            "stock_package_id": allocation.package.id,
+            "expiration_date": allocation.package.expiration_date,
+            "cells": allocation.cells,
+        })
+    items = [
+        {
+            "order_id": order.id,
+            "customer_name": order.customer_name,
+            "delivery_date": order.delivery_date,
+            "cells_needed": order.cells_needed,
+            "cells_allocated": allocated.get(order.id, 0),
+            "allocations": by_order.get(order.id, []),
+        }
+        for order in sorted(orders, key=lambda order: (order.delivery_date, order.id))
+    ]
+    cells_needed = sum(order.cells_needed for order in orders)
+    cells_allocated = sum(allocated.values())
+    stock_cells = sum(package.available_cells for package in packages)
+    return {
+        "committed": committed,
+        "orders_considered": len(orders),
+        "orders_fulfilled": sum(1 for item in items if item["cells_allocated"] == item["cells_needed"]),
+        "orders_partial": sum(1 for item in items if 0 < item["cells_allocated"] < item["cells_needed"]),
+        "cells_needed": cells_needed,
+        "cells_allocated": cells_allocated,
+        "cells_short": cells_needed - cells_allocated,
+        "stock_cells": stock_cells,
+        "stock_cells_left": stock_cells - cells_allocated,
+        "orders": items,
+    }
+
+
+def _commit(db: Session, user_id, allocations, today: date):
+    unresolved = {a.order.customer_name for a in allocations if a.order.customer_id is None}
+    resolved = customers.resolve_many(db, user_id, unresolved) if unresolved else {}
+    sales = [
+        {
+            "id": uuid.uuid4(),
+            "stock_package_id": allocation.package.id,
+            "customer_name": allocation.order.customer_name,
+            "customer_id": allocation.order.customer_id or resolved.get(allocation.order.customer_name),
+            "cells_sold": allocation.cells,
+            "sale_date": today,
+        }
+        for allocation in allocations
+    ]
+    packages = {allocation.package.id: allocation.package for allocation in allocations}
+    stock_allocation.record_sales(db, user_id, sales, packages, today)
+
+    # Mismo avance de pedido que create_production, pero en cells_allocated
+    delivered = {}
+    for allocation in allocations:
+        delivered[allocation.order.id] = delivered.get(allocation.order.id, 0) + allocation.cells
+    orders = {allocation.order.id: allocation.order for allocation in allocations}
+    now = datetime.utcnow()
+    changes, pending = [], 0
+    for order_id, cells in delivered.items():
+        order = orders[order_id]
+        allocated = (order.cells_allocated or 0) + cells
+        remaining = max(order.number_of_cells - (order.cells_produced or 0) - allocated, 0)
+        status = "in_production" if remaining else "completed"
+        pending += dashboard_summary.pending_delta(order.status, status)
+        changes.append({
+            "order_id": order_id, "allocated": allocated, "remaining": remaining, "status": status, "now": now,
+        })
+    table = CustomerOrder.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("order_id"))
+        .values(
+            cells_allocated=bindparam("allocated"),
+            cells_remaining=bindparam("remaining"),
+            status=bindparam("status"),
+            updated_at=bindparam("now"),
+        ),
+        changes,
+    )
+    dashboard_summary.orders_changed(db, user_id, pending)
+    collection_versions.bump(db, user_id, collection_versions.ORDERS)
+
+
+def fulfillment_plan(db: Session, user_id, commit: bool = False, today: date = None):
+    """
+    Calcula el plan del usuario y, con `commit`, lo graba (sin commit de la sesión).
+    """
+    today = today or date.today()
+    orders, packages = load(db, user_id, today, lock=commit)
+    allocations = plan(orders, packages, today)
+    if commit and allocations:
+        _commit(db, user_id, allocations, today)
+    return summarize(orders, packages, allocations, committed=commit and bool(allocations))
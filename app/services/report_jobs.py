@@ -0,0 +1,292 @@
+"""
+Renderizado de reportes PDF en un pool de procesos.
+
+El request solo arma las filas (strings) y encola el trabajo; reportlab corre
+en otro proceso y escribe el archivo en REPORT_OUTPUT_DIR. La tabla se parte
+en bloques de PDF_ROWS_PER_TABLE filas para que el layout sea lineal en
+vez de re-medir una única tabla gigante en cada salto de página.
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from app.core.config import settings
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def render_pdf(path: str, data: list, rows_per_table: int):
+    """
+    Escribe `data` (encabezado + filas) como PDF en `path`.
+    Devuelve (inicio, segundos de render) para las métricas del job.
+    """
+    started = time.time()
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+    header, body = data[0], data[1:]
+    tmp_path = f"{path}.tmp"
+    doc = SimpleDocTemplate(tmp_path, pagesize=letter)
+    col_widths = [doc.width / len(header)] * len(header)
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BOX', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+    elements = []
+    for start in range(0, max(len(body), 1), rows_per_table):
+        table = Table([header] + body[start:start + rows_per_table], colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        elements.append(table)
+    doc.build(elements)
+    os.replace(tmp_path, path)
+    return started, time.time() - started
+
+
+class ReportJob:
+    def __init__(self, user_id, report_type: str, filename: str, rows, path: str, owns_file: bool = True, cache_key=None):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.report_type = report_type
+        self.filename = filename
+        self.rows = rows
+        self.path = path
+        self.owns_file = owns_file
+        self.cache_key = cache_key
+        self.status = STATUS_PENDING
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+        self.submitted = time.time()
+        self.queued_seconds = None
+        self.render_seconds = None
+        self.future = None
+        self.on_success = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "report_type": self.report_type,
+            "rows": self.rows,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": self.queued_seconds,
+            "render_seconds": self.render_seconds,
+            "error": self.error,
+        }
+
+    def to_record(self):
+        return {
+            **{name: getattr(self, name) for name in _RECORD_FIELDS},
+            "user_id": str(self.user_id),
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict):
+        job = cls.__new__(cls)
+        for name in _RECORD_FIELDS:
+            setattr(job, name, record.get(name))
+        job.user_id = uuid.UUID(record["user_id"])
+        job.created_at = datetime.fromisoformat(record["created_at"])
+        job.finished_at = datetime.fromisoformat(record["finished_at"]) if record.get("finished_at") else None
+        job.future = None
+        job.on_success = None
+        job.done = threading.Event()
+        if job.status != STATUS_PENDING:
+            job.done.set()
+        return job
+
+
+_RECORD_FIELDS = (
+    "id", "report_type", "filename", "rows", "path", "owns_file", "cache_key", "status", "error",
+    "submitted", "queued_seconds", "render_seconds",
+)
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ReportJobManager:
+    """
+    Jobs de PDF. El estado de cada job se escribe como {id}.json junto a su
+    archivo en output_dir, así cualquier worker que comparta el directorio
+    (todos los de un mismo host) puede consultarlo y servir la descarga; el
+    render y su future solo viven en el proceso que lo encoló. Los jobs se
+    descartan (junto con su archivo) después de REPORT_JOB_TTL segundos.
+    """
+
+    def __init__(self, max_workers: int, output_dir: str, ttl: int, rows_per_table: int):
+        self.max_workers = max_workers
+        self.output_dir = output_dir
+        self.ttl = ttl
+        self.rows_per_table = rows_per_table
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _record_path(self, job_id: str) -> str:
+        return os.path.join(self.output_dir, f"{job_id}.json")
+
+    def _save(self, job: ReportJob):
+        path = self._record_path(job.id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(job.to_record(), handle)
+        os.replace(tmp_path, path)
+
+    def _load(self, job_id: str):
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._record_path(job_id), encoding="utf-8") as handle:
+                return ReportJob.from_record(json.load(handle))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def submit(self, user_id, report_type: str, filename: str, data: list, on_success=None, cache_key=None) -> ReportJob:
+        """
+        Encola el render. `on_success(job)` se llama (en otro thread) cuando el archivo está listo.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._purge()
+        job = ReportJob(user_id, report_type, filename, rows=len(data) - 1, path="", cache_key=cache_key)
+        job.path = os.path.join(self.output_dir, f"{job.id}.pdf")
+        job.on_success = on_success
+        self._save(job)
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._get_executor().submit(render_pdf, job.path, data, self.rows_per_table)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def adopt(self, user_id, report_type: str, filename: str, path: str, cache_key=None) -> ReportJob:
+        """
+        Registra como terminado un archivo ya existente (p. ej. de la caché de artefactos).
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._purge()
+        job = ReportJob(user_id, report_type, filename, rows=None, path=path, owns_file=False, cache_key=cache_key)
+        job.status = STATUS_DONE
+        job.finished_at = job.created_at
+        job.queued_seconds = 0.0
+        job.render_seconds = 0.0
+        job.done.set()
+        self._save(job)
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def _finish(self, job: ReportJob, future):
+        # Cualquier error deja el job en FAILED: nunca queda PENDING para siempre
+        try:
+            started, render_seconds = future.result()
+            job.queued_seconds = round(max(started - job.submitted, 0), 4)
+            job.render_seconds = round(render_seconds, 4)
+            if job.on_success is not None:
+                try:
+                    job.on_success(job)
+                except OSError:
+                    # La caché es opcional: el PDF ya está en job.path
+                    pass
+            job.status = STATUS_DONE
+        except Exception as exc:
+            job.status = STATUS_FAILED
+            job.error = str(exc) or exc.__class__.__name__
+        finally:
+            job.finished_at = datetime.utcnow()
+            try:
+                self._save(job)
+            except OSError as exc:
+                job.status = STATUS_FAILED
+                job.error = str(exc) or exc.__class__.__name__
+            job.done.set()
+
+    def get(self, job_id: str, user_id):
+        """
+        Job del usuario: el de este proceso o, si lo encoló otro worker, el de su registro en disco.
+        """
+        job = self._jobs.get(job_id) or self._load(job_id)
+        if job is None or str(job.user_id) != str(user_id):
+            return None
+        return job
+
+    def wait(self, job: ReportJob, timeout=None):
+        if not job.done.wait(timeout):
+            raise TimeoutError(f"El job {job.id} no terminó en {timeout}s")
+        return job
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.status != STATUS_PENDING and job.submitted < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+            running = {job.id for job in self._jobs.values() if job.status == STATUS_PENDING}
+        # Registros de todos los workers; un PENDING más viejo que el TTL quedó de un proceso caído
+        try:
+            names = os.listdir(self.output_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            job_id, extension = os.path.splitext(name)
+            if extension != ".json" or job_id in running:
+                continue
+            job = self._load(job_id)
+            if job is None or job.submitted >= cutoff:
+                continue
+            for path in ([job.path] if job.owns_file else []) + [self._record_path(job_id)]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        """
+        Jobs encolados por este proceso (el pool de render es por worker).
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        done = [job for job in jobs if job.status == STATUS_DONE and job.owns_file]
+        render = [job.render_seconds for job in done]
+        queued = [job.queued_seconds for job in done]
+        return {
+            "max_workers": self.max_workers,
+            "pending": sum(1 for job in jobs if job.status == STATUS_PENDING),
+            "done": len(done),
+            "failed": sum(1 for job in jobs if job.status == STATUS_FAILED),
+            "avg_render_seconds": round(sum(render) / len(render), 4) if render else None,
+            "max_render_seconds": max(render) if render else None,
+            "avg_queued_seconds": round(sum(queued) / len(queued), 4) if queued else None,
+            "max_queued_seconds": max(queued) if queued else None,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+report_jobs = ReportJobManager(
+    max_workers=settings.REPORT_WORKERS,
+    output_dir=settings.REPORT_OUTPUT_DIR,
+    ttl=settings.REPORT_JOB_TTL,
+    rows_per_table=settings.PDF_ROWS_PER_TABLE,
+)
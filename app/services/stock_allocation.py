@@ -0,0 +1,123 @@
+"""
+Venta de una cantidad de celdas repartida entre varios paquetes (FIFO por vencimiento).
+
+Los paquetes se bloquean con SELECT ... FOR UPDATE en orden de vencimiento;
+las ventas se insertan y los paquetes se actualizan con un executemany cada
+uno, dentro de la transacción de la sesión (el commit lo hace el llamador).
+El UPDATE exige que available_cells siga siendo el valor leído: donde FOR
+UPDATE no bloquea (SQLite) una venta concurrente da StockChanged, no sobreventa.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+from app.models.stock import StockPackage, StockSale
+from app.services import collection_versions, customers, dashboard_summary
+
+
+class InsufficientStock(Exception):
+    def __init__(self, available: int):
+        super().__init__(f"Celdas insuficientes en stock. Disponibles: {available}")
+        self.available = available
+
+
+class StockChanged(Exception):
+    def __init__(self):
+        super().__init__("El stock cambió durante la venta, reintentá.")
+
+
+def allocate(db: Session, user_id, cells: int):
+    """
+    Devuelve [(paquete, celdas)] tomando primero los paquetes que vencen antes.
+    Lanza InsufficientStock si el usuario no tiene `cells` celdas disponibles.
+    Los paquetes con fecha pasada que el barrido todavía no marcó no cuentan.
+    """
+    rows = db.execute(
+        select(StockPackage.id, StockPackage.available_cells, StockPackage.expiration_date)
+        .where(
+            StockPackage.user_id == user_id,
+            StockPackage.is_expired == False,
+            StockPackage.expiration_date >= date.today(),
+            StockPackage.available_cells > 0,
+        )
+        .order_by(StockPackage.expiration_date, StockPackage.created_at, StockPackage.id)
+        .with_for_update()
+    )
+    allocations = []
+    remaining = cells
+    for package in rows:
+        if remaining == 0:
+            break
+        taken = min(package.available_cells, remaining)
+        allocations.append((package, taken))
+        remaining -= taken
+    if remaining:
+        raise InsufficientStock(cells - remaining)
+    return allocations
+
+
+def sell(db: Session, user_id, customer_name: str, cells: int, sale_date: date = None):
+    """
+    Vende `cells` celdas a `customer_name` repartidas FIFO por vencimiento.
+    Devuelve las filas de StockSale insertadas (como dicts).
+    """
+    sale_date = sale_date or date.today()
+    allocations = allocate(db, user_id, cells)
+    customer_id = customers.resolve(db, user_id, customer_name)
+
+    sales = [
+        {
+            "id": uuid.uuid4(),
+            "stock_package_id": package.id,
+            "customer_name": customer_name,
+            "customer_id": customer_id,
+            "cells_sold": taken,
+            "sale_date": sale_date,
+        }
+        for package, taken in allocations
+    ]
+    record_sales(db, user_id, sales, {package.id: package for package, _ in allocations}, sale_date)
+    return sales
+
+
+def record_sales(db: Session, user_id, sales: list, packages: dict, sale_date: date):
+    """
+    Inserta `sales` y descuenta sus celdas de `packages` ({id: fila con
+    available_cells y expiration_date}, bloqueadas por el llamador). Los
+    paquetes que quedan en 0 se marcan como expirados. Lanza StockChanged
+    si algún paquete ya no tiene las celdas leídas (el llamador hace rollback).
+    """
+    taken = defaultdict(int)
+    for sale in sales:
+        taken[sale["stock_package_id"]] += sale["cells_sold"]
+
+    table = StockPackage.__table__
+    result = db.execute(
+        update(table)
+        .where(table.c.id == bindparam("package_id"), table.c.available_cells == bindparam("available"))
+        .values(
+            available_cells=table.c.available_cells - bindparam("cells"),
+            sold_cells=table.c.sold_cells + bindparam("cells"),
+            is_expired=bindparam("sold_out"),
+        ),
+        [
+            {
+                "package_id": package_id,
+                "available": packages[package_id].available_cells,
+                "cells": cells,
+                "sold_out": cells == packages[package_id].available_cells,
+            }
+            for package_id, cells in taken.items()
+        ],
+    )
+    if result.rowcount != len(taken):
+        raise StockChanged()
+    db.execute(insert(StockSale), sales)
+
+    sold_out = [
+        packages[package_id].expiration_date
+        for package_id, cells in taken.items() if cells == packages[package_id].available_cells
+    ]
+    dashboard_summary.sales_recorded(db, user_id, sum(taken.values()), sale_date, sold_out)
+    collection_versions.bump(db, user_id, collection_versions.STOCK)
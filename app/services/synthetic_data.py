@@ -0,0 +1,254 @@
+"""
+Generador de datos sintéticos para pruebas de capacidad.
+
+Cada usuario sintético tiene una cartera de clientes (con sus trigramas de
+búsqueda), producciones con estacionalidad (más traslarves en
+primavera/verano) en 1-2 de sus colmenas, tasa de aceptación ~ Beta(8, 3)
+(con su resumen por colmena y mes), un paquete de stock por
+producción cosechada con sell-through ~ Beta(5, 2) repartido en 1-4 ventas,
+y pedidos cuyo estado sale de la fecha de entrega.
+
+Todo depende de (seed, índice de usuario, anchor): el mismo comando genera
+los mismos ids y valores, así que dos corridas de benchmark son comparables.
+Las filas se arman por lotes y se cargan con executemany de insert(); en
+MySQL, con load_data=True, por LOAD DATA LOCAL INFILE. Los resúmenes del
+dashboard no se tocan: la primera lectura de /stats los reconstruye.
+"""
+import os
+import random
+import tempfile
+import time
+import uuid
+from itertools import accumulate
+from datetime import date, datetime, time as dt_time, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import NullPool
+from app.models.analytics import HiveMonthlyStat
+from app.models.customer import Customer, CustomerTrigram
+from app.models.order import CustomerOrder
+from app.models.production import ProductionHive, ProductionRecord
+from app.models.stock import StockPackage, StockSale
+from app.models.types import GUID
+from app.models.user import User
+from app.services import hive_stats
+from app.services.customers import normalize, trigrams
+
+DEFAULT_BATCH_SIZE = 5000
+SYNTHETIC_PASSWORD = "synthetic"
+
+# Peso relativo de cada mes (enero..diciembre) en las fechas de traslarve
+MONTH_WEIGHTS = (9, 8, 6, 3, 1, 1, 1, 2, 6, 9, 10, 10)
+HARVEST_DAYS = 10
+SHELF_LIFE_DAYS = (7, 21)
+CUSTOMERS_PER_USER = 60
+HIVES_PER_USER = 12
+
+# Orden de carga: los padres antes que los hijos
+TABLES = (
+    User, Customer, CustomerTrigram, ProductionRecord, ProductionHive, HiveMonthlyStat,
+    StockPackage, StockSale, CustomerOrder,
+)
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _seasonal_dates(rng: random.Random, anchor: date, days: int, count: int):
+    """
+    `count` fechas en los `days` días anteriores a `anchor`, pesadas por MONTH_WEIGHTS.
+    """
+    window = [anchor - timedelta(days=offset) for offset in range(days)]
+    weights = [MONTH_WEIGHTS[day.month - 1] for day in window]
+    return sorted(rng.choices(window, weights=weights, k=count))
+
+
+def _at(day: date, rng: random.Random) -> datetime:
+    return datetime.combine(day, dt_time(rng.randrange(7, 19), rng.randrange(60), rng.randrange(60)))
+
+
+def generate_user(seed, index: int, anchor: date, productions: int, orders: int, days: int, password_hash: str):
+    """
+    Devuelve {modelo: [filas]} de un usuario sintético.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    user_id = _uuid(rng)
+    created = _at(anchor - timedelta(days=days), rng)
+    rows = {model: [] for model in TABLES}
+    rows[User].append({
+        "id": user_id, "email": f"synthetic-{seed}-{index}@example.com", "password_hash": password_hash,
+        "name": f"Apiario sintético {index}", "role": "beekeeper", "created_at": created, "updated_at": created,
+    })
+
+    # Pocos clientes concentran la mayoría de las compras (pesos ~ 1/rango)
+    customers = []
+    for n in range(CUSTOMERS_PER_USER):
+        name = f"Cliente {index}-{n}"
+        customer_id = _uuid(rng)
+        customers.append((customer_id, name))
+        rows[Customer].append({"id": customer_id, "user_id": user_id, "name": name, "name_key": normalize(name), "created_at": created})
+        rows[CustomerTrigram].extend(
+            {"user_id": user_id, "trigram": gram, "customer_id": customer_id} for gram in sorted(trigrams(normalize(name)))
+        )
+    customer_weights = list(accumulate(1 / (rank + 1) for rank in range(CUSTOMERS_PER_USER)))
+    hives = [f"Colmena {n + 1}" for n in range(HIVES_PER_USER)]
+    snapshots = []
+
+    for transfer_date in _seasonal_dates(rng, anchor, days, productions):
+        larvae = rng.randrange(30, 121)
+        accepted = round(larvae * rng.betavariate(8, 3))
+        accepted_on = transfer_date + timedelta(days=3)
+        harvested = accepted_on <= anchor
+        produced = round(accepted * rng.uniform(0.85, 1.0)) if harvested else 0
+        production_id = _uuid(rng)
+        stamp = _at(transfer_date, rng)
+        rows[ProductionRecord].append({
+            "id": production_id, "user_id": user_id, "transfer_date": transfer_date,
+            "larvae_transferred": larvae, "accepted_cells": accepted if harvested else None,
+            "acceptance_date": accepted_on if harvested else None, "cells_produced": produced,
+            "order_id": None, "notes": None, "status": "active", "created_at": stamp, "updated_at": stamp,
+        })
+        production_hives = rng.sample(hives, rng.randrange(1, 3))
+        rows[ProductionHive].extend(
+            {"id": _uuid(rng), "production_id": production_id, "hive_name": name, "created_at": stamp}
+            for name in production_hives
+        )
+        snapshots.append((
+            hive_stats.snapshot(production_hives, transfer_date, larvae, accepted if harvested else None, produced), 1
+        ))
+
+        production_date = transfer_date + timedelta(days=HARVEST_DAYS)
+        if not produced or production_date > anchor:
+            continue
+        expiration_date = production_date + timedelta(days=rng.randrange(*SHELF_LIFE_DAYS))
+        selling_days = max((min(expiration_date, anchor) - production_date).days, 0)
+        sold = round(produced * rng.betavariate(5, 2) * min(1.0, (selling_days + 1) / 7))
+        package_id = _uuid(rng)
+        rows[StockPackage].append({
+            "id": package_id, "user_id": user_id, "production_id": production_id, "production_date": production_date,
+            "total_cells": produced, "available_cells": produced - sold, "sold_cells": sold,
+            "expiration_date": expiration_date, "is_expired": expiration_date < anchor or sold == produced,
+            "created_at": _at(production_date, rng),
+        })
+
+        # Reparte lo vendido en 1-4 ventas dentro de la vida útil del paquete
+        remaining = sold
+        parts = min(rng.randrange(1, 5), sold)
+        for part in range(parts):
+            cells = remaining if part == parts - 1 else rng.randrange(1, remaining - (parts - part - 1) + 1)
+            remaining -= cells
+            sale_date = production_date + timedelta(days=rng.randrange(selling_days + 1))
+            customer_id, customer_name = rng.choices(customers, cum_weights=customer_weights)[0]
+            rows[StockSale].append({
+                "id": _uuid(rng), "stock_package_id": package_id,
+                "customer_name": customer_name, "customer_id": customer_id,
+                "cells_sold": cells, "sale_date": sale_date, "created_at": _at(sale_date, rng),
+            })
+
+    rows[HiveMonthlyStat].extend(
+        {"user_id": user_id, "month": month, "hive_name": hive, **deltas}
+        for (month, hive), deltas in sorted(hive_stats.buckets(snapshots).items())
+    )
+
+    for created_on in _seasonal_dates(rng, anchor, days, orders):
+        cells = rng.choice((10, 20, 25, 50, 100, 200))
+        delivery_date = created_on + timedelta(days=rng.randrange(10, 61))
+        transfer_date = delivery_date - timedelta(days=rng.randrange(12, 18))
+        if delivery_date < anchor:
+            status, produced = "completed", cells
+        elif transfer_date <= anchor:
+            status, produced = "in_production", rng.randrange(0, cells)
+        else:
+            status, produced = "pending", 0
+        stamp = _at(created_on, rng)
+        customer_id, customer_name = rng.choices(customers, cum_weights=customer_weights)[0]
+        rows[CustomerOrder].append({
+            "id": _uuid(rng), "user_id": user_id, "customer_name": customer_name, "customer_id": customer_id,
+            "number_of_cells": cells, "delivery_date": delivery_date, "larvae_transfer_date": transfer_date,
+            "status": status, "cells_produced": produced, "cells_remaining": cells - produced,
+            "created_at": stamp, "updated_at": stamp,
+        })
+    return rows
+
+
+def _executemany(conn, model, rows):
+    conn.execute(insert(model), rows)
+
+
+def _tsv_value(column, value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(column.type, GUID):
+        return value.hex
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _load_data(conn, model, rows):
+    """
+    Carga `rows` con LOAD DATA LOCAL INFILE desde un TSV temporal.
+    Las claves GUID van en hex y se convierten con UNHEX en el SET.
+    """
+    table = model.__table__
+    columns = [table.c[name] for name in rows[0]]
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as handle:
+            for row in rows:
+                handle.write("\t".join(_tsv_value(column, row[column.name]) for column in columns) + "\n")
+        targets = ", ".join(f"@{c.name}" if isinstance(c.type, GUID) else f"`{c.name}`" for c in columns)
+        assignments = ", ".join(f"`{c.name}` = UNHEX(@{c.name})" for c in columns if isinstance(c.type, GUID))
+        conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table.name}` CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({targets})"
+            + (f" SET {assignments}" if assignments else ""),
+            (path,),
+        )
+    finally:
+        os.remove(path)
+
+
+def load_data_engine(url: str):
+    """
+    Engine aparte con local_infile habilitado, solo para la carga.
+    """
+    return create_engine(url, poolclass=NullPool, connect_args={"local_infile": True})
+
+
+def generate(engine, users: int, productions: int, orders: int, seed=0, anchor: date = None,
+             days: int = 365, batch_size: int = DEFAULT_BATCH_SIZE, load_data: bool = False, password_hash: str = None):
+    """
+    Genera y carga `users` usuarios con `productions` producciones y `orders`
+    pedidos cada uno. Devuelve filas por tabla, segundos e ids de usuario.
+    """
+    if load_data and engine.dialect.name != "mysql":
+        raise ValueError("LOAD DATA solo está disponible en MySQL")
+    if password_hash is None:
+        from app.core.passwords import pwd_context
+
+        password_hash = pwd_context.hash(SYNTHETIC_PASSWORD)
+    anchor = anchor or date.today()
+    write = _load_data if load_data else _executemany
+    pending = {model: [] for model in TABLES}
+    counts = {model.__tablename__: 0 for model in TABLES}
+    user_ids = []
+    started = time.perf_counter()
+
+    def flush():
+        with engine.begin() as conn:
+            for model in TABLES:
+                if pending[model]:
+                    write(conn, model, pending[model])
+                    counts[model.__tablename__] += len(pending[model])
+                    pending[model] = []
+
+    for index in range(users):
+        generated = generate_user(seed, index, anchor, productions, orders, days, password_hash)
+        user_ids.append(generated[User][0]["id"])
+        for model, rows in generated.items():
+            pending[model].extend(rows)
+        if max(len(rows) for rows in pending.values()) >= batch_size:
+            flush()
+    flush()
+    return {"rows": counts, "seconds": round(time.perf_counter() - started, 2), "user_ids": user_ids}
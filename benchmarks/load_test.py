@@ -0,0 +1,211 @@
+"""
+Prueba de carga reproducible de los endpoints calientes.
+
+Levanta `main.app` en proceso (httpx + ASGITransport, con lifespan) contra
+una base SQLite temporal, siembra --users usuarios con --rows pedidos y
+producciones cada uno (app.services.synthetic_data) y dispara --requests
+requests por escenario con --concurrency clientes simultáneos. Por escenario escribe
+p50/p95/p99, throughput, errores y sentencias SQL / tiempo de base por
+request (de las métricas de app.core.metrics) en un JSON con claves
+ordenadas, para poder diffearlo entre commits.
+
+    python benchmarks/load_test.py --users 5 --rows 500 --concurrency 8 --requests 300 \\
+        --output load_test.json
+
+Con DATABASE_URL apunta a otra base (p. ej. un MySQL local). La siembra y el
+orden de los requests dependen solo de --seed. Necesita requirements-dev.txt.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGE_LIMIT = 50
+# Paquetes elegibles para el escenario de venta (1 celda por request)
+SELLABLE_CELLS = 20
+
+
+def scenarios(fixtures):
+    """
+    [(nombre, armar)]: armar(rng) devuelve (método, path, usuario, body) de un request.
+    """
+    def pick(rng):
+        return rng.choice(fixtures)
+
+    def sell(rng, user):
+        package_id = rng.choice(user["packages"])
+        body = {"stock_package_id": package_id, "customer_name": "carga", "cells_sold": 1}
+        return "POST", f"/api/stock/{package_id}/sell", user, body
+
+    return [
+        ("dashboard_stats", lambda rng: ("GET", "/api/dashboard/stats", pick(rng), None)),
+        ("orders_list", lambda rng: ("GET", f"/api/order/?limit={PAGE_LIMIT}", pick(rng), None)),
+        ("productions_list", lambda rng: ("GET", f"/api/productions/?limit={PAGE_LIMIT}", pick(rng), None)),
+        ("stock_list", lambda rng: ("GET", f"/api/stock/?limit={PAGE_LIMIT}", pick(rng), None)),
+        ("stock_sell", lambda rng: sell(rng, pick(rng))),
+        ("reports_csv", lambda rng: ("GET", "/api/reports/reports/export/csv?report_type=orders", pick(rng), None)),
+        ("fulfillment_plan", lambda rng: ("GET", "/api/order/fulfillment-plan", pick(rng), None)),
+    ]
+
+
+def seed(users: int, rows: int, seed_value):
+    """
+    Carga datos con app.services.synthetic_data y devuelve [{headers, packages}]
+    por usuario; `packages` son los paquetes con celdas suficientes para vender.
+    """
+    from sqlalchemy import select
+    from app.core.database import SessionLocal, engine
+    from app.models.stock import StockPackage
+    from app.routers.auth import create_access_token
+    from app.services import synthetic_data
+
+    result = synthetic_data.generate(engine, users=users, productions=rows, orders=rows, seed=seed_value)
+    fixtures = []
+    db = SessionLocal()
+    try:
+        for user_id in result["user_ids"]:
+            packages = db.scalars(
+                select(StockPackage.id).where(
+                    StockPackage.user_id == user_id,
+                    StockPackage.available_cells >= SELLABLE_CELLS,
+                )
+            ).all()
+            fixtures.append({
+                "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"},
+                "packages": [str(package_id) for package_id in packages],
+            })
+    finally:
+        db.close()
+    return fixtures
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def db_totals():
+    from app.core.metrics import db_statements, db_time
+
+    statements = db_statements.totals().values()
+    seconds = db_time.totals().values()
+    return sum(c for c, _ in statements), sum(s for _, s in statements), sum(s for _, s in seconds)
+
+
+async def run_scenario(client, build, requests: int, concurrency: int, rng: random.Random):
+    calls = [build(rng) for _ in range(requests)]
+    latencies = []
+    errors = {}
+    queue = iter(calls)
+
+    async def worker():
+        for method, path, user, body in queue:
+            started = time.perf_counter()
+            response = await client.request(method, path, headers=user["headers"], json=body)
+            await response.aread()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    count_before, statements_before, seconds_before = db_totals()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    count_after, statements_after, seconds_after = db_totals()
+
+    latencies.sort()
+    measured = max(count_after - count_before, 1)
+    return {
+        "requests": requests,
+        "errors": {str(code): n for code, n in sorted(errors.items())},
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "sql_per_request": round((statements_after - statements_before) / measured, 2),
+        "db_ms_per_request": round((seconds_after - seconds_before) / measured * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def drive(args, fixtures):
+    import httpx
+    import main as app_main
+
+    rng = random.Random(args.seed)
+    results = {}
+    app = app_main.app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            for name, build in scenarios(fixtures):
+                if args.only and name not in args.only:
+                    continue
+                # Calentamiento: planes de consulta, pools y caches de serialización
+                await run_scenario(client, build, min(args.concurrency, args.requests), args.concurrency, rng)
+                results[name] = await run_scenario(client, build, args.requests, args.concurrency, rng)
+                print(f"{name}: {results[name]}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de los endpoints calientes")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=500, help="pedidos, producciones y paquetes por usuario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=300, help="requests por escenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="*", help="correr solo estos escenarios")
+    parser.add_argument("--output", default="load_test.json")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/load_test.db"
+    os.environ.setdefault("EXPIRATION_SWEEP_INTERVAL", "0")
+    os.environ.setdefault("QUERY_LOG_MODE", "off")
+
+    import manage
+    from app.core.database import engine
+
+    manage.main(["init-db"])
+    fixtures = seed(args.users, args.rows, args.seed)
+    results = asyncio.run(drive(args, fixtures))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "users": args.users,
+            "rows_per_user": args.rows,
+            "concurrency": args.concurrency,
+            "requests_per_endpoint": args.requests,
+            "seed": args.seed,
+        },
+        "endpoints": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+        output.write("\n")
+    print(f"Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
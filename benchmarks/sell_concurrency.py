@@ -0,0 +1,108 @@
+"""
+Prueba de concurrencia de POST /api/stock/{id}/sell.
+
+Crea un paquete de --cells celdas y lo martilla desde --threads threads con
+ventas de --per-sale celdas. Al final verifica que no se haya sobrevendido:
+ventas aceptadas * per_sale == sold_cells, available_cells >= 0 y la suma
+de stock_sales coincide con el paquete.
+
+    python benchmarks/sell_concurrency.py --threads 32 --cells 100 --attempts 400
+
+Por defecto usa una base SQLite temporal; con DATABASE_URL apunta a otra base.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=400, help="ventas totales a intentar")
+    parser.add_argument("--cells", type=int, default=100, help="celdas del paquete")
+    parser.add_argument("--per-sale", type=int, default=1)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/sell_concurrency.db"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+    from app.core.database import Base, SessionLocal, engine
+    from app.models.stock import StockPackage, StockSale
+    import main as app_main
+
+    Base.metadata.create_all(bind=engine)
+
+    with TestClient(app_main.app) as client:
+        email = f"stress-{uuid.uuid4().hex[:8]}@example.com"
+        client.post("/api/auth/register", json={"email": email, "password": "stress", "name": "stress"})
+        token = client.post("/api/auth/login", json={"email": email, "password": "stress"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        package = client.post("/api/stock/", headers=headers, json={
+            "production_id": str(uuid.uuid4()),
+            "production_date": str(date.today()),
+            "total_cells": args.cells,
+            "available_cells": args.cells,
+            "expiration_date": str(date.today() + timedelta(days=10)),
+        }).json()
+        stock_id = package["id"]
+
+        statuses = Counter()
+        lock = threading.Lock()
+        remaining = [args.attempts]
+
+        def worker():
+            while True:
+                with lock:
+                    if remaining[0] == 0:
+                        return
+                    remaining[0] -= 1
+                response = client.post(f"/api/stock/{stock_id}/sell", headers=headers, json={
+                    "stock_package_id": stock_id,
+                    "customer_name": "stress",
+                    "cells_sold": args.per_sale,
+                })
+                with lock:
+                    statuses[response.status_code] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    db = SessionLocal()
+    try:
+        stored = db.get(StockPackage, uuid.UUID(stock_id))
+        sales_total = db.scalar(
+            select(func.coalesce(func.sum(StockSale.cells_sold), 0)).where(StockSale.stock_package_id == stored.id)
+        )
+    finally:
+        db.close()
+
+    accepted = statuses[201] * args.per_sale
+    print(f"respuestas: {dict(statuses)}")
+    print(f"available_cells={stored.available_cells} sold_cells={stored.sold_cells} "
+          f"stock_sales={sales_total} aceptadas={accepted} is_expired={stored.is_expired}")
+
+    ok = (
+        stored.available_cells >= 0
+        and stored.sold_cells == accepted == sales_total
+        and stored.available_cells + stored.sold_cells == args.cells
+        and stored.is_expired == (stored.available_cells == 0)
+    )
+    print("OK" if ok else "SOBREVENTA / INCONSISTENCIA")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
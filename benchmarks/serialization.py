@@ -0,0 +1,146 @@
+"""
+Costo por fila de los listados: objetos ORM + response_model vs columnas + TypeAdapter.
+
+Siembra --rows pedidos, producciones y paquetes de stock para un usuario y
+pide páginas de --limit filas a cada listado. "before" es un endpoint
+montado acá que reproduce la implementación anterior (select de la
+entidad, Page de objetos ORM validados por FastAPI con from_attributes);
+"after" es el endpoint real. Imprime µs por fila (mediana) como JSON.
+
+    python benchmarks/serialization.py --rows 2000 --limit 500 --repeat 30
+
+Por defecto usa una base SQLite temporal; con DATABASE_URL apunta a otra base.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def baseline_router():
+    """
+    Listados como estaban antes: entidades ORM y Page[...] validado por FastAPI.
+    """
+    from typing import Optional
+    from fastapi import APIRouter, Depends, Query
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import selectinload
+    from app.core.pagination import MAX_PAGE_SIZE, paginate_async
+    from app.models.order import CustomerOrder
+    from app.models.production import ProductionRecord
+    from app.models.stock import StockPackage
+    from app.models.user import User
+    from app.routers.auth import get_async_db, get_current_user
+    from app.schemas.order import OrderOut
+    from app.schemas.pagination import Page
+    from app.schemas.production import ProductionOut
+    from app.schemas.stock import StockOut
+
+    router = APIRouter()
+
+    def listing(path, model, schema, options=()):
+        @router.get(path, response_model=Page[schema])
+        async def endpoint(
+            cursor: Optional[str] = Query(None),
+            limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+            db: AsyncSession = Depends(get_async_db),
+            current_user: User = Depends(get_current_user),
+        ):
+            stmt = select(model).options(*options).where(model.user_id == current_user.id)
+            items, next_cursor = await paginate_async(db, stmt, model, cursor, limit)
+            return Page(items=items, next_cursor=next_cursor)
+
+    listing("/order/", CustomerOrder, OrderOut)
+    listing("/stock/all", StockPackage, StockOut)
+    listing("/productions/", ProductionRecord, ProductionOut, (selectinload(ProductionRecord.hives),))
+    return router
+
+
+def seed(user_id, rows):
+    from sqlalchemy import insert
+    from app.core.database import SessionLocal
+    from app.models.order import CustomerOrder
+    from app.models.production import ProductionRecord
+    from app.models.stock import StockPackage
+
+    now = datetime.utcnow()
+    today = date.today()
+    db = SessionLocal()
+    try:
+        db.execute(insert(CustomerOrder), [{
+            "id": uuid.uuid4(), "user_id": user_id, "customer_name": f"cliente {i}", "number_of_cells": 10 + i % 50,
+            "delivery_date": today + timedelta(days=i % 60), "larvae_transfer_date": today + timedelta(days=i % 30),
+            "status": "pending", "created_at": now - timedelta(seconds=i), "updated_at": now,
+        } for i in range(rows)])
+        db.execute(insert(ProductionRecord), [{
+            "id": uuid.uuid4(), "user_id": user_id, "transfer_date": today - timedelta(days=i % 90),
+            "larvae_transferred": 60, "accepted_cells": 40, "cells_produced": 35, "notes": "lote",
+            "status": "active", "created_at": now - timedelta(seconds=i), "updated_at": now,
+        } for i in range(rows)])
+        db.execute(insert(StockPackage), [{
+            "id": uuid.uuid4(), "user_id": user_id, "production_id": uuid.uuid4(), "production_date": today,
+            "total_cells": 100, "available_cells": 100 - i % 100, "sold_cells": i % 100,
+            "expiration_date": today + timedelta(days=10), "is_expired": False, "created_at": now - timedelta(seconds=i),
+        } for i in range(rows)])
+        db.commit()
+    finally:
+        db.close()
+
+
+def per_row_us(client, url, headers, limit, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers, params={"limit": limit})
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    rows = len(response.json()["items"])
+    return round(statistics.median(timings) / rows * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="µs por fila de los listados antes/después")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/serialization.db"
+
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from app.core.config import settings
+    from app.core.database import Base, engine
+    import main as app_main
+
+    Base.metadata.create_all(bind=engine)
+    app_main.app.include_router(baseline_router(), prefix="/bench/before")
+
+    results = {"rows": args.rows, "limit": args.limit}
+    with TestClient(app_main.app) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        client.post("/api/auth/register", json={"email": email, "password": "bench", "name": "bench"})
+        login = client.post("/api/auth/login", json={"email": email, "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {login['access_token']}"}
+        user_id = uuid.UUID(jwt.decode(login["access_token"], settings.JWT_SECRET, algorithms=["HS256"])["sub"])
+        seed(user_id, args.rows)
+
+        for path in ("/order/", "/stock/all", "/productions/"):
+            before = per_row_us(client, f"/bench/before{path}", headers, args.limit, args.repeat)
+            after = per_row_us(client, f"/api{path}", headers, args.limit, args.repeat)
+            results[path] = {"before_us_per_row": before, "after_us_per_row": after, "speedup": round(before / after, 2)}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
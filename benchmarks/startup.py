@@ -0,0 +1,86 @@
+"""
+Tiempo de arranque de un worker: importar main, levantar el lifespan y
+responder el primer request.
+
+Cada corrida es un proceso nuevo (intérprete frío, como un worker recién
+lanzado). También mide aparte lo que costaba el create_all que antes corría
+al importar main, y lista los módulos pesados que quedaron cargados tras el
+import (deberían ser ninguno). Imprime mediana y p95 como JSON.
+
+    python benchmarks/startup.py --runs 15
+
+Por defecto usa una base SQLite temporal; con DATABASE_URL apunta a otra base.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("reportlab", "app.services.csv_import")
+
+# Corre en el proceso hijo; imprime una línea JSON con sus tiempos
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/").status_code == 200
+    ready = time.perf_counter()
+loaded = [name for name in {heavy!r} if name in sys.modules]
+create_all = None
+if {measure_create_all!r}:
+    from app.core.database import Base, engine
+    t = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    create_all = time.perf_counter() - t
+print(json.dumps({{"import": imported - started, "ready": ready - started, "create_all": create_all, "loaded": loaded}}))
+"""
+
+
+def run_child(measure_create_all: bool):
+    code = CHILD.format(heavy=HEAVY_MODULES, measure_create_all=measure_create_all)
+    env = dict(os.environ, EXPIRATION_SWEEP_INTERVAL="0")
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summary(values):
+    values = sorted(values)
+    return {
+        "p50_ms": round(statistics.median(values) * 1000, 1),
+        "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío de un worker")
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+    subprocess.run([sys.executable, "manage.py", "init-db"], cwd=ROOT, check=True, capture_output=True)
+
+    # La primera corrida calienta el caché de bytecode y no se cuenta
+    run_child(False)
+    runs = [run_child(measure_create_all=True) for _ in range(args.runs)]
+    print(json.dumps({
+        "runs": args.runs,
+        "import_main": summary([run["import"] for run in runs]),
+        "first_response": summary([run["ready"] for run in runs]),
+        "create_all_removed_from_import": summary([run["create_all"] for run in runs]),
+        "heavy_modules_loaded": sorted({name for run in runs for name in run["loaded"]}),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
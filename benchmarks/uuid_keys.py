@@ -0,0 +1,188 @@
+"""
+Comparación CHAR(36) vs GUID (BINARY(16) / uuid nativo) para claves UUID.
+
+Crea dos pares de tablas padre/hijo de prueba (bench_char36_* y bench_guid_*)
+con los mismos datos, mide el tamaño de tablas e índices y la latencia de
+JOINs por la foreign key, y al final las elimina. No toca las tablas de la
+aplicación.
+
+    DATABASE_URL=mysql://... python benchmarks/uuid_keys.py --parents 20000 --children 200000
+
+Sin DATABASE_URL usa una base SQLite temporal. El tamaño se lee de
+information_schema en MySQL, de pg_relation_size en PostgreSQL y de dbstat
+en SQLite (si está compilado). Imprime el resultado como JSON.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INSERT_CHUNK = 5000
+
+
+def char36_type():
+    from sqlalchemy.types import CHAR, TypeDecorator
+
+    # Representación anterior a v0004: texto con guiones
+    class Char36UUID(TypeDecorator):
+        impl = CHAR(36)
+        cache_ok = True
+
+        def process_bind_param(self, value, dialect):
+            return None if value is None else str(value)
+
+        def process_result_value(self, value, dialect):
+            return None if value is None else uuid.UUID(value)
+
+    return Char36UUID()
+
+
+def build_tables(metadata, prefix, key_type):
+    from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table
+
+    parent = Table(
+        f"{prefix}_parent", metadata,
+        Column("id", key_type, primary_key=True),
+        Column("name", String(64), nullable=False),
+    )
+    child = Table(
+        f"{prefix}_child", metadata,
+        Column("id", key_type, primary_key=True),
+        Column("parent_id", key_type, ForeignKey(parent.c.id), nullable=False),
+        Column("cells", Integer, nullable=False),
+        Index(f"ix_{prefix}_child_parent", "parent_id"),
+    )
+    return parent, child
+
+
+def table_sizes(conn, table_names):
+    from sqlalchemy import text
+
+    dialect = conn.dialect.name
+    data = index = 0
+    if dialect == "mysql":
+        for name in table_names:
+            conn.execute(text(f"ANALYZE TABLE `{name}`"))
+            data_length, index_length = conn.execute(text(
+                "SELECT data_length, index_length FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = :name"
+            ), {"name": name}).one()
+            # En InnoDB la PK es el índice clusterizado y está dentro de data_length
+            data += data_length
+            index += index_length
+    elif dialect == "postgresql":
+        for name in table_names:
+            data += conn.execute(text("SELECT pg_relation_size(:name)"), {"name": name}).scalar()
+            index += conn.execute(text("SELECT pg_indexes_size(:name)"), {"name": name}).scalar()
+    elif dialect == "sqlite":
+        try:
+            sizes = dict(conn.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")).all())
+        except Exception:
+            return {"data_bytes": None, "index_bytes": None}
+        for name in table_names:
+            data += sizes.get(name, 0)
+            index += sum(size for index_name, size in sizes.items() if index_name != name and name in index_name)
+    else:
+        return {"data_bytes": None, "index_bytes": None}
+    return {"data_bytes": int(data), "index_bytes": int(index)}
+
+
+def seed(conn, parent, child, parent_ids, children):
+    from sqlalchemy import insert
+
+    for start in range(0, len(parent_ids), INSERT_CHUNK):
+        conn.execute(insert(parent), [
+            {"id": parent_id, "name": f"parent-{parent_id.hex[:8]}"}
+            for parent_id in parent_ids[start:start + INSERT_CHUNK]
+        ])
+    for start in range(0, len(children), INSERT_CHUNK):
+        conn.execute(insert(child), [
+            {"id": child_id, "parent_id": parent_id, "cells": cells}
+            for child_id, parent_id, cells in children[start:start + INSERT_CHUNK]
+        ])
+
+
+def time_joins(conn, parent, child, samples, repeat):
+    from sqlalchemy import func, select
+
+    def lookup(ids):
+        return (
+            select(parent.c.name, func.sum(child.c.cells))
+            .join(child, child.c.parent_id == parent.c.id)
+            .where(parent.c.id.in_(ids))
+            .group_by(parent.c.name)
+        )
+
+    full = select(func.count()).select_from(child.join(parent, child.c.parent_id == parent.c.id))
+
+    def measure(build):
+        timings = []
+        for i in range(repeat):
+            stmt = build(i)
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        }
+
+    return {
+        "lookup_join": measure(lambda i: lookup(samples[i % len(samples)])),
+        "full_join": measure(lambda i: full),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CHAR(36) vs GUID: tamaño de índices y latencia de JOIN")
+    parser.add_argument("--parents", type=int, default=5000)
+    parser.add_argument("--children", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=50, help="ids de padre por consulta de lookup")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/uuid_keys.db"
+
+    from sqlalchemy import MetaData
+    from app.core.database import engine
+    from app.models.types import GUID
+
+    rng = random.Random(args.seed)
+    new_uuid = lambda: uuid.UUID(int=rng.getrandbits(128), version=4)
+    parent_ids = [new_uuid() for _ in range(args.parents)]
+    children = [(new_uuid(), rng.choice(parent_ids), rng.randint(1, 100)) for _ in range(args.children)]
+    samples = [rng.sample(parent_ids, min(args.batch, len(parent_ids))) for _ in range(args.repeat)]
+
+    results = {"dialect": engine.dialect.name, "parents": args.parents, "children": args.children}
+    for label, key_type in (("char36", char36_type()), ("guid", GUID())):
+        metadata = MetaData()
+        parent, child = build_tables(metadata, f"bench_{label}", key_type)
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+        try:
+            started = time.perf_counter()
+            with engine.begin() as conn:
+                seed(conn, parent, child, parent_ids, children)
+            insert_seconds = time.perf_counter() - started
+            with engine.connect() as conn:
+                sizes = table_sizes(conn, [parent.name, child.name])
+                joins = time_joins(conn, parent, child, samples, args.repeat)
+            results[label] = {"insert_seconds": round(insert_seconds, 3), **sizes, **joins}
+        finally:
+            metadata.drop_all(engine)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
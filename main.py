@@ -1,14 +1,27 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.routers import auth, order, productions, stock, reports, dashboard
+from app.core.metrics import RequestMetricsMiddleware
+from app.core.passwords import password_service
+from app.services.expiration_sweeper import expiration_sweeper
+from app.services.report_jobs import report_jobs
+from app.routers import analytics, auth, customers, order, productions, stock, reports, dashboard, internal
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# El esquema se crea con `python manage.py init-db`, no al importar: así
+# cada worker arranca sin abrir conexiones a la base.
 
-app = FastAPI(title="Queen Cell Management System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    expiration_sweeper.start()
+    yield
+    await expiration_sweeper.stop()
+    password_service.shutdown()
+    report_jobs.shutdown()
+
+
+app = FastAPI(title="Queen Cell Management System", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -18,14 +31,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Métricas por ruta (la más externa, para medir también CORS)
+app.add_middleware(RequestMetricsMiddleware)
 
 # Routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(order.router, prefix="/api/order", tags=["Orders"])
+app.include_router(customers.router, prefix="/api/customers", tags=["Customers"])
 app.include_router(productions.router, prefix="/api/productions", tags=["Productions"])
 app.include_router(stock.router, prefix="/api/stock", tags=["Stock"])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+app.include_router(internal.router, prefix="/api/internal", tags=["Internal"], include_in_schema=False)
 
 @app.get("/")
 def root():
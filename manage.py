@@ -0,0 +1,168 @@
+# manage.py
+import argparse
+import importlib
+import pkgutil
+from uuid import UUID
+from sqlalchemy import inspect
+from app.core.database import Base, SessionLocal, engine
+from app import migrations
+
+
+def load_models():
+    """
+    Importa todos los módulos de app.models para registrar sus tablas en Base.metadata.
+    """
+    import app.models
+
+    for module_info in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module_info.name}")
+
+
+def init_db(args):
+    """
+    Crea las tablas que falten. En una base vacía marca todas las migraciones
+    como aplicadas (el esquema ya nace al día); si no, aplica las pendientes.
+    """
+    load_models()
+    fresh = not inspect(engine).get_table_names()
+    Base.metadata.create_all(bind=engine)
+    if fresh:
+        migrations.stamp(engine)
+        print("Esquema creado.")
+        return
+    migrate(args)
+
+
+def migrate(args):
+    applied = migrations.upgrade(engine, target=args.target)
+    if not applied:
+        print("Esquema al día, no hay migraciones pendientes.")
+    for name in applied:
+        print(f"Aplicada {name}")
+
+
+def show_migrations(args):
+    for name, applied in migrations.status(engine):
+        print(f"[{'x' if applied else ' '}] {name}")
+
+
+def reconcile_dashboard(args):
+    from app.models.user import User
+    from app.services import dashboard_summary
+
+    db = SessionLocal()
+    try:
+        if args.user_id:
+            user_ids = [UUID(args.user_id)]
+        else:
+            user_ids = [row.id for row in db.query(User.id)]
+        drifted = 0
+        for user_id in user_ids:
+            if dashboard_summary.reconcile(db, user_id):
+                drifted += 1
+                print(f"Resumen corregido para {user_id}")
+            db.commit()
+        print(f"{len(user_ids)} usuarios revisados, {drifted} con diferencias.")
+    finally:
+        db.close()
+
+
+def rebuild_hive_stats(args):
+    from app.models.user import User
+    from app.services import hive_stats
+
+    db = SessionLocal()
+    try:
+        if args.user_id:
+            user_ids = [UUID(args.user_id)]
+        else:
+            user_ids = [row.id for row in db.query(User.id)]
+        buckets = 0
+        for user_id in user_ids:
+            buckets += hive_stats.rebuild(db, user_id)
+            db.commit()
+        print(f"{len(user_ids)} usuarios, {buckets} buckets de colmena y mes.")
+    finally:
+        db.close()
+
+
+def expire_stock(args):
+    from app.services.expiration_sweeper import expiration_sweeper
+
+    rows = expiration_sweeper.run_once()
+    stats = expiration_sweeper.stats()
+    print(f"{rows} paquetes marcados como vencidos en {stats['last_batches']} lotes "
+          f"({stats['last_duration_seconds']}s).")
+
+
+def generate_data(args):
+    from datetime import date
+    from app.core.config import settings
+    from app.services import synthetic_data
+
+    target = synthetic_data.load_data_engine(settings.DB_URL) if args.load_data else engine
+    result = synthetic_data.generate(
+        target,
+        users=args.users,
+        productions=args.productions,
+        orders=args.orders,
+        seed=args.seed,
+        anchor=date.fromisoformat(args.anchor) if args.anchor else None,
+        days=args.days,
+        batch_size=args.batch_size,
+        load_data=args.load_data,
+    )
+    total = sum(result["rows"].values())
+    for table, count in result["rows"].items():
+        print(f"{table}: {count}")
+    print(f"{total} filas en {result['seconds']}s ({total / max(result['seconds'], 0.001):.0f} filas/s).")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comandos de administración de Queen Cell")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init-db", help="Crea el esquema (reemplaza el create_all al importar main)")
+    init_parser.set_defaults(func=init_db, target=None)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Aplica las migraciones de esquema pendientes")
+    migrate_parser.add_argument("--target", help="Versión hasta la cual migrar (p. ej. 0001)")
+    migrate_parser.set_defaults(func=migrate)
+
+    status_parser = subparsers.add_parser("migrations", help="Lista las migraciones y su estado")
+    status_parser.set_defaults(func=show_migrations)
+
+    reconcile_parser = subparsers.add_parser(
+        "reconcile-dashboard", help="Reconstruye el resumen del dashboard desde las tablas base"
+    )
+    reconcile_parser.add_argument("--user-id", help="Solo este usuario")
+    reconcile_parser.set_defaults(func=reconcile_dashboard)
+
+    hive_parser = subparsers.add_parser(
+        "rebuild-hive-stats", help="Recalcula la aceptación por colmena y mes desde las producciones"
+    )
+    hive_parser.add_argument("--user-id", help="Solo este usuario")
+    hive_parser.set_defaults(func=rebuild_hive_stats)
+
+    expire_parser = subparsers.add_parser("expire-stock", help="Marca como vencidos los paquetes con fecha pasada")
+    expire_parser.set_defaults(func=expire_stock)
+
+    generate_parser = subparsers.add_parser(
+        "generate-data", help="Carga datos sintéticos deterministas para pruebas de capacidad"
+    )
+    generate_parser.add_argument("--users", type=int, default=10)
+    generate_parser.add_argument("--productions", type=int, default=1000, help="producciones por usuario")
+    generate_parser.add_argument("--orders", type=int, default=500, help="pedidos por usuario")
+    generate_parser.add_argument("--seed", default="0")
+    generate_parser.add_argument("--anchor", help="fecha de referencia (AAAA-MM-DD); por defecto hoy")
+    generate_parser.add_argument("--days", type=int, default=365, help="días de historia hacia atrás")
+    generate_parser.add_argument("--batch-size", type=int, default=5000)
+    generate_parser.add_argument("--load-data", action="store_true", help="usar LOAD DATA LOCAL INFILE (solo MySQL)")
+    generate_parser.set_defaults(func=generate_data)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
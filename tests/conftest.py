@@ -0,0 +1,65 @@
+"""
+Fixtures comunes: la app contra una base SQLite temporal y un usuario nuevo
+por test, así los tests no comparten datos.
+
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# La configuración se lee al importar la app: la base se fija antes
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.core.database import Base, engine
+    import main
+
+    Base.metadata.create_all(bind=engine)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def headers(client):
+    email = f"test-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "test", "name": "test"})
+    token = client.post("/api/auth/login", json={"email": email, "password": "test"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def user_id(client, headers):
+    return uuid.UUID(client.get("/api/auth/me", headers=headers).json()["id"])
+
+
+@pytest.fixture
+def db():
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def create_package(client, headers, cells, expires_in=10):
+    response = client.post("/api/stock/", headers=headers, json={
+        "production_id": str(uuid.uuid4()),
+        "production_date": str(date.today()),
+        "total_cells": cells,
+        "available_cells": cells,
+        "expiration_date": str(date.today() + timedelta(days=expires_in)),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
@@ -0,0 +1,43 @@
+"""
+Importación de pedidos por CSV: las filas válidas entran y las inválidas se
+informan con su número de línea.
+"""
+HEADER = "customer_name,number_of_cells,delivery_date,larvae_transfer_date\n"
+
+
+def _import(client, headers, content, path="/api/order/import"):
+    return client.post(path, headers=headers, files={"file": ("datos.csv", content, "text/csv")})
+
+
+def test_invalid_rows_are_reported_by_line(client, headers):
+    content = HEADER + (
+        "Ana,10,2030-01-10,2030-01-01\n"
+        "Beto,diez,2030-01-10,2030-01-01\n"
+        "Carla,5,2030-01-10,2030-01-01\n"
+        ",5,no-es-fecha,2030-01-01\n"
+    )
+    response = _import(client, headers, content)
+    assert response.status_code == 200, response.text
+    result = response.json()
+
+    assert (result["rows_read"], result["rows_imported"], result["rows_failed"]) == (4, 2, 2)
+    assert [error["line"] for error in result["errors"]] == [3, 5]
+    assert any(message.startswith("number_of_cells") for message in result["errors"][0]["errors"])
+    fields = {message.split(":")[0] for message in result["errors"][1]["errors"]}
+    assert {"customer_name", "delivery_date"} <= fields
+    assert not result["errors_truncated"]
+
+    names = {order["customer_name"] for order in client.get("/api/order/", headers=headers).json()["items"]}
+    assert names == {"Ana", "Carla"}
+
+
+def test_missing_columns_rejects_file(client, headers):
+    response = _import(client, headers, "customer_name,number_of_cells\nAna,10\n")
+    assert response.status_code == 400
+    assert "delivery_date" in response.json()["detail"]
+    assert client.get("/api/order/", headers=headers).json()["items"] == []
+
+
+def test_non_utf8_file_is_rejected(client, headers):
+    response = _import(client, headers, (HEADER + "Peña,10,2030-01-10,2030-01-01\n").encode("latin-1"))
+    assert response.status_code == 400
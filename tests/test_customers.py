@@ -0,0 +1,102 @@
+"""
+Clientes: normalización, búsqueda por trigramas/prefijo y trigramas al día
+con renombres y bajas.
+"""
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.models.customer import Customer, CustomerTrigram
+from app.models.order import CustomerOrder
+from app.services import customers
+
+
+def test_normalize_strips_accents_case_and_spaces():
+    assert customers.normalize("  José   PÉREZ ") == "jose perez"
+    assert customers.normalize("Ñandú") == "nandu"
+    assert customers.normalize("a" * 300) == "a" * 255
+    assert customers.trigrams("abcd") == {"abc", "bcd"}
+    assert customers.trigrams("ab") == set()
+
+
+def _order(client, headers, name):
+    response = client.post("/api/order/", headers=headers, json={
+        "customer_name": name, "number_of_cells": 5,
+        "delivery_date": str(date.today() + timedelta(days=5)), "larvae_transfer_date": str(date.today()),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _names(response):
+    assert response.status_code == 200, response.text
+    return [customer["name"] for customer in response.json()]
+
+
+def test_same_normalized_name_is_one_customer(client, headers):
+    first = _order(client, headers, "José Pérez")
+    second = _order(client, headers, "  jose   perez")
+    assert first["customer_id"] == second["customer_id"]
+    assert _names(client.get("/api/customers/autocomplete", params={"prefix": "JOS"}, headers=headers)) == ["José Pérez"]
+
+
+def test_search_ranks_prefix_matches_first(client, headers):
+    for name in ("Apícola Sur", "Miel del Sur", "Surco Apiarios", "Norte"):
+        _order(client, headers, name)
+
+    found = _names(client.get("/api/customers/search", params={"q": "sur"}, headers=headers))
+    assert found == ["Surco Apiarios", "Apícola Sur", "Miel del Sur"]
+    assert _names(client.get("/api/customers/search", params={"q": "APICOLA"}, headers=headers)) == ["Apícola Sur"]
+    assert _names(client.get("/api/customers/search", params={"q": "su"}, headers=headers)) == ["Surco Apiarios"]
+    assert _names(client.get("/api/customers/search", params={"q": "sur", "limit": 1}, headers=headers)) == ["Surco Apiarios"]
+    assert _names(client.get("/api/customers/search", params={"q": "xyz"}, headers=headers)) == []
+
+
+def test_search_is_per_user(client, headers):
+    _order(client, headers, "Cliente Privado")
+    email = f"otro-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "test", "name": "test"})
+    token = client.post("/api/auth/login", json={"email": email, "password": "test"}).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+    assert _names(client.get("/api/customers/search", params={"q": "privado"}, headers=other)) == []
+
+
+def _grams(db, customer_id):
+    db.expire_all()
+    return set(db.scalars(select(CustomerTrigram.trigram).where(CustomerTrigram.customer_id == customer_id)))
+
+
+def test_rename_replaces_trigrams(client, headers, db):
+    customer_id = _order(client, headers, "Viejo Nombre")["customer_id"]
+    response = client.put(f"/api/customers/{customer_id}", json={"name": "Nuevo Cliente"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Nuevo Cliente"
+
+    assert _grams(db, uuid.UUID(customer_id)) == customers.trigrams("nuevo cliente")
+    assert _names(client.get("/api/customers/search", params={"q": "viejo"}, headers=headers)) == []
+    assert _names(client.get("/api/customers/search", params={"q": "cliente"}, headers=headers)) == ["Nuevo Cliente"]
+    assert _names(client.get("/api/customers/autocomplete", params={"prefix": "nue"}, headers=headers)) == ["Nuevo Cliente"]
+
+
+def test_rename_onto_existing_customer_conflicts(client, headers, db):
+    customer_id = _order(client, headers, "Uno")["customer_id"]
+    _order(client, headers, "Dos")
+    response = client.put(f"/api/customers/{customer_id}", json={"name": " DOS "}, headers=headers)
+    assert response.status_code == 409
+    assert _grams(db, uuid.UUID(customer_id)) == {"uno"}
+    assert db.get(Customer, uuid.UUID(customer_id)).name == "Uno"
+
+
+def test_delete_removes_trigrams_and_unlinks_orders(client, headers, db):
+    order = _order(client, headers, "Para Borrar")
+    customer_id = uuid.UUID(order["customer_id"])
+    assert _grams(db, customer_id)
+
+    assert client.delete(f"/api/customers/{customer_id}", headers=headers).status_code == 200
+    assert _grams(db, customer_id) == set()
+    assert db.get(Customer, customer_id) is None
+    stored = db.get(CustomerOrder, uuid.UUID(order["id"]))
+    assert (stored.customer_name, stored.customer_id) == ("Para Borrar", None)
+    assert _names(client.get("/api/customers/search", params={"q": "borrar"}, headers=headers)) == []
+    assert client.delete(f"/api/customers/{customer_id}", headers=headers).status_code == 404
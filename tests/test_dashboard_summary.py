@@ -0,0 +1,60 @@
+"""
+El resumen incremental del dashboard coincide con el recálculo desde las
+tablas base después de una serie de escrituras.
+"""
+from datetime import date, timedelta
+
+from app.models.dashboard import DashboardSummary
+from app.services import dashboard_summary
+from tests.conftest import create_package
+
+
+def _order(client, headers, cells, status="pending"):
+    response = client.post("/api/order/", headers=headers, json={
+        "customer_name": "Cliente",
+        "number_of_cells": cells,
+        "delivery_date": str(date.today() + timedelta(days=7)),
+        "larvae_transfer_date": str(date.today()),
+        "status": status,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_summary_matches_recompute(client, headers, user_id, db):
+    expiring = create_package(client, headers, 10, expires_in=3)
+    create_package(client, headers, 20, expires_in=30)
+    assert client.post(f"/api/stock/{expiring['id']}/sell", headers=headers, json={
+        "stock_package_id": expiring["id"], "customer_name": "Cliente", "cells_sold": 4,
+    }).status_code == 201
+    assert client.post("/api/stock/sell", headers=headers, json={"customer_name": "Otro", "cells_sold": 8}).status_code == 201
+
+    order = _order(client, headers, 5)
+    _order(client, headers, 3, status="in_production")
+    update = {key: order[key] for key in ("customer_name", "number_of_cells", "delivery_date", "larvae_transfer_date")}
+    assert client.put(f"/api/order/{order['id']}", headers=headers, json={**update, "status": "completed"}).status_code == 200
+
+    production = client.post("/api/productions/", headers=headers, json={
+        "transfer_date": str(date.today()), "larvae_transferred": 40, "accepted_cells": 30, "cells_produced": 25,
+        "hives": [{"hive_name": "A"}],
+    })
+    assert production.status_code == 200, production.text
+    assert client.delete(f"/api/productions/{production.json()['id']}", headers=headers).status_code == 200
+    assert client.post("/api/order/fulfillment-plan", headers=headers).status_code == 200
+
+    stats = client.get("/api/dashboard/stats", headers=headers).json()
+    assert not dashboard_summary.reconcile(db, user_id)
+    db.commit()
+    assert client.get("/api/dashboard/stats", headers=headers).json() == stats
+
+
+def test_summary_detects_drift(client, headers, user_id, db):
+    create_package(client, headers, 10)
+    client.get("/api/dashboard/stats", headers=headers)
+    summary = db.get(DashboardSummary, user_id)
+    summary.total_available_cells += 1
+    db.flush()
+    assert dashboard_summary.reconcile(db, user_id)
+    assert not dashboard_summary.reconcile(db, user_id)
+    db.commit()
+    assert client.get("/api/dashboard/stats", headers=headers).json()["total_available_cells"] == 10
@@ -0,0 +1,48 @@
+"""
+ETag de los listados: 304 mientras la colección no cambia y una etiqueta
+nueva después de cada escritura.
+"""
+from tests.conftest import create_package
+
+
+def _etag(response):
+    assert response.status_code == 200, response.text
+    return response.headers["ETag"]
+
+
+def test_unchanged_listing_returns_304(client, headers):
+    create_package(client, headers, 10)
+    etag = _etag(client.get("/api/stock/", headers=headers))
+
+    response = client.get("/api/stock/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not response.content
+
+
+def test_write_invalidates_etag(client, headers):
+    package = create_package(client, headers, 10)
+    etag = _etag(client.get("/api/stock/", headers=headers))
+    all_etag = _etag(client.get("/api/stock/all", headers=headers))
+
+    assert client.post(f"/api/stock/{package['id']}/sell", headers=headers, json={
+        "stock_package_id": package["id"], "customer_name": "Cliente", "cells_sold": 2,
+    }).status_code == 201
+
+    response = client.get("/api/stock/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["items"][0]["available_cells"] == 8
+    assert client.get("/api/stock/all", headers={**headers, "If-None-Match": all_etag}).status_code == 200
+
+
+def test_etag_depends_on_page_and_user(client, headers):
+    create_package(client, headers, 10)
+    etag = _etag(client.get("/api/stock/", headers=headers))
+    assert _etag(client.get("/api/stock/", params={"limit": 1}, headers=headers)) != etag
+
+    email = "otro-etag@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "test", "name": "test"})
+    token = client.post("/api/auth/login", json={"email": email, "password": "test"}).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}", "If-None-Match": etag}
+    assert client.get("/api/stock/", headers=other).status_code == 200
@@ -0,0 +1,55 @@
+"""
+Barrido de vencidos: solo cuenta en el dashboard los paquetes que marca él.
+"""
+import uuid
+
+import pytest
+
+from app.core.database import engine
+from app.models.stock import StockPackage
+from app.services import dashboard_summary, expiration_sweeper
+from tests.conftest import create_package
+
+
+@pytest.fixture(params=["returning", "sin returning"])
+def dialect_returning(request, monkeypatch):
+    if request.param == "sin returning":
+        monkeypatch.setattr(engine.dialect, "update_returning", False)
+    return request.param
+
+
+def test_sweep_marks_past_packages(client, headers, user_id, db, dialect_returning):
+    expired = [create_package(client, headers, 5, expires_in=-2) for _ in range(2)]
+    current = create_package(client, headers, 5)
+    client.get("/api/dashboard/stats", headers=headers)
+
+    assert expiration_sweeper.expire_batch(db, expiration_sweeper.date.today(), 100) >= 2
+    db.commit()
+
+    for package in expired:
+        assert db.get(StockPackage, uuid.UUID(package["id"])).is_expired
+    assert not db.get(StockPackage, uuid.UUID(current["id"])).is_expired
+    assert client.get("/api/dashboard/stats", headers=headers).json()["total_available_cells"] == 5
+    assert not dashboard_summary.reconcile(db, user_id)
+
+
+def test_package_sold_out_mid_sweep_is_not_counted_twice(client, headers, user_id, db, monkeypatch, dialect_returning):
+    sold_out, other = (create_package(client, headers, 5, expires_in=-2) for _ in range(2))
+    client.get("/api/dashboard/stats", headers=headers)
+    mark_expired = expiration_sweeper._mark_expired
+
+    def racing(session, rows):
+        # La venta agota el paquete (y lo marca) entre la lectura y el UPDATE
+        assert client.post(f"/api/stock/{sold_out['id']}/sell", headers=headers, json={
+            "stock_package_id": sold_out["id"], "customer_name": "Cliente", "cells_sold": 5,
+        }).status_code == 201
+        return mark_expired(session, rows)
+
+    monkeypatch.setattr(expiration_sweeper, "_mark_expired", racing)
+    marked = expiration_sweeper.expire_batch(db, expiration_sweeper.date.today(), 100)
+    db.commit()
+
+    assert marked >= 1
+    assert db.get(StockPackage, uuid.UUID(other["id"])).is_expired
+    assert client.get("/api/dashboard/stats", headers=headers).json()["total_available_cells"] == 0
+    assert not dashboard_summary.reconcile(db, user_id)
@@ -0,0 +1,126 @@
+"""
+Planificador de entregas: el greedy por fecha de entrega y el plan grabado.
+"""
+import uuid
+from collections import namedtuple
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, update
+
+from app.core.database import SessionLocal
+from app.models.order import CustomerOrder
+from app.models.stock import StockPackage, StockSale
+from app.services import fulfillment
+from tests.conftest import create_package
+
+TODAY = date(2026, 10, 1)
+
+Order = namedtuple("Order", "id customer_name delivery_date larvae_transfer_date created_at cells_needed")
+Package = namedtuple("Package", "id available_cells expiration_date production_date")
+
+
+def _order(name, delivery_in, cells):
+    return Order(name, name, TODAY + timedelta(days=delivery_in), TODAY, None, cells)
+
+
+def _package(name, expires_in, cells):
+    return Package(name, cells, TODAY + timedelta(days=expires_in), TODAY)
+
+
+def _allocated(allocations):
+    by_order, by_package = {}, {}
+    for allocation in allocations:
+        by_order[allocation.order.id] = by_order.get(allocation.order.id, 0) + allocation.cells
+        by_package[allocation.package.id] = by_package.get(allocation.package.id, 0) + allocation.cells
+    return by_order, by_package
+
+
+def test_earlier_delivery_gets_stock_first():
+    orders = [_order("tarde", 9, 10), _order("temprano", 2, 10)]
+    by_order, _ = _allocated(fulfillment.plan(orders, [_package("p", 30, 12)], TODAY))
+    assert by_order == {"temprano": 10, "tarde": 2}
+
+
+def test_package_expiring_before_delivery_is_not_used():
+    orders = [_order("pedido", 10, 5)]
+    by_order, by_package = _allocated(fulfillment.plan(orders, [_package("vence", 5, 20), _package("dura", 20, 3)], TODAY))
+    assert by_order == {"pedido": 3}
+    assert by_package == {"dura": 3}
+
+
+def test_partial_fill_uses_soonest_expiring_first():
+    orders = [_order("a", 1, 8), _order("b", 3, 8)]
+    packages = [_package("largo", 30, 4), _package("corto", 4, 5)]
+    allocations = fulfillment.plan(orders, packages, TODAY)
+    assert [(a.order.id, a.package.id, a.cells) for a in allocations] == [
+        ("a", "corto", 5), ("a", "largo", 3), ("b", "largo", 1),
+    ]
+    summary = fulfillment.summarize(orders, packages, allocations)
+    assert (summary["orders_fulfilled"], summary["orders_partial"], summary["cells_short"]) == (1, 1, 7)
+
+
+def test_never_allocates_more_than_needed_or_available():
+    orders = [_order(f"o{i}", i % 7, 3 + i % 5) for i in range(20)]
+    packages = [_package(f"p{i}", 2 + i * 3, 4 + i % 3) for i in range(8)]
+    by_order, by_package = _allocated(fulfillment.plan(orders, packages, TODAY))
+    assert all(by_order[order.id] <= order.cells_needed for order in orders if order.id in by_order)
+    assert all(by_package[package.id] <= package.available_cells for package in packages if package.id in by_package)
+    assert sum(by_order.values()) == sum(by_package.values()) > 0
+
+
+def _create_order(client, headers, cells, delivery_in=5):
+    response = client.post("/api/order/", headers=headers, json={
+        "customer_name": "Cliente", "number_of_cells": cells,
+        "delivery_date": str(date.today() + timedelta(days=delivery_in)),
+        "larvae_transfer_date": str(date.today()),
+    })
+    assert response.status_code == 200, response.text
+    return uuid.UUID(response.json()["id"])
+
+
+def test_commit_records_allocation_apart_from_production(client, headers, db):
+    order_id = _create_order(client, headers, 10)
+    create_package(client, headers, 6)
+
+    result = client.post("/api/order/fulfillment-plan", headers=headers).json()
+    assert (result["committed"], result["cells_allocated"]) == (True, 6)
+    order = db.get(CustomerOrder, order_id)
+    assert (order.cells_allocated, order.cells_produced or 0, order.cells_remaining, order.status) == (6, 0, 4, "in_production")
+
+    # Una producción vinculada cuenta aparte y completa lo que falta
+    response = client.post("/api/productions/", headers=headers, json={
+        "transfer_date": str(date.today()), "larvae_transferred": 10, "cells_produced": 4,
+        "order_id": str(order_id), "hives": [],
+    })
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    order = db.get(CustomerOrder, order_id)
+    assert (order.cells_allocated, order.cells_produced, order.cells_remaining, order.status) == (6, 4, 0, "completed")
+    assert client.get("/api/order/fulfillment-plan", headers=headers).json()["orders_considered"] == 0
+
+
+def test_commit_fails_when_stock_moved(client, headers, db, monkeypatch):
+    order_id = _create_order(client, headers, 10)
+    package = create_package(client, headers, 8)
+    load = fulfillment.load
+
+    def stale_load(session, user_id, today, lock=False):
+        orders, packages = load(session, user_id, today, lock)
+        # Otra venta se lleva celdas después de la lectura (SQLite no bloquea)
+        with SessionLocal() as other:
+            other.execute(
+                update(StockPackage)
+                .where(StockPackage.id == uuid.UUID(package["id"]))
+                .values(available_cells=StockPackage.available_cells - 3, sold_cells=StockPackage.sold_cells + 3)
+            )
+            other.commit()
+        return orders, packages
+
+    monkeypatch.setattr(fulfillment, "load", stale_load)
+    response = client.post("/api/order/fulfillment-plan", headers=headers)
+    assert response.status_code == 409
+
+    stored = db.get(StockPackage, uuid.UUID(package["id"]))
+    assert (stored.available_cells, stored.sold_cells) == (5, 3)
+    assert not db.scalar(select(func.count()).select_from(StockSale).where(StockSale.stock_package_id == stored.id))
+    assert db.get(CustomerOrder, order_id).cells_allocated == 0
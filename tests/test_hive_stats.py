@@ -0,0 +1,94 @@
+"""
+hive_monthly_stats incremental: después de cada tipo de escritura de
+producciones coincide con hive_stats.compute sobre las tablas base.
+"""
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.analytics import HiveMonthlyStat
+from app.services import hive_stats
+
+COUNTERS = ("productions", "larvae_transferred", "accepted_larvae", "accepted_cells", "cells_produced")
+
+
+def _stored(db, user_id):
+    db.expire_all()
+    rows = db.scalars(select(HiveMonthlyStat).where(HiveMonthlyStat.user_id == user_id))
+    return {
+        (row.month, row.hive_name): tuple(getattr(row, name) for name in COUNTERS)
+        for row in rows if any(getattr(row, name) for name in COUNTERS)
+    }
+
+
+def _computed(db, user_id):
+    return {
+        (row["month"], row["hive_name"]): tuple(row[name] for name in COUNTERS)
+        for row in hive_stats.compute(db, user_id)
+    }
+
+
+def _assert_in_sync(db, user_id):
+    stored = _stored(db, user_id)
+    assert stored == _computed(db, user_id)
+    return stored
+
+
+def _create(client, headers, **fields):
+    body = {"transfer_date": "2026-09-03", "larvae_transferred": 100, "cells_produced": 0, "hives": [], **fields}
+    response = client.post("/api/productions/", headers=headers, json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_create(client, headers, user_id, db):
+    _create(client, headers, accepted_cells=70, cells_produced=60, hives=[{"hive_name": "A"}, {"hive_name": "A"}, {"hive_name": "B"}])
+    _create(client, headers, transfer_date="2026-10-01", larvae_transferred=40)
+    stored = _assert_in_sync(db, user_id)
+    assert set(stored) == {(date(2026, 9, 1), "A"), (date(2026, 9, 1), "B"), (date(2026, 10, 1), "")}
+    assert stored[(date(2026, 9, 1), "A")][0] == 1
+
+
+def test_update_moves_month(client, headers, user_id, db):
+    production = _create(client, headers, hives=[{"hive_name": "A"}])
+    response = client.put(f"/api/productions/{production['id']}", headers=headers, json={
+        "transfer_date": "2026-08-15", "larvae_transferred": 80, "accepted_cells": 50, "cells_produced": 45,
+        "hives": [{"hive_name": "C"}],
+    })
+    assert response.status_code == 200, response.text
+    # El endpoint no reemplaza colmenas: el bucket se mueve de mes con "A"
+    stored = _assert_in_sync(db, user_id)
+    assert set(stored) == {(date(2026, 8, 1), "A")}
+
+
+def test_acceptance(client, headers, user_id, db):
+    production = _create(client, headers, hives=[{"hive_name": "A"}])
+    response = client.put(f"/api/productions/{production['id']}/acceptance", headers=headers, json={"accepted_cells": 80})
+    assert response.status_code == 200, response.text
+    stored = _assert_in_sync(db, user_id)
+    assert stored[(date(2026, 9, 1), "A")][2:4] == (100, 80)
+
+
+def test_csv_import(client, headers, user_id, db):
+    _create(client, headers, hives=[{"hive_name": "A"}])
+    content = (
+        "transfer_date,larvae_transferred,accepted_cells,cells_produced,hives\n"
+        "2026-09-10,30,20,18,A;C\n"
+        "2026-09-11,25,,0,C;C\n"
+        "2026-07-02,10,5,5,\n"
+        "no-es-fecha,10,5,5,A\n"
+    )
+    result = client.post("/api/productions/import", headers=headers, files={"file": ("p.csv", content, "text/csv")}).json()
+    assert (result["rows_imported"], result["rows_failed"]) == (3, 1)
+    stored = _assert_in_sync(db, user_id)
+    assert stored[(date(2026, 9, 1), "C")][0] == 2
+
+
+def test_delete(client, headers, user_id, db):
+    kept = _create(client, headers, accepted_cells=60, hives=[{"hive_name": "A"}])
+    deleted = _create(client, headers, larvae_transferred=50, hives=[{"hive_name": "A"}, {"hive_name": "B"}])
+    assert client.delete(f"/api/productions/{deleted['id']}", headers=headers).status_code == 200
+    stored = _assert_in_sync(db, user_id)
+    assert set(stored) == {(date(2026, 9, 1), "A")}
+    assert client.delete(f"/api/productions/{kept['id']}", headers=headers).status_code == 200
+    assert _assert_in_sync(db, user_id) == {}
@@ -0,0 +1,131 @@
+"""
+La serie de migraciones sobre una base con el esquema original (UUID,
+VARCHAR(36) y CHAR(36) según la tabla) y datos cargados.
+"""
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+import manage
+from app.models.analytics import HiveMonthlyStat
+from app.models.customer import Customer
+from app.models.order import CustomerOrder
+from app.models.production import ProductionHive, ProductionRecord
+from app.models.stock import StockPackage, StockSale
+from app.models.user import User
+
+BASELINE = (
+    """CREATE TABLE users (
+        id UUID PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE, password_hash VARCHAR(255) NOT NULL,
+        name VARCHAR(255) NOT NULL, role VARCHAR(50), created_at TIMESTAMP NOT NULL, updated_at TIMESTAMP NOT NULL)""",
+    """CREATE TABLE customer_orders (
+        id UUID PRIMARY KEY, user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        customer_name VARCHAR(255) NOT NULL, number_of_cells INTEGER NOT NULL, delivery_date DATE NOT NULL,
+        larvae_transfer_date DATE NOT NULL, status VARCHAR(50), cells_produced INTEGER, cells_remaining INTEGER,
+        created_at TIMESTAMP, updated_at TIMESTAMP)""",
+    """CREATE TABLE production_records (
+        id VARCHAR(36) PRIMARY KEY, user_id VARCHAR(36) NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        transfer_date DATE NOT NULL, larvae_transferred INTEGER NOT NULL, accepted_cells INTEGER,
+        acceptance_date DATE, cells_produced INTEGER NOT NULL,
+        order_id VARCHAR(36) REFERENCES customer_orders (id) ON DELETE SET NULL,
+        notes TEXT, status VARCHAR(50), created_at TIMESTAMP, updated_at TIMESTAMP)""",
+    """CREATE TABLE hives (
+        id VARCHAR(36) PRIMARY KEY, production_id VARCHAR(36) REFERENCES production_records (id) ON DELETE CASCADE,
+        hive_name VARCHAR(255) NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+    """CREATE TABLE production_hives (
+        id VARCHAR(36) PRIMARY KEY, production_id VARCHAR(36) REFERENCES production_records (id) ON DELETE CASCADE,
+        hive_name VARCHAR(255) NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+    """CREATE TABLE stock_packages (
+        id CHAR(36) PRIMARY KEY, user_id CHAR(36) NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        production_id CHAR(36) NOT NULL REFERENCES production_records (id) ON DELETE CASCADE,
+        production_date DATE NOT NULL, total_cells INTEGER NOT NULL, available_cells INTEGER NOT NULL,
+        sold_cells INTEGER, expiration_date DATE NOT NULL, is_expired BOOLEAN,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP)""",
+    """CREATE TABLE stock_sales (
+        id CHAR(36) PRIMARY KEY, stock_package_id CHAR(36) REFERENCES stock_packages (id) ON DELETE CASCADE,
+        customer_name VARCHAR(255) NOT NULL, cells_sold INTEGER NOT NULL, sale_date DATE NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+)
+
+USER, ORDER, NAMELESS_ORDER, PRODUCTION, PACKAGE, SALE = (uuid.uuid4() for _ in range(6))
+NOW = datetime(2026, 9, 1, 12, 0)
+
+
+def _load_baseline(engine):
+    with engine.begin() as conn:
+        for ddl in BASELINE:
+            conn.execute(text(ddl))
+        conn.execute(text(
+            "INSERT INTO users VALUES (:id, 'a@b.com', 'x', 'Ana', 'beekeeper', :now, :now)"
+        ), {"id": str(USER), "now": NOW})
+        conn.execute(text(
+            "INSERT INTO customer_orders VALUES (:id, :user, :name, 10, '2026-10-01', '2026-09-20', 'pending', 0, 10, :created, :now)"
+        ), [
+            {"id": str(ORDER), "user": str(USER), "name": "Pepe", "created": NOW, "now": NOW},
+            {"id": str(NAMELESS_ORDER), "user": str(USER), "name": "pepe ", "created": None, "now": NOW},
+        ])
+        conn.execute(text(
+            "INSERT INTO production_records VALUES (:id, :user, '2026-09-03', 100, 80, '2026-09-05', 70, :order, NULL, 'active', :now, :now)"
+        ), {"id": str(PRODUCTION), "user": str(USER), "order": str(ORDER), "now": NOW})
+        conn.execute(text(
+            "INSERT INTO production_hives (id, production_id, hive_name) VALUES (:id, :production, :hive)"
+        ), [{"id": str(uuid.uuid4()), "production": str(PRODUCTION), "hive": hive} for hive in ("A", "B")])
+        conn.execute(text(
+            "INSERT INTO stock_packages VALUES (:id, :user, :production, '2026-09-10', 70, 60, 10, '2026-09-30', 0, :now, :now)"
+        ), {"id": str(PACKAGE), "user": str(USER), "production": str(PRODUCTION), "now": NOW})
+        conn.execute(text(
+            "INSERT INTO stock_sales (id, stock_package_id, customer_name, cells_sold, sale_date) VALUES (:id, :package, 'PEPE', 10, '2026-09-12')"
+        ), {"id": str(SALE), "package": str(PACKAGE)})
+
+
+@pytest.fixture
+def baseline_engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    _load_baseline(engine)
+    monkeypatch.setattr(manage, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_convert_baseline_data(baseline_engine):
+    manage.main(["migrate"])
+
+    with Session(baseline_engine) as db:
+        user = db.get(User, USER)
+        assert user.name == "Ana"
+        orders = {order.id: order for order in db.scalars(select(CustomerOrder))}
+        assert set(orders) == {ORDER, NAMELESS_ORDER}
+        assert all(order.user_id == USER for order in orders.values())
+        assert orders[NAMELESS_ORDER].created_at == NOW
+
+        production = db.get(ProductionRecord, PRODUCTION)
+        assert (production.user_id, production.order_id) == (USER, ORDER)
+        assert {hive.hive_name for hive in db.scalars(select(ProductionHive))} == {"A", "B"}
+        package = db.get(StockPackage, PACKAGE)
+        assert (package.user_id, package.production_id) == (USER, PRODUCTION)
+        sale = db.get(StockSale, SALE)
+        assert sale.stock_package_id == PACKAGE
+
+        # "Pepe", "pepe " y "PEPE" son el mismo cliente
+        customer = db.scalars(select(Customer)).one()
+        assert customer.name_key == "pepe"
+        assert {order.customer_id for order in orders.values()} == {customer.id}
+        assert sale.customer_id == customer.id
+
+        stats = {row.hive_name: row for row in db.scalars(select(HiveMonthlyStat))}
+        assert set(stats) == {"A", "B"}
+        assert all(row.month == date(2026, 9, 1) and row.accepted_cells == 80 for row in stats.values())
+
+    with baseline_engine.connect() as conn:
+        stored = conn.execute(text("SELECT id FROM users")).scalar_one()
+    assert stored == USER.bytes
+
+
+def test_migrate_is_idempotent(baseline_engine, capsys):
+    manage.main(["migrate"])
+    capsys.readouterr()
+    manage.main(["migrate"])
+    assert "no hay migraciones pendientes" in capsys.readouterr().out
@@ -0,0 +1,98 @@
+"""
+Paginación por cursor (created_at DESC, id DESC): recorrer todas las páginas
+no repite ni saltea filas aunque compartan created_at, y un cursor inválido
+es un 400.
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models.order import CustomerOrder
+from app.models.production import ProductionRecord
+from app.models.stock import StockPackage
+
+ROWS = 7
+SHARED = datetime(2026, 9, 1, 12, 0)
+
+
+def _create_order(client, headers, index):
+    return client.post("/api/order/", headers=headers, json={
+        "customer_name": f"Cliente {index}", "number_of_cells": 5,
+        "delivery_date": str(date.today() + timedelta(days=5)), "larvae_transfer_date": str(date.today()),
+    })
+
+
+def _create_production(client, headers, index):
+    return client.post("/api/productions/", headers=headers, json={
+        "transfer_date": str(date.today()), "larvae_transferred": 10 + index, "cells_produced": 0, "hives": [],
+    })
+
+
+def _create_package(client, headers, index):
+    return client.post("/api/stock/", headers=headers, json={
+        "production_id": str(uuid.uuid4()), "production_date": str(date.today()),
+        "total_cells": 5 + index, "available_cells": 5 + index,
+        "expiration_date": str(date.today() + timedelta(days=10)),
+    })
+
+
+LISTINGS = [
+    ("/api/order/", CustomerOrder, _create_order),
+    ("/api/productions/", ProductionRecord, _create_production),
+    ("/api/stock/all", StockPackage, _create_package),
+]
+
+
+def _walk(client, headers, path, limit):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("path, model, create", LISTINGS, ids=["orders", "productions", "stock"])
+def test_pages_cover_every_row_once(client, headers, user_id, db, path, model, create):
+    for index in range(ROWS):
+        response = create(client, headers, index)
+        assert response.status_code == 200, response.text
+    # Cinco filas con el mismo created_at: el id desempata
+    ids = [row.id for row in db.query(model.id).filter(model.user_id == user_id).order_by(model.id)]
+    db.execute(update(model).where(model.id.in_(ids[:5])).values(created_at=SHARED))
+    db.execute(update(model).where(model.id.in_(ids[5:])).values(created_at=SHARED - timedelta(seconds=1)))
+    db.commit()
+
+    everything = _walk(client, headers, path, 100)
+    assert len(everything) == ROWS
+    for limit in (1, 2, 3, 5):
+        assert _walk(client, headers, path, limit) == everything
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-un-cursor",
+    "%%%",
+    _cursor(["2026-09-01T12:00:00"]),
+    _cursor({"created_at": "2026-09-01", "id": "x"}),
+    _cursor([12345, "00000000-0000-0000-0000-000000000000"]),
+    _cursor(["ayer", "00000000-0000-0000-0000-000000000000"]),
+    _cursor(["2026-09-01T12:00:00", "no-es-uuid"]),
+    _cursor(["2026-09-01T12:00:00", 5]),
+    _cursor(["2026-09-01T12:00:00", None]),
+])
+@pytest.mark.parametrize("path", [path for path, _, _ in LISTINGS])
+def test_invalid_cursor_is_bad_request(client, headers, path, cursor):
+    response = client.get(path, params={"cursor": cursor}, headers=headers)
+    assert response.status_code == 400, response.text
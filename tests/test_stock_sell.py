@@ -0,0 +1,86 @@
+"""
+Ventas de stock: nunca se vende más de lo que hay y la venta que agota un
+paquete lo marca como expirado.
+"""
+import threading
+import uuid
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import engine
+from app.models.stock import StockPackage, StockSale
+from tests.conftest import create_package
+
+THREADS = 16
+CELLS = 30
+ATTEMPTS = 60
+
+
+def _hammer(client, headers, path, body):
+    statuses = Counter()
+    lock = threading.Lock()
+    remaining = [ATTEMPTS]
+
+    def worker():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            response = client.post(path, headers=headers, json=body)
+            with lock:
+                statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def test_concurrent_package_sales_do_not_oversell(client, headers, db):
+    package = create_package(client, headers, CELLS)
+    statuses = _hammer(client, headers, f"/api/stock/{package['id']}/sell", {
+        "stock_package_id": package["id"], "customer_name": "concurrencia", "cells_sold": 1,
+    })
+
+    # Las que no entran son por falta de celdas, no por conflicto
+    assert statuses == {201: CELLS, 400: ATTEMPTS - CELLS}
+    stored = db.get(StockPackage, uuid.UUID(package["id"]))
+    sales_total = db.scalar(select(func.sum(StockSale.cells_sold)).where(StockSale.stock_package_id == stored.id))
+    assert stored.available_cells == 0
+    assert stored.sold_cells == sales_total == CELLS
+    assert stored.is_expired
+
+
+def test_concurrent_fifo_sales_do_not_oversell(client, headers, db):
+    first = create_package(client, headers, CELLS // 2, expires_in=5)
+    second = create_package(client, headers, CELLS - CELLS // 2, expires_in=10)
+    statuses = _hammer(client, headers, "/api/stock/sell", {"customer_name": "concurrencia", "cells_sold": 1})
+
+    # Con varios paquetes la venta puede chocar más de SELL_RETRIES veces (409)
+    assert set(statuses) <= {201, 400, 409}
+    assert 0 < statuses[201] <= CELLS
+    sold = 0
+    for package in (first, second):
+        stored = db.get(StockPackage, uuid.UUID(package["id"]))
+        assert stored.available_cells >= 0
+        assert stored.available_cells + stored.sold_cells == package["total_cells"]
+        sold += stored.sold_cells
+    assert sold == statuses[201]
+
+
+@pytest.mark.parametrize("returning", [True, False], ids=["returning", "sin returning"])
+def test_sale_that_empties_package_marks_it_expired(client, headers, db, monkeypatch, returning):
+    monkeypatch.setattr(engine.dialect, "update_returning", returning)
+    package = create_package(client, headers, 5)
+    body = {"stock_package_id": package["id"], "customer_name": "Cliente"}
+
+    partial = client.post(f"/api/stock/{package['id']}/sell", headers=headers, json={**body, "cells_sold": 2}).json()
+    assert (partial["available_cells"], partial["sold_cells"], partial["is_expired"]) == (3, 2, False)
+    last = client.post(f"/api/stock/{package['id']}/sell", headers=headers, json={**body, "cells_sold": 3}).json()
+    assert (last["available_cells"], last["sold_cells"], last["is_expired"]) == (0, 5, True)
+    assert db.get(StockPackage, uuid.UUID(package["id"])).is_expired
@@ -0,0 +1,91 @@
+"""
+Cache de usuarios de get_current_user: un cambio de contraseña o rol, o el
+borrado del usuario, se ve en el request siguiente, tanto si lo hizo este
+proceso como otro worker (vía user_invalidations).
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.core.database import SessionLocal
+from app.core.user_cache import user_cache
+from app.models.user import User, UserInvalidation
+
+
+@pytest.fixture
+def token(headers):
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+@pytest.fixture
+def sync_now(monkeypatch):
+    """
+    Sin espera entre sincronizaciones: cada request consulta user_invalidations.
+    """
+    monkeypatch.setattr(user_cache, "sync_interval", 0)
+    monkeypatch.setattr(user_cache, "_next_sync", 0.0)
+
+
+def _me(client, headers):
+    response = client.get("/api/auth/me", headers=headers)
+    return response.status_code, response.json()
+
+
+def _cached(client, headers, user_id, token):
+    assert _me(client, headers)[0] == 200
+    assert client.get("/api/stock/", headers=headers).status_code == 200
+    assert user_cache.get(user_id, token) is not None
+
+
+def _edit(user_id, **values):
+    with SessionLocal() as db:
+        user = db.get(User, user_id)
+        for key, value in values.items():
+            setattr(user, key, value)
+        db.commit()
+
+
+def _stored_hash(user_id):
+    with SessionLocal() as db:
+        return db.get(User, user_id).password_hash
+
+
+@pytest.mark.parametrize("values", [{"role": "admin"}, {"password_hash": "otro-hash"}], ids=["rol", "contraseña"])
+def test_change_evicts_cached_user(client, headers, user_id, token, values):
+    _cached(client, headers, user_id, token)
+    _edit(user_id, **values)
+
+    assert user_cache.get(user_id, token) is None
+    status, body = _me(client, headers)
+    assert status == 200
+    if "role" in values:
+        assert body["role"] == "admin"
+        assert client.get("/api/stock/", headers=headers).status_code == 200
+    assert user_cache.get(user_id, token).password_hash == _stored_hash(user_id)
+
+
+def test_deleted_user_is_rejected(client, headers, user_id, token):
+    _cached(client, headers, user_id, token)
+    with SessionLocal() as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+
+    assert _me(client, headers)[0] == 401
+    assert client.get("/api/stock/", headers=headers).status_code == 401
+
+
+def test_change_from_other_worker_evicts_on_sync(client, headers, user_id, token, sync_now):
+    _cached(client, headers, user_id, token)
+    # Otro worker: cambia la fila sin pasar por este proceso...
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == user_id).values(role="admin"))
+        db.commit()
+    assert _me(client, headers)[1]["role"] == "beekeeper"
+
+    # ...y su listener deja el registro que este worker aplica al sincronizar
+    with SessionLocal() as db:
+        db.execute(insert(UserInvalidation).values(user_id=user_id, created_at=datetime.utcnow()))
+        db.commit()
+    assert client.get("/api/stock/", headers=headers).status_code == 200
+    assert _me(client, headers)[1]["role"] == "admin"